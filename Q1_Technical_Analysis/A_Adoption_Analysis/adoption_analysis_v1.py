@@ -10,6 +10,11 @@
 
 import pandas as pd
 import matplotlib.pyplot as plt
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # repo root
+from analytics.teams import user_team_map
 
 # load relevant data
 users = pd.read_csv('data/user_directory.csv', parse_dates=['join_date'])
@@ -70,7 +75,7 @@ user_trend = (
 )
 
 # attach user names & teams
-user_team = ai.groupby('user_id')['team'].agg(lambda s: s.mode().iloc[0]).reset_index()
+user_team = user_team_map().reset_index()
 user_trend = (
     user_trend
     .merge(user_team, on='user_id')
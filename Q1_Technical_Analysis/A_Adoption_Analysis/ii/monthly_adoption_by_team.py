@@ -1,20 +1,27 @@
 # monthly_adoption_by_team.py
 # Computes Monthly Adoption Rates, Overall & Various Δ‐Metrics by Team
 
-import pandas as pd
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))  # repo root
+from analytics.loader import load_monthly_summary
+from analytics.periods import labels as period_labels
+from analytics.trends import adoption_matrices, delta_columns, month_labels, month_window, trend_table, window_label
 
 # 1. Load the user×month summary
-ums = pd.read_csv('data/user_monthly_summary.csv', parse_dates=['month'])
+ums = load_monthly_summary()
 
 # 2. Restrict to the 2025-01 through 2025-04 window (ignore partial May)
-start = pd.Timestamp('2025-01-01')
-end   = pd.Timestamp('2025-04-01')
-ums   = ums[(ums['month'] >= start) & (ums['month'] <= end)]
+window = month_window('2025-04', 4)
+labels = month_labels(window, suffix='_rate')
+span   = window_label(window)
+ums    = ums[ums['month'].isin(window)]
 
 # 3. Aggregate to get monthly adoption rates
 team_monthly = (
     ums
-    .groupby(['team','month'])
+    .groupby(['team','month'], observed=True)
     .agg(
         total_tasks=('total_tasks', 'sum'),
         ai_tasks   =('ai_tasks',    'sum')
@@ -25,9 +32,10 @@ team_monthly = (
 )
 
 # 4. Show the monthly rates
-print("\n📊 Monthly Adoption Rates by Team (2025-01 → 2025-04):")
+print(f"\n📊 Monthly Adoption Rates by Team ({span}):")
 print(
     team_monthly
+    .assign(month=period_labels(team_monthly['month']))
     .to_string(
         index=False,
         formatters={'adoption_rate': '{:.1f}%'.format}
@@ -37,7 +45,7 @@ print(
 # 5. Compute overall totals across Jan-Apr for each team
 overall = (
     team_monthly
-    .groupby('team')
+    .groupby('team', observed=True)
     .agg(
         total_tasks_overall=('total_tasks', 'sum'),
         ai_tasks_overall   =('ai_tasks',    'sum')
@@ -46,7 +54,7 @@ overall = (
     .reset_index()
 )
 
-print("\n📊 Overall Adoption by Team (Jan-Apr 2025):")
+print(f"\n📊 Overall Adoption by Team ({span}):")
 print(
     overall
     .to_string(
@@ -55,42 +63,12 @@ print(
     )
 )
 
-# 6. Build KPI table with all Δ variants
-records = []
-for team, df in team_monthly.groupby('team'):
-    df = df.set_index('month')
-    # rates at each month
-    jan = df.at[start, 'adoption_rate']
-    feb = df.at[pd.Timestamp('2025-02-01'), 'adoption_rate']
-    mar = df.at[pd.Timestamp('2025-03-01'), 'adoption_rate']
-    apr = df.at[end,   'adoption_rate']
-    # absolute difference Apr–Jan (%-points)
-    abs_change = apr - jan
-    # relative % change Apr vs Jan
-    rel_change = (apr - jan) / jan * 100 if jan != 0 else float('nan')
-    # month-to-month absolute deltas
-    abs_deltas = [feb - jan, mar - feb, apr - mar]
-    avg_mom_abs = sum(abs_deltas) / len(abs_deltas)
-    # month-to-month relative deltas
-    rel_deltas = [
-        (feb - jan) / jan * 100 if jan != 0 else float('nan'),
-        (mar - feb) / feb * 100 if feb != 0 else float('nan'),
-        (apr - mar) / mar * 100 if mar != 0 else float('nan'),
-    ]
-    avg_mom_rel = sum([x for x in rel_deltas if pd.notna(x)]) / len([x for x in rel_deltas if pd.notna(x)])
-    records.append({
-        'team':                  team,
-        'Jan_rate':              jan,
-        'Feb_rate':              feb,
-        'Mar_rate':              mar,
-        'Apr_rate':              apr,
-        'Δ abs % (Apr–Jan)':     abs_change,
-        'Avg MoM abs %':         avg_mom_abs,
-        'Δ rel % (Apr–Jan)':     rel_change,
-        'Avg MoM rel %':         avg_mom_rel,
-    })
-
-trend = pd.DataFrame(records)
+# 6. Build KPI table with all Δ variants for every month in the window
+matrices = adoption_matrices(ums, window, ai='ai_tasks', total='total_tasks')
+trend = trend_table(matrices['team_ai'], matrices['team_total'])
+trend = trend.rename(columns=dict(zip(month_labels(window), labels)))
+abs_col, rel_col = delta_columns(month_labels(window))
+trend = trend[['team'] + labels + [abs_col, 'Avg MoM abs %', rel_col, 'Avg MoM rel %']]
 
 # 7. Print the full KPI table
 print("\n📈 Adoption Change KPIs by Team:")
@@ -99,14 +77,11 @@ print(
     .to_string(
         index=False,
         formatters={
-            'Jan_rate':            '{:.1f}%'.format,
-            'Feb_rate':            '{:.1f}%'.format,
-            'Mar_rate':            '{:.1f}%'.format,
-            'Apr_rate':            '{:.1f}%'.format,
-            'Δ abs % (Apr–Jan)':   '{:+.1f}%'.format,
-            'Avg MoM abs %':       '{:+.1f}%'.format,
-            'Δ rel % (Apr–Jan)':   '{:+.1f}%'.format,
-            'Avg MoM rel %':       '{:+.1f}%'.format,
+            **{label: '{:.1f}%'.format for label in labels},
+            abs_col:         '{:+.1f}%'.format,
+            'Avg MoM abs %': '{:+.1f}%'.format,
+            rel_col:         '{:+.1f}%'.format,
+            'Avg MoM rel %': '{:+.1f}%'.format,
         }
     )
 )
@@ -1,20 +1,27 @@
 # monthly_adoption_by_user_streamlit.py
 # Streamlit app: Monthly Adoption Rates & Δ‐Metrics by Individual User
 
-import pandas as pd
 import numpy as np
 import streamlit as st
 import altair as alt
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[3]))  # repo root
+from analytics.loader import load_monthly_summary
+from analytics.trends import add_trend_columns, delta_columns, month_labels, month_window, window_label
 
 # 1. Load user×month summary
-ums = pd.read_csv('data/user_monthly_summary.csv', parse_dates=['month'])
+ums = load_monthly_summary()
 
 # 2. Restrict to 2025‐01 through 2025‐04 (ignore partial May)
-start = pd.Timestamp('2025-01-01')
-end   = pd.Timestamp('2025-04-01')
-ums   = ums[(ums['month'] >= start) & (ums['month'] <= end)]
+window = month_window('2025-04', 4)
+labels = month_labels(window)
+first, last = labels[0].removesuffix(' %'), labels[-1].removesuffix(' %')
+abs_col, rel_col = delta_columns(labels)
+ums    = ums[ums['month'].isin(window)]
 
-# 3. Pivot to get one row per user with Jan–Apr adoption rates
+# 3. Pivot to get one row per user with one adoption rate per month
 user_rates = (
     ums
     .pivot_table(
@@ -22,128 +29,62 @@ user_rates = (
         columns='month',
         values='adoption_rate'
     )
+    .reindex(columns=window)
+    .set_axis(labels, axis=1)   # friendly month labels
     .reset_index()
 )
-# rename month columns to friendly labels
-month_map = {
-    pd.Timestamp('2025-01-01'): 'Jan %',
-    pd.Timestamp('2025-02-01'): 'Feb %',
-    pd.Timestamp('2025-03-01'): 'Mar %',
-    pd.Timestamp('2025-04-01'): 'Apr %'
-}
-user_rates = user_rates.rename(columns=month_map)
-
-# 4. Compute Δ‐metrics
-
-# 4a) Absolute difference Apr – Jan
-user_rates['Δ abs % (Apr–Jan)'] = user_rates['Apr %'] - user_rates['Jan %']
-
-# 4b) Avg MoM absolute change (ignore missing months)
-def avg_abs_deltas(row):
-    vals = [row[m] for m in ['Jan %','Feb %','Mar %','Apr %'] if pd.notnull(row.get(m))]
-    if len(vals) < 2:
-        return np.nan
-    deltas = [vals[i] - vals[i-1] for i in range(1, len(vals))]
-    return sum(deltas) / len(deltas)
-
-user_rates['Avg MoM abs %'] = user_rates.apply(avg_abs_deltas, axis=1)
-
-# 4c) Relative % change Apr vs Jan
-user_rates['Δ rel % (Apr–Jan)'] = (
-    (user_rates['Apr %'] - user_rates['Jan %']) /
-    user_rates['Jan %'] * 100
-).replace([np.inf, -np.inf], np.nan)
-
-# 4d) Avg MoM relative % change (ignore missing months)
-def avg_rel_deltas(row):
-    vals = [row[m] for m in ['Jan %','Feb %','Mar %','Apr %'] if pd.notnull(row.get(m))]
-    rels = []
-    for i in range(1, len(vals)):
-        prev, curr = vals[i-1], vals[i]
-        if prev != 0:
-            rels.append((curr - prev) / prev * 100)
-    return sum(rels) / len(rels) if rels else np.nan
-
-user_rates['Avg MoM rel %'] = user_rates.apply(avg_rel_deltas, axis=1)
 
-# 5. Determine number of months present
-user_rates['n_months'] = user_rates[['Jan %','Feb %','Mar %','Apr %']].notna().sum(axis=1)
-
-# 6. Count declining months (negative abs delta)
-def count_declines(row):
-    vals = [row[m] for m in ['Jan %','Feb %','Mar %','Apr %'] if pd.notnull(row.get(m))]
-    deltas = [vals[i] - vals[i-1] for i in range(1, len(vals))]
-    return sum(1 for d in deltas if d < 0)
-
-user_rates['decline_count'] = user_rates.apply(count_declines, axis=1)
-
-# 7. Flag status
+# 4. Compute Δ‐metrics (missing months are skipped), vectorized over all users
 #  - Not enough data if <2 months
 #  - Full Adopter if all non-null rates ==100
 #  - Stagnant/Declining if decline_count>0
 #  - Growing otherwise
-def compute_status(row):
-    if row['n_months'] < 2:
-        return 'Not enough data'
-    # check all non-null months == 100
-    rates = [row[m] for m in ['Jan %','Feb %','Mar %','Apr %'] if pd.notnull(row.get(m))]
-    if all(r == 100 for r in rates):
-        return 'Full Adopter'
-    if row['decline_count'] > 0:
-        return 'Stagnant/Declining'
-    return 'Growing'
-
-user_rates['overall status'] = user_rates.apply(compute_status, axis=1)
-
-# 8. Build severity label for coloring
-def severity_label(row):
-    if row['overall status'] == 'Stagnant/Declining':
-        return f"Decline {int(row['decline_count'])} mo"
-    return row['overall status']
+user_rates = (
+    add_trend_columns(user_rates, labels, rule='declines')
+    .rename(columns={'Status': 'overall status'})
+)
 
-user_rates['severity'] = user_rates.apply(severity_label, axis=1)
+# 5. Build severity label for coloring
+user_rates['severity'] = np.where(
+    user_rates['overall status'] == 'Stagnant/Declining',
+    'Decline ' + user_rates['decline_count'].astype(str) + ' mo',
+    user_rates['overall status']
+)
 
-# 9. Streamlit UI
+# 6. Streamlit UI
 st.set_page_config(page_title="User Adoption Δ‐Metrics", layout="wide")
-st.title("📊 User Adoption Change KPIs (Jan–Apr 2025)")
+st.title(f"📊 User Adoption Change KPIs ({window_label(window)})")
 
 # show full table
 fmt = {
-    'Jan %':             '{:.1f}%'.format,
-    'Feb %':             '{:.1f}%'.format,
-    'Mar %':             '{:.1f}%'.format,
-    'Apr %':             '{:.1f}%'.format,
-    'Δ abs % (Apr–Jan)': '{:+.1f}%'.format,
+    **{label: '{:.1f}%'.format for label in labels},
+    abs_col:             '{:+.1f}%'.format,
     'Avg MoM abs %':     '{:+.1f}%'.format,
-    'Δ rel % (Apr–Jan)': '{:+.1f}%'.format,
+    rel_col:             '{:+.1f}%'.format,
     'Avg MoM rel %':     '{:+.1f}%'.format,
     'decline_count':     '{:.0f}'.format,
 }
 st.dataframe(
     user_rates[
-        ['user_id','full_name','overall status','decline_count','Jan %','Feb %','Mar %','Apr %',
-         'Δ abs % (Apr–Jan)','Avg MoM abs %','Δ rel % (Apr–Jan)','Avg MoM rel %']
+        ['user_id','full_name','overall status','decline_count'] + labels
+        + [abs_col,'Avg MoM abs %',rel_col,'Avg MoM rel %']
     ]
     .style.format(fmt)
 )
 
-# 10. Highlight in bar chart with severity colors
-color_domain = [
-    'Growing',
-    'Not enough data',
-    'Full Adopter',
-    'Decline 1 mo',
-    'Decline 2 mo',
-    'Decline 3 mo'
+# 7. Highlight in bar chart with severity colors
+color_domain = ['Growing', 'Not enough data', 'Full Adopter'] + [
+    f'Decline {n} mo' for n in range(1, len(labels))
 ]
-color_range = ['green','gray','blue','yellow','orange','red']
+decline_colors = ['yellow','orange','red'] + ['darkred'] * max(0, len(labels) - 4)
+color_range = ['green','gray','blue'] + decline_colors[:len(labels) - 1]
 
 chart = (
     alt.Chart(user_rates)
     .mark_bar()
     .encode(
         x=alt.X('full_name:N', sort='-y', title='User'),
-        y=alt.Y('Δ abs % (Apr–Jan):Q', title='Absolute Change (Apr vs Jan) %'),
+        y=alt.Y(f'{abs_col}:Q', title=f'Absolute Change ({last} vs {first}) %'),
         color=alt.Color(
             'severity:N',
             scale=alt.Scale(domain=color_domain, range=color_range),
@@ -151,13 +92,13 @@ chart = (
         ),
         tooltip=[
             'full_name',
-            alt.Tooltip('Jan %', format='.1f'),
-            alt.Tooltip('Apr %', format='.1f'),
+            alt.Tooltip(labels[0], format='.1f'),
+            alt.Tooltip(labels[-1], format='.1f'),
             alt.Tooltip('decline_count:Q', title='Decline Count'),
-            alt.Tooltip('Δ abs % (Apr–Jan):Q', format='+.1f'),
+            alt.Tooltip(f'{abs_col}:Q', format='+.1f'),
             'overall status'
         ]
     )
 )
-st.subheader("Users: Absolute Adoption Δ (Apr vs Jan)")
+st.subheader(f"Users: Absolute Adoption Δ ({last} vs {first})")
 st.altair_chart(chart, use_container_width=True)
@@ -1,48 +1,59 @@
-import pandas as pd
-import numpy as np
 import streamlit as st
 import altair as alt
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2]))  # repo root
+from analytics import charts, st_cache
+from analytics.drift import load_monitor, read_alerts
+from analytics.st_tables import search_select
+from analytics.periods import labels
+from analytics.query import ENGINES
+from analytics.reports import THRESHOLD
 
 # App Config
 st.set_page_config(page_title="AI Quality Assessment Dashboard", layout="wide")
 st.title("🤖 AI Quality Assessment & Trend Explorer")
 
-# Load data
-ai_logs = pd.read_csv('data/ai_usage_logs.csv', parse_dates=['date'])
-users   = pd.read_csv('data/user_directory.csv', parse_dates=['join_date'])
-
-# Prepare AI-used entries with accuracy
-df = ai_logs[ai_logs['used_ai_tool'] & ai_logs['ai_prediction_accuracy'].notna()].copy()
-df['month'] = df['date'].dt.to_period('M')
+# every table comes from analytics.reports.compute_quality: precomputed by
+# compute_reports.py for the unfiltered view when the data hasn't changed
+# since, else run on the chosen query engine and cached per filter selection
+engine = st.sidebar.selectbox("Query engine", ENGINES)
+options = st_cache.report('quality_options', engine)[0]
+teams, tasks, user_ids, months = options
 
 # Sidebar filters
 st.sidebar.header("Filters")
-team_sel  = st.sidebar.multiselect("Teams", df['team'].unique(), df['team'].unique())
-task_sel  = st.sidebar.multiselect("Task Types", df['task_type'].unique(), df['task_type'].unique())
-user_sel  = st.sidebar.multiselect("Users", df['user_id'].unique(), df['user_id'].unique())
-month_sel = st.sidebar.multiselect("Months", df['month'].astype(str).unique(), df['month'].astype(str).unique())
-
-df = df[
-    df['team'].isin(team_sel) &
-    df['task_type'].isin(task_sel) &
-    df['user_id'].isin(user_sel) &
-    df['month'].astype(str).isin(month_sel)
-]
+team_sel  = st.sidebar.multiselect("Teams", teams, teams)
+task_sel  = st.sidebar.multiselect("Task Types", tasks, tasks)
+# users are searched and paged server-side rather than all sent to the browser
+names     = st_cache.frame('user_directory').set_index('user_id')['full_name']
+user_sel  = search_select(
+    "Users", user_ids, 'quality_users', container=st.sidebar,
+    labels=[f"{u} · {n}" for u, n in zip(user_ids, names.reindex(user_ids).fillna(''))],
+)
+month_sel = st.sidebar.multiselect("Months", months, months, format_func=lambda m: labels([m])[0])
+
+threshold  = round(st.sidebar.slider("Low-accuracy threshold", 0.50, 0.95, THRESHOLD, 0.01), 2)
+selection  = (tuple(team_sel), tuple(task_sel), tuple(int(u) for u in user_sel), tuple(month_sel))
+selection  = None if selection == options else selection
+tables, precomputed = st_cache.report('quality', engine, selection=selection, threshold=THRESHOLD)
+if threshold != THRESHOLD:
+    # the threshold tables alone, from the accuracy histograms (analytics.histograms)
+    tables = {**tables, **st_cache.report('thresholds', engine, selection=selection, threshold=threshold)[0]}
+if precomputed:
+    st.sidebar.caption("Showing precomputed results (compute_reports.py).")
+below = f"{threshold:.0%}"
+pct_col = {'pct_below_70': f'% below {below}'}   # the tables keep the column's original name
 
 # Average AI prediction accuracy by task type
 st.header("1. Avg AI Prediction Accuracy by Task & Team")
-acc_tt = df.groupby(['team','task_type'])['ai_prediction_accuracy'].mean().reset_index()
+acc_tt = tables['acc_tt']
 st.dataframe(acc_tt.style.format({'ai_prediction_accuracy':'{:.2f}'}), use_container_width=True)
 
 # Monthly Avg Accuracy pivot
 st.header("2. Monthly Avg Prediction Accuracy by Team & Task")
-acc_month = (
-    df
-    .groupby(['month','team','task_type'])['ai_prediction_accuracy']
-    .mean()
-    .unstack('month')
-    .reset_index()
-)
+acc_month = tables['acc_month']
 st.dataframe(
     acc_month.style.format(
         {col:'{:.2f}' for col in acc_month.columns if col not in ['team','task_type']}
@@ -50,140 +61,106 @@ st.dataframe(
     use_container_width=True
 )
 
-# ii. Outliers & concerning trends: predictions below 70%
+# ii. Outliers & concerning trends: predictions below the threshold
 
-# % Predictions <70%
-st.header("3. % of Predictions < 70% Accuracy")
-threshold   = 0.70
-total_preds = len(df)
-low_preds   = (df['ai_prediction_accuracy'] < threshold).sum()
-st.markdown(f"**Overall:** {(low_preds/total_preds)*100:.1f}% below 70%")
+# % Predictions below the threshold
+st.header(f"3. % of Predictions < {below} Accuracy")
+st.markdown(f"**Overall:** {tables['pct_overall']:.1f}% below {below}")
 
 st.subheader("By Team")
-pct_team = (
-    df
-    .groupby('team')['ai_prediction_accuracy']
-    .apply(lambda s: (s < threshold).mean() * 100)
-    .reset_index(name='pct_below_70')
-)
-st.dataframe(pct_team.style.format({'pct_below_70':'{:.1f}%'}), use_container_width=True)
+pct_team = tables['pct_team']
+st.dataframe(pct_team.rename(columns=pct_col).style.format({pct_col['pct_below_70']:'{:.1f}%'}), use_container_width=True)
 
 st.subheader("By Task")
-pct_task = (
-    df
-    .groupby('task_type')['ai_prediction_accuracy']
-    .apply(lambda s: (s < threshold).mean() * 100)
-    .reset_index(name='pct_below_70')
-)
-st.dataframe(pct_task.style.format({'pct_below_70':'{:.1f}%'}), use_container_width=True)
+pct_task = tables['pct_task']
+st.dataframe(pct_task.rename(columns=pct_col).style.format({pct_col['pct_below_70']:'{:.1f}%'}), use_container_width=True)
 
 st.subheader("By Team & Task")
-tt = (
-    df
-    .groupby(['team','task_type'])['ai_prediction_accuracy']
-    .apply(lambda s: (s < threshold).mean() * 100)
-    .reset_index(name='pct_below_70')
-)
-st.dataframe(tt.style.format({'pct_below_70':'{:.1f}%'}), use_container_width=True)
+tt = tables['pct_tt']
+st.dataframe(tt.rename(columns=pct_col).style.format({pct_col['pct_below_70']:'{:.1f}%'}), use_container_width=True)
 
 # 4–6: Drill into low‐accuracy entries and distributions
 
 
 # Accuracy distribution per task
 st.header("4. Accuracy Distribution by Task")
-for task in df['task_type'].unique():
+for task, stats in tables['task_stats'].items():
     st.subheader(task)
-    stats = df[df['task_type']==task]['ai_prediction_accuracy'].describe()
     st.write(stats.apply(lambda x: f"{x:.2f}"))
 
 # AI Accuracy by User & Team
-tie = df.merge(users[['user_id','full_name']], on='user_id', how='left')
 st.header("5. AI Accuracy by User & Team")
-usr_ac = tie.groupby(['user_id','full_name','team'])['ai_prediction_accuracy'].agg(['mean','count']).reset_index()
-usr_ac.columns = ['user_id','full_name','team','avg_accuracy','n_predictions']
+usr_ac = tables['usr_ac']
 st.dataframe(usr_ac.style.format({'avg_accuracy':'{:.2f}'}), use_container_width=True)
 
 # Low-accuracy entries
-st.header("6. Entries with Accuracy < 70%")
-low = tie[tie['ai_prediction_accuracy'] < threshold][
-    ['user_id','full_name','team','task_type','date','ai_prediction_accuracy']
-]
+st.header(f"6. Entries with Accuracy < {below}")
+low = tables['low']
 st.dataframe(low.style.format({'ai_prediction_accuracy':'{:.2f}'}), use_container_width=True)
 
+# slope, intercept, r², standard error of the slope and n per group
+fit_fmt = {'intercept':'{:.3f}', 'r2':'{:.3f}', 'stderr':'{:.3f}', 'n':'{:,}'}
+
 # Adoption Rate vs. Prediction Accuracy (Overall)
 st.header("7. Adoption Rate vs. Prediction Accuracy")
-df_adopt    = ai_logs.groupby(['team','user_id'])['used_ai_tool'].mean().reset_index(name='user_adoption_rate')
-df_acc_user = df.groupby('user_id')['ai_prediction_accuracy'].mean().reset_index(name='user_avg_accuracy')
-df_user     = df_adopt.merge(df_acc_user, on='user_id')
+# raw users, or counts per bin for large teams (analytics.chart_data)
+points7 = tables['points7']
 
-chart_scatter = alt.Chart(df_user).mark_circle(size=60).encode(
+chart_scatter = alt.Chart(points7).mark_circle().encode(
     x=alt.X('user_adoption_rate:Q', title='User Adoption Rate'),
     y=alt.Y('user_avg_accuracy:Q', title='User Avg Prediction Accuracy',
             scale=alt.Scale(domain=[0.56, 1.0])),
     color='team:N',
+    size=charts.point_size(points7),
     tooltip=['user_id','team',
              alt.Tooltip('user_adoption_rate:Q', format='.2f'),
              alt.Tooltip('user_avg_accuracy:Q', format='.2f')]
 )
-reg_line = chart_scatter.transform_regression(
-    'user_adoption_rate','user_avg_accuracy',groupby=['team']
-).mark_line()
+# fitted lines come with the slope table below (analytics.regression)
+reg_line = alt.Chart(tables['lines7']).mark_line().encode(
+    x='user_adoption_rate:Q', y='user_avg_accuracy:Q', color='team:N'
+)
 st.altair_chart(chart_scatter + reg_line, use_container_width=True)
 
 # Compute and show slopes for Chart 7
-slopes7 = (
-    df_user
-    .groupby('team')
-    .apply(lambda g: np.polyfit(g['user_adoption_rate'], g['user_avg_accuracy'], 1)[0])
-    .reset_index(name='slope_adopt_to_acc')
-)
+slopes7 = tables['slopes7']
 st.subheader("7️⃣ Regression Slopes by Team (Adoption → Accuracy)")
-st.dataframe(slopes7.style.format({'slope_adopt_to_acc':'{:.3f}'}), use_container_width=True)
+st.dataframe(slopes7.style.format({'slope_adopt_to_acc':'{:.3f}', **fit_fmt}), use_container_width=True)
 
 # Avg Task Duration vs. Avg Prediction Accuracy (Overall)
 st.header("8. Avg Task Duration vs. Avg Prediction Accuracy")
-user_dur  = df.groupby('user_id')['task_duration_minutes'].mean().reset_index(name='user_avg_duration')
-df_user2  = user_dur.merge(df_acc_user, on='user_id').merge(df_adopt[['user_id','team']], on='user_id')
+points8 = tables['points8']
 
-chart_scatter2 = alt.Chart(df_user2).mark_circle(size=60).encode(
+chart_scatter2 = alt.Chart(points8).mark_circle().encode(
     x=alt.X('user_avg_accuracy:Q', title='User Avg Prediction Accuracy',
             scale=alt.Scale(domain=[0.56, 1.0])),
     y=alt.Y('user_avg_duration:Q', title='User Avg Task Duration (min)'),
     color='team:N',
+    size=charts.point_size(points8),
     tooltip=['user_id','team',
              alt.Tooltip('user_avg_accuracy:Q', format='.2f'),
              alt.Tooltip('user_avg_duration:Q', format='.1f')]
 )
-reg_line2 = chart_scatter2.transform_regression(
-    'user_avg_accuracy','user_avg_duration',groupby=['team']
-).mark_line()
+reg_line2 = alt.Chart(tables['lines8']).mark_line().encode(
+    x='user_avg_accuracy:Q', y='user_avg_duration:Q', color='team:N'
+)
 st.altair_chart(chart_scatter2 + reg_line2, use_container_width=True)
 
 # Compute and show slopes for Chart 8
-slopes8 = (
-    df_user2
-    .groupby('team')
-    .apply(lambda g: np.polyfit(g['user_avg_accuracy'], g['user_avg_duration'], 1)[0])
-    .reset_index(name='slope_acc_to_dur')
-)
+slopes8 = tables['slopes8']
 st.subheader("8️⃣ Regression Slopes by Team (Accuracy → Duration)")
-st.dataframe(slopes8.style.format({'slope_acc_to_dur':'{:.3f}'}), use_container_width=True)
+st.dataframe(slopes8.style.format({'slope_acc_to_dur':'{:.3f}', **fit_fmt}), use_container_width=True)
 
 # Prediction Accuracy Over Time by Team
 st.header("9. Prediction Accuracy Over Time by Team")
-team_trend = df.groupby(['month','team'])['ai_prediction_accuracy'].mean().reset_index()
-acc_team_line = alt.Chart(team_trend).mark_line(point=True).encode(
-    x='month:T',
-    y=alt.Y('ai_prediction_accuracy:Q', title='Avg Accuracy'),
-    color='team:N',
-    tooltip=['month','team', alt.Tooltip('ai_prediction_accuracy:Q', format='.2f')]
-).properties(height=300)
+team_trend = tables['team_trend']
+acc_team_line = charts.accuracy_trend(team_trend)
 st.altair_chart(acc_team_line, use_container_width=True)
 
 # Prediction Accuracy Over Time by Task Type
 st.header("10. Prediction Accuracy Over Time by Task Type")
-task_trend = df.groupby(['month','task_type'])['ai_prediction_accuracy'].mean().reset_index()
-acc_task_line = alt.Chart(task_trend).mark_line(point=True).encode(
+task_trend = tables['task_trend']
+acc_task_line = alt.Chart(charts.with_month_starts(task_trend)).mark_line(point=True).encode(
     x='month:T',
     y='ai_prediction_accuracy:Q',
     color='task_type:N',
@@ -193,8 +170,8 @@ st.altair_chart(acc_task_line, use_container_width=True)
 
 # Prediction Accuracy Over Time by Team & Task Type
 st.header("11. Prediction Accuracy Over Time by Team & Task Type")
-tt_trend = df.groupby(['month','team','task_type'])['ai_prediction_accuracy'].mean().reset_index()
-acc_tt_line = alt.Chart(tt_trend).mark_line(point=True).encode(
+tt_trend = tables['tt_trend']
+acc_tt_line = alt.Chart(charts.with_month_starts(tt_trend)).mark_line(point=True).encode(
     x='month:T',
     y='ai_prediction_accuracy:Q',
     color='team:N',
@@ -205,9 +182,12 @@ st.altair_chart(acc_tt_line, use_container_width=True)
 
 # 12. Accuracy vs. Duration Scatter by Team & Task
 st.header("12. Accuracy vs. Duration Scatter by Team & Task")
-for team in df['team'].unique():
-    for task in df['task_type'].unique():
-        sub = df[(df['team'] == team) & (df['task_type'] == task)]
+points12 = tables['points12']
+lines12 = tables['lines12']
+for team in points12['team'].unique():
+    for task in points12['task_type'].unique():
+        sub = points12[(points12['team'] == team) & (points12['task_type'] == task)]
+        line = lines12[(lines12['team'] == team) & (lines12['task_type'] == task)]
         if not sub.empty:
             st.subheader(f"{team} – {task}")
             base = alt.Chart(sub).encode(
@@ -220,33 +200,37 @@ for team in df['team'].unique():
                     alt.Tooltip('ai_prediction_accuracy:Q', format='.2f')
                 ]
             )
-            scatter = base.mark_circle(size=60)
+            scatter = base.mark_circle().encode(size=charts.point_size(sub))
             # regression line: Accuracy ~ Duration
-            reg_line = base.transform_regression(
-                'task_duration_minutes',
-                'ai_prediction_accuracy',
-                groupby=['team','task_type']
-            ).mark_line(color='firebrick')
+            reg_line = alt.Chart(line).mark_line(color='firebrick').encode(
+                x='task_duration_minutes:Q', y='ai_prediction_accuracy:Q'
+            )
             st.altair_chart((scatter + reg_line).properties(height=200, width=400), use_container_width=True)
 
 # compute & show slopes for this section (acc per min of duration)
 st.header("🔢 Regression Slopes by Team & Task (Accuracy → Duration)")
-slopes12 = (
-    df
-    .groupby(['team','task_type'])
-    .apply(lambda g: np.polyfit(
-        g['task_duration_minutes'],
-        g['ai_prediction_accuracy'],
-        1
-    )[0])
-    .reset_index(name='slope_acc_per_min')
-)
+slopes12 = tables['slopes12']
 # 'slope_acc_per_min' is Δ accuracy (in decimal) per 1 minute of duration
 st.dataframe(
-    slopes12.style.format({'slope_acc_per_min':'{:.4f}'}),
+    slopes12.style.format({'slope_acc_per_min':'{:.4f}', **fit_fmt, 'stderr':'{:.4f}'}),
     use_container_width=True
 )
 
+# Drift alerts: written by monitor_drift.py as new log rows arrive, only read here
+st.header("13. Accuracy Drift Alerts")
+monitor = load_monitor()
+if monitor is None:
+    st.info("No drift monitor state yet: run `python monitor_drift.py --follow 30`.")
+else:
+    alerts = read_alerts(last=20)
+    st.markdown(f"**{len(alerts)}** most recent alerts (threshold {monitor.threshold:.0%})")
+    st.dataframe(alerts.iloc[::-1], use_container_width=True)
+    st.subheader("Current state by Team & Task")
+    st.dataframe(
+        monitor.status().style.format({'ewma':'{:.3f}', 'ewma_low':'{:.1%}', 'page_hinkley':'{:.2f}', 'cusum':'{:.2f}'}),
+        use_container_width=True
+    )
+
 
 # footer note
 st.markdown("---")
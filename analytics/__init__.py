@@ -0,0 +1 @@
+"""Shared data-access and aggregation helpers for the analysis dashboards."""
@@ -0,0 +1,78 @@
+"""Server-side reduction of chart data, so a chart's spec stays small.
+
+Altair embeds every row it is given in the Vega spec, so a chart drawn from
+raw rows grows with the logs (and stops at its 5,000-row limit). The reports
+hand the dashboards reduced frames instead:
+
+  reduce_points  scatter data: a group's own rows while it has at most
+                 `max_points`, otherwise a bins × bins grid of counts at the
+                 bin centres ('count' column; 1 for raw rows)
+  top_n          bar data: the `n` largest-magnitude bars plus one 'other'
+                 bar for the mean of the rest
+
+Both leave data at the sample's scale untouched, and cap what a chart
+carries at roughly max_points (or bins², or n) marks per group.
+"""
+import numpy as np
+import pandas as pd
+
+MAX_POINTS = 1000
+BINS = 40
+MAX_BARS = 200
+
+
+def _bin_index(values, low, high, bins):
+    span = np.where(high > low, high - low, 1.0)
+    return np.clip(((values - low) / span * bins).astype(np.int64), 0, bins - 1)
+
+
+def reduce_points(df, x, y, by=(), columns=(), max_points=MAX_POINTS, bins=BINS):
+    """Scatter points of `y` against `x` per `by` group, at most max_points
+    (or bins²) per group.
+
+    Groups within the limit keep their rows (with the extra `columns`, e.g.
+    for tooltips) and count 1; larger groups become counts per bin.
+    """
+    by = list(by)
+    data = df[by + [x, y] + list(columns)].dropna(subset=[x, y])
+    sizes = data.groupby(by, observed=True, sort=False)[x].transform('size') if by else len(data)
+    small = np.asarray(sizes <= max_points) if by else np.full(len(data), len(data) <= max_points)
+
+    raw = data[small].assign(count=1)
+    big = data[~small]
+    if big.empty:
+        return raw.reset_index(drop=True)
+
+    # bins span each group's own x and y range
+    groups = big.groupby(by, observed=True, sort=False) if by else None
+    values = {}
+    for col in [x, y]:
+        v = big[col].to_numpy(dtype=np.float64)
+        low = groups[col].transform('min').to_numpy(np.float64) if by else np.full(len(v), v.min())
+        high = groups[col].transform('max').to_numpy(np.float64) if by else np.full(len(v), v.max())
+        index = _bin_index(v, low, high, bins)
+        width = np.where(high > low, high - low, 0.0) / bins
+        values[col] = low + (index + 0.5) * width
+    binned = (
+        big[by].assign(**values)
+        .groupby(by + [x, y], observed=True, sort=False)
+        .size()
+        .reset_index(name='count')
+    )
+    return pd.concat([raw, binned], ignore_index=True)
+
+
+def top_n(df, value, n=MAX_BARS, other=None):
+    """Rows with the `n - 1` largest |value| plus one row of `other` values
+    holding the mean value of the rest (all rows if there are at most `n`).
+
+    Row order is kept, with the 'other' row last; `n_rows` counts the rows a
+    bar stands for. String values in `other` may use '{n}' for that count.
+    """
+    if len(df) <= n:
+        return df.assign(n_rows=1)
+    keep = df[value].abs().fillna(-np.inf).rank(method='first', ascending=False) <= n - 1
+    rest = df[~keep]
+    row = {k: v.format(n=f'{len(rest):,}') if isinstance(v, str) else v for k, v in (other or {}).items()}
+    row.update({value: rest[value].mean(), 'n_rows': len(rest)})
+    return pd.concat([df[keep].assign(n_rows=1), pd.DataFrame([row])], ignore_index=True)
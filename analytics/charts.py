@@ -0,0 +1,98 @@
+"""Altair charts shared by the dashboards and the pipeline's published charts.
+
+Each function takes the table of the same name from analytics.reports and
+returns the chart; st.altair_chart renders it, Chart.save writes it as a
+standalone HTML page. Month ordinals (analytics.periods) are drawn as their
+month's first day (with_month_starts).
+"""
+import altair as alt
+
+from analytics.periods import starts
+
+
+def with_month_starts(table):
+    """`table` with its 'month' ordinals replaced by month-start dates."""
+    return table.assign(month=starts(table['month']))
+
+
+def adoption_by_task(overall_tt):
+    """Adoption rate per team, one bar per task type (compute_adoption 'overall_tt')."""
+    return (
+        alt.Chart(overall_tt)
+        .mark_bar()
+        .encode(
+            x=alt.X('team:N', title='Team'),
+            xOffset='task_type:N',
+            y=alt.Y('overall_adoption_rate:Q', title='Adoption Rate (%)'),
+            color=alt.Color('task_type:N', title='Task Type'),
+            tooltip=[
+                'team',
+                'task_type',
+                alt.Tooltip('overall_adoption_rate:Q', format='.1f', title='Adoption %')
+            ]
+        )
+        .properties(height=300)
+    )
+
+
+def team_trend(team_monthly):
+    """Monthly adoption rate per team (compute_adoption 'team_monthly')."""
+    return (
+        alt.Chart(with_month_starts(team_monthly))
+        .mark_line(point=True)
+        .encode(
+            x=alt.X('month:T', title='Month'),
+            y=alt.Y('adoption:Q', title='Adoption Rate (%)'),
+            color='team:N',
+            tooltip=['team', 'month', alt.Tooltip('adoption:Q', format='.1f')]
+        )
+        .properties(height=300)
+    )
+
+
+def time_saved(percent_saved):
+    """% time saved per task type and team, one bar per team with its 95%
+    bootstrap interval as an error bar (compute_efficiency 'percent_saved')."""
+    y = alt.Y('task_type:N', title='Task Type',
+              sort=alt.EncodingSortField('pct_time_saved', op='mean', order='descending'))
+    base = alt.Chart(percent_saved).encode(
+        y=y,
+        yOffset='team:N',
+        tooltip=[
+            'team', 'task_type',
+            alt.Tooltip('pct_time_saved:Q', format='.1f', title='% Saved'),
+            alt.Tooltip('pct_time_saved_lo:Q', format='.1f', title='95% CI low'),
+            alt.Tooltip('pct_time_saved_hi:Q', format='.1f', title='95% CI high'),
+        ]
+    )
+    bars = base.mark_bar().encode(x=alt.X('pct_time_saved:Q', title='Time Saved (%)'), color='team:N')
+    # a rule rather than mark_errorbar: composite marks drop the yOffset
+    errors = base.mark_rule(color='black').encode(x='pct_time_saved_lo:Q', x2='pct_time_saved_hi:Q')
+    return (bars + errors).properties(height=400)
+
+
+def accuracy_trend(team_trend):
+    """Monthly mean accuracy per team (compute_quality 'team_trend')."""
+    return alt.Chart(with_month_starts(team_trend)).mark_line(point=True).encode(
+        x='month:T',
+        y=alt.Y('ai_prediction_accuracy:Q', title='Avg Accuracy'),
+        color='team:N',
+        tooltip=['month', 'team', alt.Tooltip('ai_prediction_accuracy:Q', format='.2f')]
+    ).properties(height=300)
+
+
+def point_size(points, size=60):
+    """Size encoding for analytics.chart_data.reduce_points output: a fixed
+    size for raw points, the bin's count once a group has been binned."""
+    if (points['count'] > 1).any():
+        return alt.Size('count:Q', title='Points')
+    return alt.value(size)
+
+
+# published by the pipeline: chart name -> (report, table, chart function)
+PUBLISHED = {
+    'adoption_by_task':  ('adoption',   'overall_tt',    adoption_by_task),
+    'team_adoption':     ('adoption',   'team_monthly',  team_trend),
+    'time_saved':        ('efficiency', 'percent_saved', time_saved),
+    'accuracy_by_team':  ('quality',    'team_trend',    accuracy_trend),
+}
@@ -0,0 +1,251 @@
+"""Pre-aggregated task cube at (team, task_type, day, method, user_id) grain.
+
+Every dashboard table is a roll-up of this cube instead of another groupby
+over the raw logs. Each cell holds the task count plus count, sum, M2 (sum
+of squared deviations from the cell mean), min and max of task duration
+('dur_*') and AI prediction accuracy ('acc_*'). Cells merge with the
+Chan/Welford parallel update, which is enough to roll up means, totals,
+variances and extremes to any coarser grain without the cancellation of a
+sum-of-squares.
+
+The logs are aggregated once, into this daily base cube (days are int32 day
+ordinals, analytics.periods). The week, month and quarter cubes are merges
+of its cells (period_cube), with the 'day' dimension replaced by that
+period's ordinal, so every granularity gives the same totals, means and
+variances as a groupby over the rows, with no further pass over the logs.
+
+The same merge makes the cube streamable: build_cube_streaming aggregates
+the logs chunk by chunk and folds each partial cube into the running one,
+so memory is bounded by the number of cells, not the number of rows.
+
+build_cube_parallel shards the rows by user_id hash (or team) across a
+process pool instead; cells never span shards, so the shard cubes just
+concatenate.
+
+Manual-log rows take each user's team from the user→team index
+(analytics.teams). The cube is materialized under data/.cache/ and rebuilt
+only when one of the source logs changes.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analytics.loader import (
+    CACHE_DIR_NAME, CHUNK_BYTES, DATA_DIR, SOURCES, ensure_cache, file_version, iter_csv_chunks,
+    load_ai_logs, load_manual_logs, read_arrow, source_path, source_version, widen_float32, write_arrow
+)
+from analytics.parallel import default_workers, map_shards, shard_frame
+from analytics.periods import GRANULARITIES, convert, ordinals
+from analytics.schema import as_categories, category_dtype, schema_digest
+from analytics.teams import user_team_map
+
+DIMENSIONS = ['team', 'task_type', 'month', 'method', 'user_id']
+MEASURES = {
+    'dur': 'task_duration_minutes',
+    'acc': 'ai_prediction_accuracy',
+}
+
+
+def dimensions(granularity='month'):
+    """The cube's dimensions with time at `granularity` ('day' for the base)."""
+    return [granularity if dim == 'month' else dim for dim in DIMENSIONS]
+
+
+BASE_DIMENSIONS = dimensions('day')
+
+
+def _methods(is_ai):
+    # 'AI'/'Manual' as int8 codes rather than one string per row
+    codes = np.where(np.asarray(is_ai, dtype=bool), 0, 1).astype(np.int8)
+    return pd.Categorical.from_codes(codes, dtype=category_dtype('method'))
+
+
+def ai_task_rows(ai_logs):
+    """AI-log rows tagged with method ('AI'/'Manual') and day ordinal."""
+    ai = ai_logs.assign(
+        method=_methods(ai_logs['used_ai_tool']),
+        day=ordinals(ai_logs['date'], 'day'),
+    )
+    return ai[BASE_DIMENSIONS + list(MEASURES.values())]
+
+
+def manual_task_rows(manual_logs, team_map):
+    """Manual-log rows with the user's team from `team_map` (NaN if unknown)."""
+    manual = manual_logs.assign(
+        team=manual_logs['user_id'].map(team_map),
+        method=_methods(np.zeros(len(manual_logs), dtype=bool)),
+        day=ordinals(manual_logs['date'], 'day'),
+        ai_prediction_accuracy=np.float32('nan'),
+    )
+    return manual[BASE_DIMENSIONS + list(MEASURES.values())]
+
+
+def task_rows(ai_logs, manual_logs, team_map):
+    """AI and manual logs as one frame tagged with method ('AI'/'Manual').
+
+    Manual-log rows take the user's team from `team_map`; users missing from
+    it keep a NaN team, so they count towards all-team totals but no team.
+    """
+    manual = manual_task_rows(manual_logs, team_map)
+    manual = manual.astype({'team': ai_logs['team'].dtype})
+    return pd.concat([ai_task_rows(ai_logs), manual], ignore_index=True)
+
+
+def build_cube(rows, dims=BASE_DIMENSIONS):
+    """Aggregate task rows to one cube cell per distinct `dims` combination."""
+    rows = rows[dims].assign(**{
+        f'_{p}': widen_float32(rows[col]) if rows[col].dtype == np.float32 else rows[col].astype('float64')
+        for p, col in MEASURES.items()
+    })
+    agg = {'tasks': ('method', 'size')}
+    for p in MEASURES:
+        agg.update({
+            f'{p}_count': (f'_{p}', 'count'),
+            f'{p}_sum':   (f'_{p}', 'sum'),
+            f'{p}_m2':    (f'_{p}', 'var'),
+            f'{p}_min':   (f'_{p}', 'min'),
+            f'{p}_max':   (f'_{p}', 'max'),
+        })
+    cube = rows.groupby(dims, observed=True, dropna=False).agg(**agg).reset_index()
+    for p in MEASURES:
+        # sample variance → M2; cells with < 2 values have no spread
+        cube[f'{p}_m2'] = (cube[f'{p}_m2'] * (cube[f'{p}_count'] - 1)).fillna(0)
+    return cube
+
+
+def merge_cells(cells, by, dropna=True):
+    """Combine cube cells that share the `by` dimensions.
+
+    Counts and sums add, min/max fold, and M2 follows Chan et al.:
+    M2 = Σ M2_i + Σ n_i·(mean_i − mean)², which stays exact for any split of
+    the rows into cells or chunks.
+    """
+    groups = cells.groupby(by, observed=True, dropna=dropna, sort=True)
+    spread = {}
+    for p in MEASURES:
+        n_i, sum_i = cells[f'{p}_count'], cells[f'{p}_sum']
+        mean = groups[f'{p}_sum'].transform('sum') / groups[f'{p}_count'].transform('sum')
+        spread[f'_{p}_spread'] = (n_i * (sum_i / n_i.where(n_i > 0) - mean) ** 2).fillna(0)
+
+    agg = {col: 'sum' for col in ['tasks', 'ai_tasks'] if col in cells}
+    for p in MEASURES:
+        agg.update({
+            f'{p}_count': 'sum', f'{p}_sum': 'sum', f'{p}_m2': 'sum',
+            f'{p}_min': 'min', f'{p}_max': 'max', f'_{p}_spread': 'sum',
+        })
+    out = (
+        cells.assign(**spread)
+        .groupby(by, observed=True, dropna=dropna, sort=True)
+        .agg(agg)
+        .reset_index()
+    )
+    for p in MEASURES:
+        out[f'{p}_m2'] += out.pop(f'_{p}_spread')
+    return out
+
+
+def slice_cube(cube, **where):
+    """Cells matching every filter; a list/array value means 'isin'."""
+    mask = np.ones(len(cube), dtype=bool)
+    for dim, value in where.items():
+        if isinstance(value, (list, tuple, set, np.ndarray, pd.Index)):
+            mask &= cube[dim].isin(value).to_numpy()
+        else:
+            mask &= (cube[dim] == value).to_numpy()
+    return cube[mask]
+
+
+def period_cube(base, granularity='month'):
+    """The cube at `granularity` ('week', 'month' or 'quarter'): the daily
+    base's cells merged per bucket, exactly as if built from the rows."""
+    cells = base.assign(**{granularity: convert(base['day'], 'day', granularity)})
+    return merge_cells(cells, dimensions(granularity), dropna=False)
+
+
+def cube_path(data_dir=DATA_DIR, granularity='month'):
+    name = 'cube.arrow' if granularity == 'month' else f'cube-{granularity}.arrow'
+    return Path(data_dir) / CACHE_DIR_NAME / name
+
+
+def build_cube_streaming(data_dir=DATA_DIR, chunk_bytes=CHUNK_BYTES):
+    """The daily base cube, built without holding either log in memory.
+
+    The user→team index is brought up to date in chunks, then each log is
+    read once; every chunk becomes a partial cube that is merged into the
+    running one.
+    """
+    teams = user_team_map(data_dir, chunk_bytes, use_cache=False)
+    to_rows = {
+        'ai_usage_logs':    ai_task_rows,
+        'manual_task_logs': lambda rows: manual_task_rows(rows, teams),
+    }
+    cube = None
+    for name, rows_of in to_rows.items():
+        path, types = source_path(name, data_dir), SOURCES[name]['types']
+        for chunk, _ in iter_csv_chunks(path, types, chunk_bytes=chunk_bytes, final=True):
+            part = build_cube(rows_of(chunk))
+            cube = part if cube is None else merge_cells(pd.concat([cube, part]), BASE_DIMENSIONS, dropna=False)
+
+    # same categorical dims as the in-memory build
+    return as_categories(cube, ['team', 'task_type']).sort_values(BASE_DIMENSIONS, ignore_index=True)
+
+
+def _cube_shard(data_dir, teams, by, shard, n_shards):
+    ai_logs = shard_frame('ai_usage_logs', data_dir, shard, n_shards, by)
+    manual_logs = shard_frame('manual_task_logs', data_dir, shard, n_shards, by, teams)
+    return build_cube(task_rows(ai_logs, manual_logs, teams))
+
+
+def build_cube_parallel(data_dir=DATA_DIR, workers=None, by='user_id'):
+    """The daily base cube, aggregated shard by shard in a process pool.
+
+    `by` is 'user_id' (hash-partitioned, scales with the worker count) or
+    'team' (at most one busy worker per team).
+    """
+    # build the Arrow caches here, not in every worker at once
+    for name in ['ai_usage_logs', 'manual_task_logs']:
+        ensure_cache(name, data_dir)
+    teams = user_team_map(data_dir)
+    parts = map_shards(_cube_shard, workers or default_workers(), data_dir, teams, by)
+    # empty shards (e.g. more workers than teams) carry no dtypes worth keeping
+    parts = [part for part in parts if len(part)] or parts[:1]
+    return pd.concat(parts, ignore_index=True).sort_values(BASE_DIMENSIONS, ignore_index=True)
+
+
+def load_cube(data_dir=DATA_DIR, granularity='month', streaming=False, chunk_bytes=CHUNK_BYTES, workers=1):
+    """Materialized cube at `granularity`, rebuilt only when a source log has changed.
+
+    'day' is the base cube, aggregated from the logs; the others are rolled
+    up from it (period_cube), so a rebuild reads the logs once however many
+    granularities are asked for. With streaming=True the base is built from
+    the CSVs in `chunk_bytes` chunks instead of loading them whole; with
+    workers > 1 it runs on that many processes. The result is the same
+    either way.
+    """
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"unknown granularity: {granularity!r} (expected one of {GRANULARITIES})")
+    data_dir = Path(data_dir)
+    version = file_version if streaming else source_version
+    versions = {
+        name: version(name, data_dir)
+        for name in ['ai_usage_logs', 'manual_task_logs']
+    }
+    versions['schema'] = schema_digest(dimensions(granularity) + list(MEASURES.values()))
+    path = cube_path(data_dir, granularity)
+    if path.exists():
+        table, meta = read_arrow(path)
+        if all(meta.get(k) == v for k, v in versions.items()):
+            return table.to_pandas(date_as_object=False)
+
+    if granularity != 'day':
+        cube = period_cube(load_cube(data_dir, 'day', streaming, chunk_bytes, workers), granularity)
+    elif streaming:
+        cube = build_cube_streaming(data_dir, chunk_bytes)
+    elif workers > 1:
+        cube = build_cube_parallel(data_dir, workers)
+    else:
+        rows = task_rows(load_ai_logs(data_dir), load_manual_logs(data_dir), user_team_map(data_dir))
+        cube = build_cube(rows)
+    write_arrow(cube, path, metadata=versions)
+    return cube
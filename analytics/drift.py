@@ -0,0 +1,220 @@
+"""Online accuracy drift monitor over the AI log, one prediction at a time.
+
+Every AI-used prediction with an accuracy updates the state of its
+(team, task_type) group, which is a fixed number of numbers whatever the
+log size:
+
+  ewma       exponentially weighted mean accuracy and share below the
+             threshold (weight ALPHA), for display
+  mean drop  Page-Hinkley test on the accuracy: U accumulates the running
+             mean minus each value minus PH_DELTA, and a fall of the mean
+             alerts once U climbs PH_LAMBDA above its minimum
+  low share  one-sided CUSUM on 'accuracy < threshold': S accumulates
+             (below? 1 : 0) − baseline share − SHARE_MARGIN / 2, and a rise
+             of the share alerts once S passes CUSUM_H
+  reservoir  a uniform sample of RESERVOIR predictions (Algorithm R), to
+             look at what a group's predictions are like
+
+Both tests learn their baseline over the first WARMUP predictions of a
+group, and start over (new baseline) after an alert, so a lasting shift
+alerts once and then becomes the new normal.
+
+update_drift() feeds the monitor the AI-log rows appended since its last
+run, found by a byte watermark as in analytics.summary, and appends alerts
+to data/.cache/drift/alerts.jsonl. Polling it (monitor_drift.py --follow)
+gives detection within the poll interval, with no report recomputed.
+
+The tests are sequential, so the order rows are folded in matters: each
+chunk read is sorted by date, and appended rows are assumed to arrive in
+date order (a row dated before rows of an earlier run is folded in late,
+not where its date would put it).
+"""
+import datetime
+import json
+import os
+import random
+from pathlib import Path
+
+import pandas as pd
+
+from analytics.loader import (
+    CACHE_DIR_NAME, CHUNK_BYTES, DATA_DIR, SOURCES, iter_csv_chunks, tail_checksum, unique_tmp,
+    widen_float32
+)
+
+STATE_DIR_NAME = 'drift'
+STATE_VERSION = 1  # bump when the group state's layout changes
+
+THRESHOLD = 0.70
+ALPHA = 0.05
+WARMUP = 200            # predictions a baseline is learned over
+PH_DELTA = 0.02         # accuracy points per prediction a mean may wander unnoticed
+PH_LAMBDA = 5.0         # a 0.10 fall is found in ~60 predictions, 0.05 in ~150
+SHARE_MARGIN = 0.10     # rise of the below-threshold share worth an alert
+CUSUM_H = 15.0          # a 0.10 rise is found in ~70 predictions; < 1 false alarm per 10k
+RESERVOIR = 100
+
+
+def _new_group():
+    return {
+        'n': 0, 'ewma': None, 'ewma_low': None, 'last_date': None,
+        'ph_n': 0, 'ph_mean': 0.0, 'ph_u': 0.0, 'ph_min': 0.0,
+        'cusum_n': 0, 'base_low': 0.0, 'cusum': 0.0,
+        'reservoir': [],
+    }
+
+
+class DriftMonitor:
+    """Per-(team, task_type) drift tests fed one prediction at a time."""
+
+    def __init__(self, threshold=THRESHOLD, state=None, seed=0):
+        self.threshold = threshold
+        self.groups = {}
+        self._random = random.Random(seed)
+        if state:
+            self.threshold = state['threshold']
+            self.groups = {tuple(k.split('|', 1)): g for k, g in state['groups'].items()}
+            self._random.setstate((state['random'][0], tuple(state['random'][1]), state['random'][2]))
+
+    def state(self):
+        """JSON-able state, for DriftMonitor(state=...)."""
+        return {
+            'threshold': self.threshold,
+            'groups':    {'|'.join(k): g for k, g in self.groups.items()},
+            'random':    self._random.getstate(),
+        }
+
+    def update(self, team, task_type, date, user_id, accuracy):
+        """Fold one prediction in; returns the alerts it raises (dicts)."""
+        g = self.groups.setdefault((team, task_type), _new_group())
+        low = float(accuracy < self.threshold)
+        g['n'] += 1
+        g['last_date'] = date if g['last_date'] is None else max(g['last_date'], date)
+        g['ewma'] = accuracy if g['ewma'] is None else g['ewma'] + ALPHA * (accuracy - g['ewma'])
+        g['ewma_low'] = low if g['ewma_low'] is None else g['ewma_low'] + ALPHA * (low - g['ewma_low'])
+
+        # Algorithm R: the k-th prediction replaces a random slot with probability RESERVOIR / k
+        sample = [date, user_id, accuracy]
+        if len(g['reservoir']) < RESERVOIR:
+            g['reservoir'].append(sample)
+        else:
+            slot = self._random.randrange(g['n'])
+            if slot < RESERVOIR:
+                g['reservoir'][slot] = sample
+
+        alerts = []
+        # Page-Hinkley on a fall of the mean
+        g['ph_n'] += 1
+        g['ph_mean'] += (accuracy - g['ph_mean']) / g['ph_n']
+        if g['ph_n'] > WARMUP:
+            g['ph_u'] += g['ph_mean'] - accuracy - PH_DELTA
+            g['ph_min'] = min(g['ph_min'], g['ph_u'])
+            if g['ph_u'] - g['ph_min'] > PH_LAMBDA:
+                alerts.append(self._alert('mean_drop', team, task_type, date, g, g['ph_mean']))
+                g.update(ph_n=0, ph_mean=0.0, ph_u=0.0, ph_min=0.0)
+
+        # CUSUM on a rise of the share below the threshold
+        g['cusum_n'] += 1
+        if g['cusum_n'] <= WARMUP:
+            g['base_low'] += (low - g['base_low']) / g['cusum_n']
+        else:
+            g['cusum'] = max(0.0, g['cusum'] + low - g['base_low'] - SHARE_MARGIN / 2)
+            if g['cusum'] > CUSUM_H:
+                alerts.append(self._alert('low_share', team, task_type, date, g, g['base_low']))
+                g.update(cusum_n=0, base_low=0.0, cusum=0.0)
+        return alerts
+
+    def _alert(self, kind, team, task_type, date, g, baseline):
+        return {
+            'kind': kind, 'team': team, 'task_type': task_type, 'date': date, 'n': g['n'],
+            'ewma': round(g['ewma'], 4), 'ewma_low': round(g['ewma_low'], 4), 'baseline': round(baseline, 4),
+        }
+
+    def update_rows(self, rows):
+        """Fold in the AI-used rows with an accuracy of a log frame, in date
+        order (rows of the same date in log order)."""
+        rows = rows[rows['used_ai_tool'].astype(bool) & rows['ai_prediction_accuracy'].notna()]
+        rows = rows.sort_values('date', kind='stable')
+        columns = zip(
+            rows['team'].astype(str).tolist(), rows['task_type'].astype(str).tolist(),
+            rows['date'].dt.strftime('%Y-%m-%d').tolist(), rows['user_id'].tolist(),
+            widen_float32(rows['ai_prediction_accuracy']).tolist(),
+        )
+        return [alert for record in columns for alert in self.update(*record)]
+
+    def status(self):
+        """One row per group: predictions seen, EWMAs, test statistics, last date."""
+        rows = [
+            {'team': team, 'task_type': task, 'n': g['n'], 'ewma': g['ewma'], 'ewma_low': g['ewma_low'],
+             'page_hinkley': g['ph_u'] - g['ph_min'], 'cusum': g['cusum'], 'last_date': g['last_date']}
+            for (team, task), g in sorted(self.groups.items())
+        ]
+        return pd.DataFrame(rows, columns=['team', 'task_type', 'n', 'ewma', 'ewma_low',
+                                           'page_hinkley', 'cusum', 'last_date'])
+
+
+def state_dir(data_dir=DATA_DIR):
+    return Path(data_dir) / CACHE_DIR_NAME / STATE_DIR_NAME
+
+
+def _read_state(path):
+    state = json.loads(path.read_text()) if path.exists() else {}
+    return state if state.get('version') == STATE_VERSION else {}
+
+
+def load_monitor(data_dir=DATA_DIR):
+    """The monitor as of its last update_drift(), or None before the first."""
+    state = _read_state(state_dir(data_dir) / 'state.json')
+    return DriftMonitor(state=state['monitor']) if state else None
+
+
+def update_drift(data_dir=DATA_DIR, threshold=THRESHOLD, reset=False, chunk_bytes=CHUNK_BYTES):
+    """Feed the monitor the AI-log rows appended since its last run.
+
+    A log that was rewritten (shrunk, or the bytes before the watermark
+    changed), a new threshold or reset=True starts the monitor over from the
+    first row. Returns (alerts raised, rows read).
+    """
+    out_dir = state_dir(data_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    path = Path(data_dir) / SOURCES['ai_usage_logs']['file']
+    state = {} if reset else _read_state(out_dir / 'state.json')
+    if state and (state['offset'] > path.stat().st_size
+                  or tail_checksum(path, state['offset']) != state['checksum']
+                  or state['monitor']['threshold'] != threshold):
+        state = {}
+
+    monitor = DriftMonitor(threshold, state.get('monitor'))
+    offset, alerts, n_rows = state.get('offset', 0), [], 0
+    for rows, offset in iter_csv_chunks(path, SOURCES['ai_usage_logs']['types'], offset, chunk_bytes):
+        alerts += monitor.update_rows(rows)
+        n_rows += len(rows)
+
+    seen = datetime.datetime.now().isoformat(timespec='seconds')
+    with open(out_dir / 'alerts.jsonl', 'w' if not state else 'a') as f:
+        f.writelines(json.dumps({'seen': seen, **alert}) + '\n' for alert in alerts)
+    new_state = {
+        'version':  STATE_VERSION,
+        'offset':   offset,
+        'checksum': tail_checksum(path, offset),
+        'monitor':  monitor.state(),
+    }
+    state_path = out_dir / 'state.json'
+    tmp = unique_tmp(state_path)
+    try:
+        tmp.write_text(json.dumps(new_state))
+        os.replace(tmp, state_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return alerts, n_rows
+
+
+def read_alerts(data_dir=DATA_DIR, last=None):
+    """Alerts raised so far (the `last` n if given), oldest first."""
+    path = state_dir(data_dir) / 'alerts.jsonl'
+    columns = ['seen', 'kind', 'team', 'task_type', 'date', 'n', 'ewma', 'ewma_low', 'baseline']
+    if not path.exists() or not path.stat().st_size:
+        return pd.DataFrame(columns=columns)
+    alerts = pd.read_json(path, lines=True, dtype={'seen': str, 'date': str})[columns]
+    return alerts.tail(last).reset_index(drop=True) if last else alerts
@@ -0,0 +1,152 @@
+"""DuckDB execution backend.
+
+Queries run in an in-memory DuckDB over the source files themselves: no
+database is built and no data is cached, so every query sees the files as
+they are on disk. Only the views are kept, in one connection per data
+directory; each query runs on its own cursor of it. The exception is the
+user→team map: it comes from the user→team index (analytics.teams) and is
+copied in as the user_team table, refreshed when the AI log changes.
+
+A log is read from `<name>.parquet` when one sits next to its CSV (see
+export_parquet), otherwise from the CSV with explicit column types.
+Accuracy is read as DOUBLE, i.e. the exact decimal in the file.
+
+The views mirror the SQLite backend: tasks unions the AI-log and manual-log
+rows at the cube's grain. Aggregations are one
+vectorized GROUP BY; M2 comes from DuckDB's (Welford) sample variance.
+"""
+from contextlib import closing
+
+import duckdb
+import pandas as pd
+import pyarrow as pa
+
+from analytics.loader import DATA_DIR, SOURCES, source_path
+from analytics.sql import not_null, period_columns, where_clause
+from analytics.teams import user_team_map
+
+TABLES = ['ai_usage_logs', 'manual_task_logs', 'user_directory']
+
+SQL_TYPES = {
+    pa.int16():   'SMALLINT',
+    pa.int32():   'INTEGER',
+    pa.string():  'VARCHAR',
+    pa.date32():  'DATE',
+    pa.bool_():   'BOOLEAN',
+    pa.float32(): 'DOUBLE',
+    pa.float64(): 'DOUBLE',
+}
+
+# day, week, month and quarter ordinals (analytics.periods) of a DATE
+DAY = "datediff('day', DATE '1970-01-01', {0})"
+MONTH = "(year({0}) - 1970) * 12 + month({0}) - 1"
+PERIODS = {
+    'day':     DAY,
+    'week':    f"({DAY} + 3) // 7",
+    'month':   MONTH,
+    'quarter': f"({MONTH}) // 3",
+}
+
+TASKS_VIEW = f"""
+    CREATE VIEW tasks AS
+    SELECT team, task_type, {period_columns(PERIODS, 'date')},
+           CASE WHEN used_ai_tool THEN 'AI' ELSE 'Manual' END AS method,
+           user_id, date, task_duration_minutes AS dur, ai_prediction_accuracy AS acc
+    FROM ai_usage_logs
+    UNION ALL
+    SELECT t.team, m.task_type, {period_columns(PERIODS, 'm.date')}, 'Manual',
+           m.user_id, m.date, m.task_duration_minutes, NULL
+    FROM manual_task_logs m LEFT JOIN user_team t USING (user_id)
+"""
+
+MEASURES = {'dur': 'dur', 'acc': 'acc'}
+
+
+def parquet_path(name, data_dir=DATA_DIR):
+    return source_path(name, data_dir).with_suffix('.parquet')
+
+
+def _scan(name, data_dir):
+    parquet = parquet_path(name, data_dir)
+    if parquet.exists():
+        return f"read_parquet('{parquet}')"
+    types = ', '.join(f"'{col}': '{SQL_TYPES[t]}'" for col, t in SOURCES[name]['types'].items())
+    return f"read_csv('{source_path(name, data_dir)}', header = true, columns = {{{types}}})"
+
+
+_connections = {}
+
+
+def _define_views(data_dir):
+    conn = duckdb.connect()
+    for name in TABLES:
+        conn.execute(f"CREATE VIEW {name} AS SELECT * FROM {_scan(name, data_dir)}")
+    conn.register('user_team_index', user_team_map(data_dir).reset_index())
+    conn.execute("CREATE TABLE user_team AS SELECT * FROM user_team_index")
+    conn.unregister('user_team_index')
+    conn.execute(TASKS_VIEW)
+    return conn
+
+
+def connect(data_dir=DATA_DIR):
+    """Cursor with a view per source, the user_team table and the tasks view.
+
+    Binding the views costs more than a small query, so the connection
+    holding them is reused while the same files (CSV or Parquet) back them
+    and the AI log is unchanged.
+    """
+    ai_log = source_path('ai_usage_logs', data_dir).stat()
+    key = (tuple(parquet_path(name, data_dir).exists() for name in TABLES),
+           ai_log.st_size, ai_log.st_mtime_ns)
+    cached = _connections.get(str(data_dir))
+    if cached is None or cached[0] != key:
+        _connections[str(data_dir)] = key, _define_views(data_dir)
+    return _connections[str(data_dir)][1].cursor()
+
+
+def export_parquet(name, data_dir=DATA_DIR):
+    """Write `<name>.parquet` next to the CSV; later queries read it instead.
+
+    The export is not refreshed when the CSV changes; delete it to go back
+    to reading the CSV.
+    """
+    path = parquet_path(name, data_dir)
+    with closing(connect(data_dir)) as conn:
+        conn.execute(f"COPY (SELECT * FROM {_scan(name, data_dir)}) TO '{path}' (FORMAT parquet)")
+    return path
+
+
+def aggregate(by, where, data_dir=DATA_DIR):
+    """Cube statistics grouped by `by` over the task rows matching `where`.
+
+    Returns by + total_tasks, ai_tasks and, per measure, count/sum/m2/min/max.
+    Rows with a NULL in any `by` column are dropped, as in cube.merge_cells.
+    """
+    keys = ', '.join(by)
+    filters, params = where_clause(where)
+    filters = not_null(filters, by)
+    stats = ', '.join(
+        f'COUNT({col}) AS {p}_count, SUM({col}::DOUBLE) AS {p}_sum, '
+        f'VAR_SAMP({col}) * (COUNT({col}) - 1) AS {p}_m2, '
+        f'MIN({col})::DOUBLE AS {p}_min, MAX({col})::DOUBLE AS {p}_max'
+        for p, col in MEASURES.items()
+    )
+    sql = f"""
+        SELECT {keys}, COUNT(*) AS total_tasks, COUNT(*) FILTER (method = 'AI') AS ai_tasks, {stats}
+        FROM tasks{filters}
+        GROUP BY {keys} ORDER BY {keys}
+    """
+    with closing(connect(data_dir)) as conn:
+        return conn.execute(sql, params).df()
+
+
+def rows(source, where, columns=None, data_dir=DATA_DIR):
+    """Raw rows of one source matching `where`, in file order."""
+    filters, params = where_clause(where)
+    cols = ', '.join(columns) if columns else '*'
+    with closing(connect(data_dir)) as conn:
+        out = conn.execute(f"SELECT {cols} FROM {source}{filters}", params).df()
+    for col in ['date', 'join_date']:
+        if col in out:
+            out[col] = pd.to_datetime(out[col])
+    return out
@@ -0,0 +1,129 @@
+"""Accuracy histograms per (team, task_type, user_id, month): the AI quality
+tables without rescanning the rows.
+
+Each cell holds, for one 0.01-wide accuracy bin ('bin' 0..100, the
+accuracy's hundredths), the number of AI-used predictions in it and the sum
+of their accuracies. The threshold shares, quantiles, means and counts of
+the quality dashboard are merges of those cells:
+
+  share_below   % of predictions below a threshold, exact for thresholds
+                on a bin edge (any 0.01 step)
+  quantiles     order statistics located by cumulative bin counts; a bin's
+                value is the mean of its predictions, exact while accuracies
+                have at most two decimals (as logged), else within the bin
+  counts/means  sums of the cells, exact at any precision
+
+Selections slice the cells through a RowIndex (analytics.row_index), so a
+threshold or filter change costs time in proportion to the matching cells.
+The store is materialized under data/.cache/ and rebuilt only when the AI
+log changes.
+"""
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analytics.loader import (
+    CACHE_DIR_NAME, DATA_DIR, load_ai_logs, read_arrow, source_version, widen_float32, write_arrow
+)
+from analytics.periods import ordinals
+from analytics.row_index import RowIndex
+from analytics.schema import schema_digest
+
+DIMENSIONS = ['team', 'task_type', 'user_id', 'month']
+BINS = 100                  # bins per unit of accuracy: 0.01 wide
+_EPSILON = 1e-9             # 0.29 * 100 is 28.999999999999996
+
+
+def bin_index(values, bins=BINS):
+    """Bin of each accuracy in [0, 1]; 1.0 gets a bin of its own."""
+    return np.clip(np.floor(np.asarray(values, dtype=np.float64) * bins + _EPSILON), 0, bins).astype(np.int16)
+
+
+def bin_edge(threshold, bins=BINS):
+    """First bin at or above `threshold` (bins below it lie under it)."""
+    return int(np.ceil(threshold * bins - _EPSILON))
+
+
+def build_histograms(ai_logs):
+    """Histogram cells of the AI-used predictions with an accuracy."""
+    rows = ai_logs[ai_logs['used_ai_tool'] & ai_logs['ai_prediction_accuracy'].notna()]
+    accuracy = widen_float32(rows['ai_prediction_accuracy'])
+    return (
+        rows[['team', 'task_type', 'user_id']]
+        .assign(month=ordinals(rows['date']), bin=bin_index(accuracy), acc=accuracy)
+        .groupby(DIMENSIONS + ['bin'], observed=True, sort=True)
+        .agg(count=('acc', 'size'), sum=('acc', 'sum'))
+        .astype({'count': np.int32})
+        .reset_index()
+    )
+
+
+def histogram_path(data_dir=DATA_DIR):
+    return Path(data_dir) / CACHE_DIR_NAME / 'accuracy_histograms.arrow'
+
+
+def load_histograms(data_dir=DATA_DIR):
+    """Materialized histogram cells, rebuilt only when the AI log has changed."""
+    versions = {
+        'ai_usage_logs': source_version('ai_usage_logs', data_dir),
+        'schema':        schema_digest(DIMENSIONS),
+        'bins':          str(BINS),
+    }
+    path = histogram_path(data_dir)
+    if path.exists():
+        table, meta = read_arrow(path)
+        if all(meta.get(k) == v for k, v in versions.items()):
+            return table.to_pandas()
+    cells = build_histograms(load_ai_logs(data_dir))
+    write_arrow(cells, path, metadata=versions)
+    return cells
+
+
+def histogram_index(cells):
+    """RowIndex of the cells on their dimensions, for select_cells."""
+    return RowIndex(cells, DIMENSIONS)
+
+
+def select_cells(cells, index, where):
+    """Cells matching every filter in `where` (list values mean 'isin')."""
+    return cells.take(index.select(cells, where)).reset_index(drop=True)
+
+
+def share_below(cells, by, threshold):
+    """% of predictions below `threshold` per `by` group ('pct_below'), or
+    overall, as a float, when `by` is empty."""
+    below = cells['count'].where(cells['bin'] < bin_edge(threshold), 0)
+    if not by:
+        return below.sum() / cells['count'].sum() * 100
+    counts = cells[by].assign(below=below, count=cells['count']).groupby(by, observed=True, sort=True).sum()
+    return (counts['below'] / counts['count'] * 100).rename('pct_below').reset_index()
+
+
+def _group_quantiles(cells, qs):
+    # cells of one group, merged per bin and in bin order
+    bins = cells.groupby('bin', sort=True)[['count', 'sum']].sum()
+    bins = bins[bins['count'] > 0]
+    counts = bins['count'].to_numpy()
+    values = bins['sum'].to_numpy() / counts
+    ends = np.cumsum(counts)
+    out = []
+    for q in qs:
+        # linear interpolation between order statistics, as Series.quantile
+        pos = (ends[-1] - 1) * q
+        low, frac = int(np.floor(pos)), pos - np.floor(pos)
+        below = values[np.searchsorted(ends, low, side='right')]
+        above = values[np.searchsorted(ends, min(low + 1, ends[-1] - 1), side='right')]
+        out.append(below + (above - below) * frac)
+    return pd.Series(out, index=[f'{q:.0%}' for q in qs])
+
+
+def quantiles(cells, by, qs=(0.25, 0.5, 0.75)):
+    """`qs` quantiles of the accuracies per `by` group, labelled '25%', ...
+    (one column per quantile)."""
+    cells = cells[cells['count'] > 0]
+    if not by:
+        return _group_quantiles(cells, qs).to_frame().T
+    # select the bin columns (not include_groups=False, which needs pandas 2.2)
+    groups = cells.groupby(by, observed=True, sort=True)[['bin', 'count', 'sum']]
+    return groups.apply(_group_quantiles, qs)
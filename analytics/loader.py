@@ -0,0 +1,320 @@
+"""Columnar cache for the source CSVs.
+
+Each CSV in data/ (the three raw logs plus the derived user_monthly_summary)
+is parsed once into an uncompressed Arrow IPC file under data/.cache/ with
+the compact types of analytics.schema (int32 ids, int16 durations, date32
+dates, strings dictionary-encoded over fixed category sets, float32
+accuracy). Later loads memory-map that file instead of re-parsing text. The
+cache is rebuilt when the source's size/mtime changes and its sha256 no
+longer matches the one recorded at build time, or when the declared schema
+of its columns has changed.
+
+For logs too large to parse in one go, iter_csv_chunks streams a CSV as
+DataFrames of at most `chunk_bytes` of text each, bypassing the cache.
+"""
+import hashlib
+import io
+import os
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from pyarrow import csv
+
+from analytics.schema import categories, column_types, schema_digest
+
+DATA_DIR = Path('data')
+CACHE_DIR_NAME = '.cache'
+CHUNK_BYTES = 64 << 20
+CHECK_BYTES = 1 << 16
+
+# source name -> csv file, column types, dictionary-encoded columns and
+# 'YYYY-MM' columns stored as month ordinals (analytics.periods)
+SOURCES = {
+    'ai_usage_logs': {
+        'file': 'ai_usage_logs.csv',
+        'types': column_types(
+            'user_id', 'team', 'task_type', 'date', 'task_duration_minutes',
+            'used_ai_tool', 'ai_prediction_accuracy',
+        ),
+        'categorical': ['team', 'task_type'],
+    },
+    'manual_task_logs': {
+        'file': 'manual_task_logs.csv',
+        'types': column_types('user_id', 'task_type', 'date', 'task_duration_minutes'),
+        'categorical': ['task_type'],
+    },
+    'user_directory': {
+        'file': 'user_directory.csv',
+        'types': column_types('user_id', 'full_name', 'role_title', 'join_date', 'region'),
+        'categorical': ['role_title', 'region'],
+    },
+    'user_monthly_summary': {
+        'file': 'user_monthly_summary.csv',
+        'types': column_types(
+            'user_id', 'month', 'task_count_ai', 'task_count_manual', 'total_duration_ai',
+            'total_duration_manual', 'ai_tasks', 'manual_tasks', 'total_tasks', 'adoption_rate',
+            'ai_avg_dur', 'manual_avg_dur', 'full_name', 'role_title', 'join_date', 'region', 'team',
+        ),
+        'categorical': ['role_title', 'region', 'team'],
+        'months': ['month'],
+    },
+}
+
+
+def _sha256(path, chunk_size=1 << 20):
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _dictionary_encode(arr, column):
+    # the declared category set (plus any unknown values) as the dictionary,
+    # so category order is the same across rebuilds and sources
+    arr = arr.combine_chunks() if isinstance(arr, pa.ChunkedArray) else arr
+    dictionary = pa.array(categories(column, pc.unique(arr).to_pylist()), pa.string())
+    indices = pc.index_in(arr, value_set=dictionary)
+    if len(dictionary) < 128:
+        indices = indices.cast(pa.int8())
+    elif len(dictionary) < 32768:
+        indices = indices.cast(pa.int16())
+    return pa.DictionaryArray.from_arrays(indices, dictionary)
+
+
+def _month_ordinals(text):
+    # 'YYYY-MM' -> 12·(year - 1970) + month - 1, as periods.ordinals computes it
+    months = pc.strptime(text, format='%Y-%m', unit='s')
+    ordinals = pc.subtract(pc.add(pc.multiply(pc.year(months), 12), pc.month(months)), 1970 * 12 + 1)
+    return ordinals.cast(pa.int16())
+
+
+def _convert_options(types):
+    # empty fields of string columns (a blank team) read as null, as they do
+    # in every other column, so validate reports them as missing
+    return csv.ConvertOptions(column_types=types, strings_can_be_null=True)
+
+
+def _parse_csv(path, spec):
+    months = spec.get('months', [])
+    types = {col: pa.string() if col in months else t for col, t in spec['types'].items()}
+    table = csv.read_csv(path, convert_options=_convert_options(types))
+    for col in months:
+        idx = table.schema.get_field_index(col)
+        table = table.set_column(idx, col, _month_ordinals(table.column(col)))
+    for col in spec['categorical']:
+        idx = table.schema.get_field_index(col)
+        table = table.set_column(idx, col, _dictionary_encode(table.column(col), col))
+    return table
+
+
+def widen_float32(values):
+    """float32 values as the float64 of the decimal they were parsed from.
+
+    A plain cast turns 0.96f into 0.9599999785; rounding to float32's seven
+    significant digits gives back 0.96, so sums, means and threshold checks
+    match those on the original CSV text.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        digits = 6 - np.floor(np.log10(np.abs(x)))
+        scale = 10.0 ** np.where(np.isfinite(digits), digits, 0)
+    return np.round(x * scale) / scale
+
+
+def cache_path(name, data_dir=DATA_DIR):
+    return Path(data_dir) / CACHE_DIR_NAME / f'{name}.arrow'
+
+
+def source_path(name, data_dir=DATA_DIR):
+    return Path(data_dir) / SOURCES[name]['file']
+
+
+def _cached_fingerprint(path):
+    if not path.exists():
+        return None
+    with pa.memory_map(str(path)) as source:
+        meta = pa.ipc.open_file(source).schema.metadata or {}
+    return {k.decode(): v.decode() for k, v in meta.items()}
+
+
+def unique_tmp(path):
+    """A new, uniquely named temp file next to `path`, to be renamed over it,
+    so concurrent writers (pool workers, Streamlit sessions) never share one."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f'{path.name}.', suffix='.tmp')
+    os.close(fd)
+    return Path(tmp)
+
+
+def write_arrow(table, path, metadata=None):
+    """Atomically write an uncompressed (memory-mappable) Arrow IPC file.
+
+    `table` may be a pyarrow Table or a pandas DataFrame; `metadata` is
+    merged into the schema metadata.
+    """
+    if isinstance(table, pd.DataFrame):
+        table = pa.Table.from_pandas(table, preserve_index=False)
+    if metadata:
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), **metadata})
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = unique_tmp(path)
+    try:
+        with pa.OSFile(str(tmp), 'wb') as sink:
+            with pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+def read_arrow(path):
+    """Memory-mapped Arrow table and its schema metadata as a str dict."""
+    table = pa.ipc.open_file(pa.memory_map(str(path))).read_all()
+    meta = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+    return table, meta
+
+
+def _write_cache(table, path, fingerprint):
+    write_arrow(table.replace_schema_metadata(fingerprint), path)
+
+
+def ensure_cache(name, data_dir=DATA_DIR):
+    """Build or refresh the Arrow cache for `name`; return its path."""
+    src = source_path(name, data_dir)
+    dst = cache_path(name, data_dir)
+    stat = src.stat()
+    fingerprint = {
+        'size':     str(stat.st_size),
+        'mtime_ns': str(stat.st_mtime_ns),
+        'schema':   schema_digest(SOURCES[name]['types']),
+    }
+
+    cached = _cached_fingerprint(dst)
+    if cached and all(cached.get(k) == v for k, v in fingerprint.items()):
+        return dst
+
+    # size/mtime moved: only rebuild if the content actually changed
+    fingerprint['sha256'] = _sha256(src)
+    if cached and cached.get('sha256') == fingerprint['sha256'] and cached.get('schema') == fingerprint['schema']:
+        with pa.memory_map(str(dst)) as source:
+            table = pa.ipc.open_file(source).read_all()
+        _write_cache(table, dst, fingerprint)
+        return dst
+
+    _write_cache(_parse_csv(src, SOURCES[name]), dst, fingerprint)
+    return dst
+
+
+def iter_csv_chunks(path, column_types, offset=0, chunk_bytes=CHUNK_BYTES, final=False):
+    """Stream complete CSV lines after byte `offset` in bounded chunks.
+
+    Yields (frame, end offset) pairs, where the end offset is just past the
+    last line in the frame. A trailing line without a newline may still be
+    being written: it is left for the next run when following a growing
+    file, and parsed as the last line with final=True (a full read, which
+    then gives the same rows as the cache). Peak memory is one chunk of
+    text plus its parsed frame, whatever the file size.
+    """
+    def parse(data):
+        table = csv.read_csv(
+            io.BytesIO(data),
+            read_options=csv.ReadOptions(column_names=names),
+            convert_options=_convert_options(column_types),
+        )
+        return table.to_pandas(date_as_object=False)
+
+    with open(path, 'rb') as f:
+        header = f.readline()
+        names = header.decode().strip().split(',')
+        f.seek(max(offset, len(header)))
+        end, carry = f.tell(), b''
+        while block := f.read(chunk_bytes):
+            data = carry + block
+            cut = data.rfind(b'\n') + 1
+            data, carry = data[:cut], data[cut:]
+            if not data:
+                continue
+            end += len(data)
+            yield parse(data), end
+        if final and carry.strip():
+            end += len(carry)
+            yield parse(carry), end
+
+
+def tail_checksum(path, offset, check_bytes=CHECK_BYTES):
+    """sha256 of the `check_bytes` before byte `offset`.
+
+    A cheap check that a file was only appended to since a watermark was
+    taken at `offset`.
+    """
+    start = max(0, offset - check_bytes)
+    with open(path, 'rb') as f:
+        f.seek(start)
+        return hashlib.sha256(f.read(offset - start)).hexdigest()
+
+
+def appended_since(path, offset, checksum):
+    """True if `path` has only been appended to since a watermark taken at
+    byte `offset` (with tail_checksum `checksum`).
+
+    A watermark that cut an unterminated last line (a final read) no longer
+    holds once the file grows: the appended bytes may complete that line.
+    """
+    size = Path(path).stat().st_size
+    if offset > size or tail_checksum(path, offset) != checksum:
+        return False
+    if offset in (0, size):
+        return True
+    with open(path, 'rb') as f:
+        f.seek(offset - 1)
+        return f.read(1) == b'\n'
+
+
+def file_version(name, data_dir=DATA_DIR):
+    """sha256 of a source file, hashed in chunks without touching the cache.
+
+    Same value as source_version() once the cache is built.
+    """
+    return _sha256(source_path(name, data_dir))
+
+
+def source_version(name, data_dir=DATA_DIR):
+    """Content hash of the source currently backing the cache for `name`."""
+    return _cached_fingerprint(ensure_cache(name, data_dir))['sha256']
+
+
+def load_table(name, data_dir=DATA_DIR):
+    """Memory-mapped, zero-copy Arrow table for one source."""
+    source = pa.memory_map(str(ensure_cache(name, data_dir)))
+    return pa.ipc.open_file(source).read_all()
+
+
+def load_frame(name, data_dir=DATA_DIR):
+    """Source as a pandas DataFrame (dates as datetime64, strings as categoricals).
+
+    Numeric columns without nulls are handed over without copying; dates and
+    dictionaries are converted once.
+    """
+    return load_table(name, data_dir).to_pandas(date_as_object=False)
+
+
+def load_ai_logs(data_dir=DATA_DIR):
+    return load_frame('ai_usage_logs', data_dir)
+
+
+def load_manual_logs(data_dir=DATA_DIR):
+    return load_frame('manual_task_logs', data_dir)
+
+
+def load_users(data_dir=DATA_DIR):
+    return load_frame('user_directory', data_dir)
+
+
+def load_monthly_summary(data_dir=DATA_DIR):
+    return load_frame('user_monthly_summary', data_dir)
@@ -0,0 +1,68 @@
+"""Process-pool aggregation over disjoint shards of the logs.
+
+Rows are partitioned by a hash of user_id (or by team) so that every
+aggregate keyed on the user (or team) lives in exactly one shard. Each worker
+memory-maps the Arrow cache of the sources itself, so nothing is pickled in
+except the shard number and the small user→team map. It filters its shard
+before converting to pandas and returns the shard's partial result. Partials
+come back in shard order and the keys never overlap, so merging is a concat
+plus a sort, and the result is identical to the single-process build.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pyarrow as pa
+
+from analytics.loader import load_table
+from analytics.schema import category_dtype
+
+SHARD_KEYS = ['user_id', 'team']
+
+
+def default_workers():
+    return os.cpu_count() or 1
+
+
+def shard_of(keys, n_shards):
+    """Shard number per integer key (Knuth multiplicative hash)."""
+    keys = np.asarray(keys, dtype=np.uint64)
+    return ((keys * np.uint64(2654435761)) % np.uint64(1 << 32) % np.uint64(n_shards)).astype(np.int64)
+
+
+def _team_codes(table, team_map):
+    # position of each row's team in the schema's team list; -1 if unknown
+    if 'team' in table.column_names:
+        return table['team'].combine_chunks().indices.to_numpy(zero_copy_only=False).astype(np.int64)
+    # team_map comes from the AI log, so its categories are that dictionary
+    codes = team_map.astype(category_dtype('team', team_map.unique())).cat.codes
+    user_ids = table['user_id'].to_numpy()
+    return codes.reindex(user_ids).fillna(-1).to_numpy(dtype=np.int64)
+
+
+def shard_frame(name, data_dir, shard, n_shards, by='user_id', team_map=None):
+    """Rows of source `name` that belong to `shard`, as a DataFrame.
+
+    by='team' needs `team_map` for sources without a team column; rows of
+    users with no team go to shard 0.
+    """
+    table = load_table(name, data_dir)
+    if by == 'user_id':
+        keys = shard_of(table['user_id'].to_numpy(), n_shards)
+    elif by == 'team':
+        keys = np.maximum(_team_codes(table, team_map), 0) % n_shards
+    else:
+        raise ValueError(f"unknown shard key: {by!r} (expected one of {SHARD_KEYS})")
+    return table.filter(pa.array(keys == shard)).to_pandas(date_as_object=False)
+
+
+def map_shards(func, n_workers, *args):
+    """func(*args, shard, n_workers) for every shard, results in shard order.
+
+    n_workers=1 runs in-process.
+    """
+    if n_workers <= 1:
+        return [func(*args, 0, 1)]
+    with ProcessPoolExecutor(max_workers=n_workers) as pool:
+        futures = [pool.submit(func, *args, shard, n_workers) for shard in range(n_workers)]
+        return [f.result() for f in futures]
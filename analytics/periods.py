@@ -0,0 +1,115 @@
+"""Integer time buckets: dates as day, ISO-week, month or quarter ordinals.
+
+An ordinal counts whole buckets since the Unix epoch, so consecutive
+buckets are consecutive integers:
+
+  day      days since 1970-01-01
+  week     ISO weeks (Monday–Sunday) since the week of Monday 1969-12-29
+  month    months since 1970-01, i.e. 12·(year - 1970) + month - 1
+  quarter  quarters since 1970-Q1 (month ordinal // 3)
+
+Conversions go through numpy datetime64 units, vectorized and with no
+Period objects. Grouping, filtering (isin, ranges) and windows ('the last
+n months' is window(end, n)) are then integer operations. Every analysis
+keys months this way: the cube's month dimension, query results, trend
+windows and the monthly summary. starts() maps ordinals back to the
+datetime64 start of each bucket (for charts), labels() to display strings.
+convert() takes ordinals to a coarser granularity (day → week/month/quarter,
+month → quarter), which is how the cube's daily base rolls up.
+"""
+import numpy as np
+import pandas as pd
+
+GRANULARITIES = ['day', 'week', 'month', 'quarter']
+DTYPES = {'day': np.int32, 'week': np.int32, 'month': np.int16, 'quarter': np.int16}
+FORMATS = {'day': '%Y-%m-%d', 'week': '%G-W%V', 'month': '%Y-%m', 'quarter': None}
+
+_UNIT = {'day': 'datetime64[D]', 'week': 'datetime64[D]', 'month': 'datetime64[M]', 'quarter': 'datetime64[M]'}
+_WEEK_OFFSET = 3     # 1970-01-01 is a Thursday, three days after the Monday of its ISO week
+
+
+def _check(granularity):
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"unknown granularity: {granularity!r} (expected one of {GRANULARITIES})")
+
+
+def _datetimes(dates):
+    if isinstance(dates, (pd.Series, pd.Index)) and pd.api.types.is_datetime64_any_dtype(dates):
+        return dates.to_numpy()
+    return pd.to_datetime(np.asarray(dates, dtype=object) if np.ndim(dates) else [dates]).to_numpy()
+
+
+def ordinals(dates, granularity='month'):
+    """Bucket ordinal of every date (datetime-like or ISO strings, no nulls).
+
+    A Series comes back as a Series on the same index, anything else as an
+    array of DTYPES[granularity].
+    """
+    _check(granularity)
+    values = _datetimes(dates)
+    if np.isnat(values).any():
+        raise ValueError('dates must not be missing')
+    out = values.astype(_UNIT[granularity]).astype(np.int64)
+    if granularity == 'week':
+        out = (out + _WEEK_OFFSET) // 7
+    elif granularity == 'quarter':
+        out = out // 3
+    out = out.astype(DTYPES[granularity])
+    return pd.Series(out, index=dates.index, name=dates.name) if isinstance(dates, pd.Series) else out
+
+
+def ordinal(date, granularity='month'):
+    """Bucket ordinal of one date, as a Python int."""
+    return int(ordinals([date], granularity)[0])
+
+
+def as_ordinals(values, granularity='month'):
+    """`values` (a scalar or list-like) as ordinals; integers pass through."""
+    if not pd.api.types.is_list_like(values):
+        return values if isinstance(values, (int, np.integer)) else ordinal(values, granularity)
+    values = np.asarray(values)
+    if values.dtype.kind in 'iu':
+        return values
+    return ordinals(values, granularity) if len(values) else values.astype(DTYPES[granularity])
+
+
+def starts(ordinals, granularity='month'):
+    """datetime64[ns] start of each bucket (a Series stays a Series)."""
+    _check(granularity)
+    values = np.asarray(ordinals, dtype=np.int64)
+    if granularity == 'week':
+        values = values * 7 - _WEEK_OFFSET
+    elif granularity == 'quarter':
+        values = values * 3
+    out = values.astype(_UNIT[granularity]).astype('datetime64[ns]')
+    if isinstance(ordinals, pd.Series):
+        return pd.Series(out, index=ordinals.index, name=ordinals.name)
+    return pd.DatetimeIndex(out)
+
+
+def convert(values, source, target):
+    """`source` ordinals as the `target` bucket each falls in; `target` must
+    be as coarse or coarser (weeks do not nest in months)."""
+    _check(source)
+    _check(target)
+    if source == target:
+        return values
+    if GRANULARITIES.index(target) < GRANULARITIES.index(source) or source == 'week':
+        raise ValueError(f"cannot convert {source} ordinals to {target}")
+    if source == 'month':  # → quarter
+        out = (np.asarray(values) // 3).astype(DTYPES[target])
+        return pd.Series(out, index=values.index, name=values.name) if isinstance(values, pd.Series) else out
+    return ordinals(starts(values, source), target)
+
+
+def labels(ordinals, granularity='month', fmt=None):
+    """Display label of each bucket, e.g. '2025-04', '2025-W14', '2025-Q2'."""
+    first = starts(np.asarray(ordinals), granularity)
+    if granularity == 'quarter' and fmt is None:
+        return [f'{d.year}-Q{d.month // 3 + 1}' for d in first]
+    return list(first.strftime(fmt or FORMATS[granularity]))
+
+
+def window(end, n):
+    """The `n` consecutive ordinals ending with `end`."""
+    return np.arange(end - n + 1, end + 1)
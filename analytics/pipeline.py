@@ -0,0 +1,306 @@
+"""Weekly reporting pipeline: a DAG of stages with content-hashed outputs.
+
+    load → validate → team-map ─┬→ summary
+                                └→ cube ─┬→ adoption ───┐
+                                         ├→ efficiency ─┼→ charts
+                                         ├→ quality ────┘
+                                         └→ periods
+
+Each stage returns a digest of what it produced (the source hashes, the team
+map, the cube, the report tables, ...) and the files it wrote. Its key
+hashes the code it runs, the parameters it takes and the digests of the
+stages it reads from. When the key matches the last successful run and those
+files still exist, the stage is skipped and its previous digest is reused.
+So a stage that reruns but gives the same output leaves everything
+downstream skipped. 'load' reads the source files themselves, so it always
+runs; when nothing changed that is a stat() per source.
+
+Stages whose dependencies are done run at the same time on a process pool
+(workers=1 runs them in-process, in order). A failed stage blocks its
+dependents, but independent branches still finish. State and outputs live
+in data/.cache/pipeline/: state.json, validation.csv, charts/*.html, and
+runs.jsonl, the run log with one record (status, seconds, key, digest) per
+stage per run.
+"""
+import datetime
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import pandas as pd
+
+from analytics import (
+    bootstrap, charts, chart_data, cube, histograms, loader, periods, query, regression, reports, row_index,
+    schema, summary, teams, trends, validate,
+)
+from analytics.loader import CACHE_DIR_NAME, DATA_DIR, unique_tmp
+from analytics.parallel import default_workers
+
+PIPELINE_DIR_NAME = 'pipeline'
+SOURCES = ['ai_usage_logs', 'manual_task_logs', 'user_directory']
+PARAMS = {'engine': 'pandas', 'months': (4,), 'threshold': reports.THRESHOLD, 'granularities': ('week',)}
+
+
+def pipeline_dir(data_dir=DATA_DIR):
+    return Path(data_dir) / CACHE_DIR_NAME / PIPELINE_DIR_NAME
+
+
+def _digest(data):
+    if not isinstance(data, bytes):
+        data = json.dumps(data, sort_keys=True, default=str).encode()
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path):
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+
+def frame_digest(frame):
+    """Content hash of a DataFrame: values, index and column labels."""
+    rows = pd.util.hash_pandas_object(frame, index=True).to_numpy()
+    return _digest(rows.tobytes() + repr(list(frame.columns)).encode())
+
+
+# stages: each takes data_dir plus the pipeline parameters it names and
+# returns (digest, files written)
+
+def _load(data_dir):
+    versions = {name: loader.source_version(name, data_dir) for name in SOURCES}
+    return _digest(versions), [loader.cache_path(name, data_dir) for name in SOURCES]
+
+
+def _validate(data_dir):
+    path = pipeline_dir(data_dir) / 'validation.csv'
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        report = validate.check_sources(data_dir)
+    except validate.ValidationError as e:
+        e.report.to_csv(path, index=False)  # kept for inspection, then the stage fails
+        raise
+    report.to_csv(path, index=False)
+    return frame_digest(report), [path]
+
+
+def _team_map(data_dir):
+    counts = teams.update_team_index(data_dir)
+    return frame_digest(teams.modal_team(counts).to_frame()), [teams.index_path(data_dir)]
+
+
+def _cube(data_dir, engine):
+    # the daily base is built from the logs, the monthly cube rolled up from it
+    cells = cube.load_cube(data_dir)
+    if engine != 'pandas':
+        # build the engine's own store (e.g. the SQLite database) here, once,
+        # instead of in every report stage at the same time
+        query.run(query.query(['team']), engine, data_dir)
+    return frame_digest(cells), [cube.cube_path(data_dir, 'day'), cube.cube_path(data_dir)]
+
+
+def _summary(data_dir):
+    out, _ = summary.update_user_monthly_summary(data_dir=data_dir)
+    return frame_digest(out), [Path(data_dir) / summary.OUTPUT_FILE]
+
+
+def _reports(data_dir, engine, jobs):
+    """Compute and store each (report, params) job; digest of all the tables."""
+    source = reports.Source(engine, data_dir)
+    version = reports.report_version(data_dir)
+    digests, paths = [], []
+    for name, params in jobs:
+        tables = reports.compute(name, source, **params)
+        paths.append(reports.save_report(name, tables, data_dir, version, **params))
+        digests.append(_digest(pickle.dumps(tables, protocol=pickle.HIGHEST_PROTOCOL)))
+    return _digest(digests), paths
+
+
+def _adoption(data_dir, engine, months):
+    return _reports(data_dir, engine, [('adoption', {'n_months': n}) for n in months])
+
+
+def _efficiency(data_dir, engine):
+    return _reports(data_dir, engine, [('efficiency', {})])
+
+
+def _quality(data_dir, engine, threshold):
+    return _reports(data_dir, engine, [
+        ('quality_options', {}), ('quality', {'selection': None, 'threshold': threshold})
+    ])
+
+
+def _periods(data_dir, engine, granularities):
+    return _reports(data_dir, engine, [('periods', {'granularity': g}) for g in granularities])
+
+
+def _charts(data_dir, months, threshold):
+    params = {
+        'adoption':   {'n_months': months[0]},
+        'efficiency': {},
+        'quality':    {'selection': None, 'threshold': threshold},
+    }
+    out_dir = pipeline_dir(data_dir) / 'charts'
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for name, (report, table, chart) in charts.PUBLISHED.items():
+        tables = reports.load_report(report, data_dir, **params[report])
+        if tables is None:
+            raise RuntimeError(f"no current {report} report to chart")
+        path = out_dir / f'{name}.html'
+        chart(tables[table]).save(str(path))
+        paths.append(path)
+    return _digest({p.name: file_digest(p) for p in paths}), paths
+
+
+# stage -> (stages it reads from, function, modules whose code it runs)
+STAGES = {
+    'load':       ([], _load, [loader, schema, periods]),
+    'validate':   (['load'], _validate, [validate]),
+    'team-map':   (['load', 'validate'], _team_map, [teams]),
+    'summary':    (['load', 'team-map'], _summary, [summary, periods]),
+    'cube':       (['load', 'team-map'], _cube, [cube, query, schema, periods]),
+    'adoption':   (['load', 'team-map', 'cube'], _adoption, [reports, query, trends, chart_data, periods]),
+    'efficiency': (['load', 'team-map', 'cube'], _efficiency, [reports, query, periods, bootstrap, cube]),
+    'quality':    (['load', 'cube'], _quality, [reports, query, regression, chart_data, periods, histograms, row_index]),
+    'charts':     (['adoption', 'efficiency', 'quality'], _charts, [charts, periods]),
+    'periods':    (['cube'], _periods, [reports, query, cube, periods]),
+}
+
+
+def _stage_params(func, params):
+    names = list(inspect.signature(func).parameters)[1:]
+    return {name: params[name] for name in names}
+
+
+def stage_key(name, digests, params):
+    """Hash of a stage's code, parameters and upstream digests."""
+    deps, func, modules = STAGES[name]
+    code = [inspect.getsource(func)] + [file_digest(inspect.getsourcefile(m)) for m in modules]
+    return _digest({
+        'stage':    name,
+        'code':     code,
+        'params':   _stage_params(func, params),
+        'upstream': {dep: digests[dep] for dep in deps},
+    })
+
+
+def _timed(func, data_dir, params):
+    start = time.perf_counter()
+    digest, paths = func(data_dir, **params)
+    return digest, [str(p) for p in paths], time.perf_counter() - start
+
+
+def _read_state(path):
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def _write_state(state, path):
+    tmp = unique_tmp(path)
+    try:
+        tmp.write_text(json.dumps(state, indent=2))
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+class _InProcess:
+    """Executor stand-in that runs each call at submit time (workers=1)."""
+
+    def submit(self, func, *args):
+        future = Future()
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+def run_pipeline(data_dir=DATA_DIR, workers=None, force=False, log=print, **params):
+    """Run every stage that is out of date; returns the run's stage records.
+
+    `params` override PARAMS (engine, months, threshold, granularities).
+    force=True reruns every stage. Each record has the stage, status ('ran',
+    'skipped', 'failed' or 'blocked'), seconds, key and digest; they are
+    also appended to runs.jsonl.
+    """
+    data_dir = Path(data_dir)
+    params = {**PARAMS, **params}
+    params['months'] = tuple(params['months'])
+    params['granularities'] = tuple(params['granularities'])
+    out_dir = pipeline_dir(data_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    state_path = out_dir / 'state.json'
+    state = _read_state(state_path)
+
+    run_id = datetime.datetime.now().isoformat(timespec='seconds')
+    digests, records, pending, running = {}, {}, list(STAGES), {}
+
+    def record(name, status, seconds=0.0, key=None, error=None):
+        records[name] = {
+            'run': run_id, 'stage': name, 'status': status, 'seconds': round(seconds, 6),
+            'key': key, 'digest': digests.get(name), 'error': error,
+        }
+        log(f"  {name:<11} {status:<8} {seconds:>8.2f}s" + (f"  {error}" if error else ''))
+
+    workers = workers or default_workers()
+    with (_InProcess() if workers <= 1 else ProcessPoolExecutor(max_workers=workers)) as pool:
+        while pending or running:
+            changed = True
+            while changed:
+                changed = False
+                for name in list(pending):
+                    deps, func, _ = STAGES[name]
+                    if any(records.get(dep, {}).get('status') in ('failed', 'blocked') for dep in deps):
+                        pending.remove(name)
+                        record(name, 'blocked')
+                        changed = True
+                    elif all(dep in digests for dep in deps):
+                        pending.remove(name)
+                        key = stage_key(name, digests, params)
+                        prev = state.get(name)
+                        if (not force and deps and prev and prev['key'] == key
+                                and all(Path(p).exists() for p in prev['files'])):
+                            digests[name] = prev['digest']
+                            record(name, 'skipped', key=key)
+                            changed = True
+                        else:
+                            future = pool.submit(_timed, func, data_dir, _stage_params(func, params))
+                            running[future] = (name, key)
+            if not running:
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in sorted(done, key=lambda f: list(STAGES).index(running[f][0])):
+                name, key = running.pop(future)
+                try:
+                    digest, files, seconds = future.result()
+                except Exception as e:
+                    record(name, 'failed', key=key, error=f'{type(e).__name__}: {e}')
+                    continue
+                digests[name] = digest
+                state[name] = {'key': key, 'digest': digest, 'files': files}
+                _write_state(state, state_path)
+                record(name, 'ran', seconds, key)
+
+    out = [records[name] for name in STAGES]
+    with open(out_dir / 'runs.jsonl', 'a') as f:
+        f.writelines(json.dumps(r) + '\n' for r in out)
+    return out
+
+
+def run_log(data_dir=DATA_DIR):
+    """Every stage record written so far, oldest first."""
+    path = pipeline_dir(data_dir) / 'runs.jsonl'
+    if not path.exists():
+        return pd.DataFrame(columns=['run', 'stage', 'status', 'seconds', 'key', 'digest', 'error'])
+    return pd.read_json(path, lines=True, dtype={'run': str, 'key': str, 'digest': str})
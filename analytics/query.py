@@ -0,0 +1,186 @@
+"""Analyses as engine-independent query specs.
+
+A spec names the grouping dimensions and the filters:
+
+    query(['team', 'task_type'], method='AI', month=window)
+
+Filters take a scalar or a list (IN). Time is one of 'day', 'week', 'month'
+or 'quarter' (at most one per spec); in filters and results it is an
+ordinal of that granularity (analytics.periods), and filters may also be
+given as dates. Every engine returns the same frame
+for a spec: one row per group, sorted by `by`, with total_tasks, ai_tasks,
+adoption_rate (%) and, for duration ('dur_') and accuracy ('acc_'), count,
+sum, mean, var, std, min and max. Manual-log rows take the user's team from
+the user→team index (analytics.teams); groups with a missing `by` value
+(manual rows of users without a team) are left out.
+
+Engines:
+  pandas : roll-up of the materialized cube at the spec's granularity
+           (analytics.cube; month when the spec has no time dimension)
+  sqlite : GROUP BY over the indexed SQLite database (analytics.sqlite_backend)
+  duckdb : GROUP BY over the CSV/Parquet files in DuckDB (analytics.duckdb_backend),
+           available when duckdb is installed
+
+fetch_rows gives the raw rows behind a filtered view the same way; in SQLite
+those are index lookups instead of a scan, and the pandas engine can be
+handed an inverted index of the frame (analytics.row_index) to the same end.
+
+benchmarks/check_parity.py runs the dashboards' specs on every engine and
+compares the results with the pandas engine.
+"""
+import numpy as np
+import pandas as pd
+
+from analytics import sqlite_backend
+from analytics.cube import DIMENSIONS, MEASURES, load_cube, merge_cells, slice_cube
+from analytics.loader import DATA_DIR, load_frame
+from analytics.periods import GRANULARITIES, as_ordinals, ordinals
+
+try:
+    from analytics import duckdb_backend
+except ImportError:  # optional engine
+    duckdb_backend = None
+
+ENGINES = ['pandas', 'sqlite'] + (['duckdb'] if duckdb_backend else [])
+STATS = ['count', 'sum', 'mean', 'var', 'std', 'min', 'max']
+QUERY_DIMENSIONS = [dim for dim in DIMENSIONS if dim != 'month'] + GRANULARITIES
+
+
+def query(by, **where):
+    """Spec for the statistics of the task rows matching `where`, grouped by `by`."""
+    unknown = set(by) | set(where)
+    unknown -= set(QUERY_DIMENSIONS)
+    if unknown:
+        raise ValueError(f"unknown dimensions: {sorted(unknown)} (expected {QUERY_DIMENSIONS})")
+    times = sorted((set(by) | set(where)) & set(GRANULARITIES))
+    if len(times) > 1:
+        raise ValueError(f"a spec takes one time granularity, got {times}")
+    where = {
+        dim: as_ordinals(value, dim) if dim in GRANULARITIES else value
+        for dim, value in where.items()
+    }
+    return {'by': list(by), 'where': where}
+
+
+def granularity(spec):
+    """The spec's time granularity ('month' if it has none)."""
+    times = (set(spec['by']) | set(spec['where'])) & set(GRANULARITIES)
+    return times.pop() if times else 'month'
+
+
+def _key_value(value):
+    if pd.api.types.is_list_like(value):
+        return tuple(_key_value(v) for v in value)
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    return value.item() if hasattr(value, 'item') else value
+
+
+def where_key(where):
+    """Hashable, order-independent form of a filter dict."""
+    return tuple(sorted((dim, _key_value(value)) for dim, value in where.items()))
+
+
+def spec_key(spec):
+    """Hashable form of a spec, e.g. for cache keys."""
+    return tuple(spec['by']), where_key(spec['where'])
+
+
+def result_columns(spec):
+    return (
+        spec['by'] + ['total_tasks', 'ai_tasks', 'adoption_rate']
+        + [f'{p}_{stat}' for p in MEASURES for stat in STATS]
+    )
+
+
+def _finish(out, spec):
+    """Derive means/variances and give every engine the same columns and dtypes."""
+    out = out.copy()
+    for dim in spec['by']:
+        if dim in GRANULARITIES or dim == 'user_id':
+            out[dim] = out[dim].astype('int64')
+        else:
+            out[dim] = out[dim].astype(object)
+    out['total_tasks'] = out['total_tasks'].astype('int64')
+    out['ai_tasks'] = out['ai_tasks'].fillna(0).astype('int64')
+    out['adoption_rate'] = out['ai_tasks'] / out['total_tasks'] * 100
+    for p in MEASURES:
+        n = out[f'{p}_count'].astype('int64')
+        out[f'{p}_count'] = n
+        n = n.where(n > 0)
+        for stat in ['sum', 'm2', 'min', 'max']:
+            out[f'{p}_{stat}'] = out[f'{p}_{stat}'].astype('float64')
+        # SQL sums over no values are NULL, pandas sums are 0
+        out[[f'{p}_sum', f'{p}_m2']] = out[[f'{p}_sum', f'{p}_m2']].fillna(0)
+        out[f'{p}_mean'] = out[f'{p}_sum'] / n
+        out[f'{p}_var'] = out[f'{p}_m2'] / (n - 1)
+        out[f'{p}_std'] = np.sqrt(out[f'{p}_var'])
+    return out[result_columns(spec)].reset_index(drop=True)
+
+
+def _run_pandas(spec, data_dir=DATA_DIR, cube=None):
+    if cube is None or granularity(spec) not in cube:
+        cube = load_cube(data_dir, granularity(spec))
+    cells = slice_cube(cube, **spec['where'])
+    cells = cells.assign(ai_tasks=cells['tasks'].where(cells['method'] == 'AI', 0))
+    return merge_cells(cells, spec['by']).rename(columns={'tasks': 'total_tasks'})
+
+
+def _run_sqlite(spec, data_dir=DATA_DIR, cube=None):
+    return sqlite_backend.aggregate(spec['by'], spec['where'], data_dir)
+
+
+def _run_duckdb(spec, data_dir=DATA_DIR, cube=None):
+    return duckdb_backend.aggregate(spec['by'], spec['where'], data_dir)
+
+
+EXECUTORS = {
+    'pandas': _run_pandas,
+    'sqlite': _run_sqlite,
+    'duckdb': _run_duckdb,
+}
+
+
+def run(spec, engine='pandas', data_dir=DATA_DIR, cube=None):
+    """Execute a spec; `cube` lets the pandas engine reuse an already-loaded
+    cube (used only if it has the spec's granularity)."""
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine: {engine!r} (expected one of {ENGINES})")
+    return _finish(EXECUTORS[engine](spec, data_dir, cube), spec)
+
+
+def _row_mask(frame, where):
+    mask = np.ones(len(frame), dtype=bool)
+    for col, value in where.items():
+        values = ordinals(frame['date'], col) if col in GRANULARITIES else frame[col]
+        if pd.api.types.is_list_like(value):
+            mask &= values.isin(list(value)).to_numpy()
+        else:
+            mask &= (values == value).to_numpy()
+    return mask
+
+
+def fetch_rows(source, where, engine='pandas', columns=None, data_dir=DATA_DIR, frame=None, index=None):
+    """Raw rows of one source matching `where` (time filters apply to the date).
+
+    The pandas engine filters `frame` (default: the loaded source) through
+    `index`, a RowIndex of it, when given, instead of masking every row.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine: {engine!r} (expected one of {ENGINES})")
+    if engine == 'sqlite':
+        out = sqlite_backend.rows(source, where, columns, data_dir)
+    elif engine == 'duckdb':
+        out = duckdb_backend.rows(source, where, columns, data_dir)
+    else:
+        frame = load_frame(source, data_dir) if frame is None else frame
+        if index is not None:
+            out = (frame[columns] if columns else frame).take(index.select(frame, where))
+        else:
+            out = frame[_row_mask(frame, where)]
+            out = out[columns] if columns else out
+        out = out.reset_index(drop=True)
+    # plain strings whatever the engine
+    strings = [c for c in out.columns
+               if isinstance(out[c].dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(out[c])]
+    return out.astype({c: object for c in strings})
@@ -0,0 +1,74 @@
+"""Least-squares lines y = intercept + slope·x for every group at once.
+
+grouped_ols replaces groupby().apply(np.polyfit) with a few bincounts over
+group codes: one pass for each group's n, Σx and Σy, and one for the sums of
+squared and cross deviations from the group means (Sxx, Sxy, Syy). Slope,
+intercept, r², the slope's standard error and the x range all follow
+from those sums. The cost is linear in rows, with no Python call per group.
+Deviations are taken from the group means, not expanded as
+Σx² - (Σx)²/n, so large offsets (e.g. durations in minutes) lose no
+precision.
+
+fit_lines turns the fits into the two end points of each group's line over
+its x range, which is what transform_regression would draw, so charts can
+overlay the same fits the tables report.
+"""
+import numpy as np
+import pandas as pd
+
+FIT_COLUMNS = ['n', 'slope', 'intercept', 'r2', 'stderr', 'x_min', 'x_max']
+
+
+def grouped_ols(df, by, x, y):
+    """Per-`by` group fit of `y` on `x`: by columns + FIT_COLUMNS, sorted by `by`.
+
+    Rows with a missing x or y are left out. Groups with fewer than two
+    distinct x values get a NaN slope (np.polyfit would be rank-deficient),
+    and fewer than three points a NaN stderr.
+    """
+    by = [by] if isinstance(by, str) else list(by)
+    data = df[by + [x, y]].dropna(subset=[x, y])
+    groups = data.groupby(by, observed=True, sort=True)
+    # ngroup() is NaN (float) for rows with a missing key: they belong to no group
+    codes = groups.ngroup().fillna(-1).to_numpy(np.int64)
+    keep = codes >= 0
+    codes = codes[keep]
+    xs = data[x].to_numpy(dtype=np.float64)[keep]
+    ys = data[y].to_numpy(dtype=np.float64)[keep]
+
+    n = np.bincount(codes, minlength=groups.ngroups).astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        x_mean = np.bincount(codes, xs, groups.ngroups) / n
+        y_mean = np.bincount(codes, ys, groups.ngroups) / n
+        dx, dy = xs - x_mean[codes], ys - y_mean[codes]
+        sxx = np.bincount(codes, dx * dx, groups.ngroups)
+        sxy = np.bincount(codes, dx * dy, groups.ngroups)
+        syy = np.bincount(codes, dy * dy, groups.ngroups)
+
+        slope = np.where(sxx > 0, sxy / sxx, np.nan)
+        rss = np.maximum(syy - slope * sxy, 0)
+        stderr = np.where(n > 2, np.sqrt(rss / (n - 2) / sxx), np.nan)
+        r2 = np.where(syy > 0, sxy * sxy / (sxx * syy), np.nan)
+
+    out = groups.size().reset_index()[by]
+    extent = groups[x].agg(['min', 'max'])
+    out['n'] = n.astype(np.int64)
+    out['slope'] = slope
+    out['intercept'] = y_mean - slope * x_mean
+    out['r2'] = r2
+    out['stderr'] = stderr
+    out['x_min'] = extent['min'].to_numpy(dtype=np.float64)
+    out['x_max'] = extent['max'].to_numpy(dtype=np.float64)
+    return out
+
+
+def fit_lines(fit, x, y):
+    """Each group's fitted line as two rows, at its smallest and largest x."""
+    by = [c for c in fit.columns if c not in FIT_COLUMNS]
+    fit = fit[fit['slope'].notna()]
+    ends = pd.concat([
+        fit[by].assign(**{x: fit['x_min']}),
+        fit[by].assign(**{x: fit['x_max']}),
+    ]).sort_index(kind='stable')
+    ends[y] = fit['intercept'].reindex(ends.index) + fit['slope'].reindex(ends.index) * ends[x]
+    return ends.reset_index(drop=True)
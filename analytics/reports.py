@@ -0,0 +1,557 @@
+"""The dashboards' analyses as plain functions, plus a store for their results.
+
+Each compute_* function takes a Source and returns a dict of the tables its
+dashboard shows, with no Streamlit involved:
+
+    compute_adoption(source, n_months=4)
+    compute_efficiency(source)  # with bootstrap intervals (analytics.bootstrap)
+    compute_quality(source, selection=None, threshold=0.70)
+    quality_options(source)     # the quality dashboard's filter choices
+    compute_thresholds(source, selection=None, threshold=0.70)
+    compute_periods(source, granularity='week')
+
+A Source runs query specs and row fetches on one engine. The dashboards pass
+one backed by their Streamlit caches (st_cache.source). compute_reports.py
+runs the same functions as a batch job and saves the results with
+save_report. The dashboards then read them back with load_report as long as
+the data has not changed since, and only compute live otherwise.
+
+Stored reports are pickles under data/.cache/reports/, one per analysis and
+parameter set, tagged with the content hashes of the three sources.
+"""
+import hashlib
+import os
+import pickle
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analytics.bootstrap import saved_intervals
+from analytics.chart_data import reduce_points, top_n
+from analytics.cube import load_cube, task_rows
+from analytics.histograms import histogram_index, load_histograms, quantiles, select_cells, share_below
+from analytics.loader import CACHE_DIR_NAME, DATA_DIR, load_frame, source_version, unique_tmp
+from analytics.periods import labels as period_labels
+from analytics.periods import ordinals
+from analytics.query import fetch_rows, query, run
+from analytics.query import granularity as spec_granularity
+from analytics.regression import fit_lines, grouped_ols
+from analytics.row_index import source_index
+from analytics.teams import user_team_map
+from analytics.trends import (
+    STAGNANT, adoption_matrices, adoption_rates, last_complete_month, month_labels, month_window,
+    trend_table
+)
+
+REPORTS_DIR_NAME = 'reports'
+SOURCES = ('ai_usage_logs', 'manual_task_logs', 'user_directory')
+THRESHOLD = 0.70
+OTHER = 'Other'
+
+
+class Source:
+    """Query specs, row fetches and sources on one engine, read from `data_dir`.
+
+    The pandas engine loads the cube at each granularity it is asked for on
+    first use, unless one is passed in (the monthly cube), and fetches rows
+    through an inverted index of each source built on its first fetch.
+    Accuracy histograms (analytics.histograms) are the same on every engine.
+    `workers` processes draw the bootstrap resamples (analytics.bootstrap).
+    """
+
+    def __init__(self, engine='pandas', data_dir=DATA_DIR, cube=None, workers=1):
+        self.engine = engine
+        self.data_dir = data_dir
+        self.workers = workers
+        self._cubes = {} if cube is None else {'month': cube}
+        self._indexes = {}
+        self._histograms = None
+
+    def table(self, spec):
+        cube = None
+        if self.engine == 'pandas':
+            g = spec_granularity(spec)
+            if g not in self._cubes:
+                self._cubes[g] = load_cube(self.data_dir, g)
+            cube = self._cubes[g]
+        return run(spec, self.engine, self.data_dir, cube)
+
+    def rows(self, source, where, columns=None):
+        frame = index = None
+        if self.engine == 'pandas':
+            if source not in self._indexes:
+                frame = self.frame(source)
+                self._indexes[source] = frame, source_index(source, frame)
+            frame, index = self._indexes[source]
+        return fetch_rows(source, where, self.engine, columns, self.data_dir, frame, index)
+
+    def histograms(self, where):
+        if self._histograms is None:
+            cells = load_histograms(self.data_dir)
+            self._histograms = cells, histogram_index(cells)
+        return select_cells(*self._histograms, where)
+
+    def frame(self, name):
+        return load_frame(name, self.data_dir)
+
+    def user_teams(self):
+        return user_team_map(self.data_dir)
+
+
+# a) adoption
+
+ADOPTION_COLUMNS = ['total_tasks', 'ai_tasks', 'adoption_rate']
+
+
+def compute_adoption(source, n_months=4):
+    """Adoption by team and task type, and team/user trends over the last
+    `n_months` complete months of the AI log."""
+    window = month_window(last_complete_month(source.frame('ai_usage_logs')['date']), n_months)
+    labels = month_labels(window)
+
+    def adoption(by, **where):
+        return source.table(query(by, **where))[by + ADOPTION_COLUMNS]
+
+    # user×month and team×month AI/total counts for the window
+    matrices = adoption_matrices(
+        adoption(['team', 'user_id', 'month'], month=window), window, ai='ai_tasks', total='total_tasks'
+    )
+
+    overall_tt = adoption(['team', 'task_type'], month=window).rename(
+        columns={'adoption_rate': 'overall_adoption_rate'}
+    )
+    pivot_tt = (
+        adoption(['team', 'task_type', 'month'], month=window)
+        .pivot(index=['team', 'task_type'], columns='month', values='adoption_rate')
+        .reindex(columns=window, fill_value=0)
+        .reset_index()
+    )
+    pivot_tt.columns = ['team', 'task_type'] + labels
+
+    team = adoption(['team'], month=window)
+    team_monthly = (
+        adoption_rates(matrices['team_ai'], matrices['team_total'])
+        .stack()
+        .rename('adoption')
+        .rename_axis(['team', 'month'])
+        .reset_index()
+    )
+
+    users = source.frame('user_directory')
+    user_rates = (
+        trend_table(matrices['user_ai'], matrices['user_total'])
+        .merge(users[['user_id', 'full_name']], on='user_id', how='left')
+        .merge(source.user_teams().reset_index(), on='user_id', how='left')
+    )
+    stagnant = (user_rates['n_months'] >= 2) & user_rates[labels].fillna(0).eq(0).all(axis=1)
+    # per-user bar chart: the biggest movers, the rest as one bar
+    user_bars = top_n(
+        user_rates[['user_id', 'full_name', 'team', 'Avg MoM abs %', 'decline_count', 'Status']],
+        'Avg MoM abs %', other={'full_name': 'Other ({n} users)', 'Status': OTHER},
+    )
+    return {
+        'window':         window,
+        'overall_tt':     overall_tt,
+        'adopt_tt':       overall_tt.merge(pivot_tt, on=['team', 'task_type'], how='left'),
+        'team':           team,
+        'ums_totals':     team.rename(columns={'adoption_rate': 'overall_adoption_rate'}),
+        'team_monthly':   team_monthly,
+        'team_trend':     trend_table(matrices['team_ai'], matrices['team_total']),
+        'user_rates':     user_rates,
+        'user_bars':      user_bars.assign(order=range(len(user_bars))),
+        'decliners':      user_rates[user_rates['Status'] == STAGNANT],
+        'decline_since':  user_rates[user_rates['since_decline_count'] > user_rates['since_increase_count']],
+        'stagnant_users': user_rates[stagnant],
+    }
+
+
+# b) efficiency
+
+PRE_AI_MONTHS = ordinals(['2024-10-01', '2024-11-01'])     # only the manual logs cover these
+POST_AI_MONTHS = ordinals(pd.date_range('2025-01-01', '2025-04-01', freq='MS'))
+
+
+def _pct_saved(means, by):
+    """Mean AI and Manual duration per `by` group of a query result by `by` +
+    method, and the % of time saved."""
+    pivot = means.pivot(index=by, columns='method', values='dur_mean').reindex(columns=['AI', 'Manual'])
+    pivot['pct_time_saved'] = (pivot['Manual'] - pivot['AI']) / pivot['Manual'] * 100
+    return pivot
+
+
+def _saved(source, by, **where):
+    """Mean AI and Manual duration per `by` group, and the % of time saved."""
+    return _pct_saved(source.table(query(by + ['method'], **where)), by)
+
+
+def user_savings(source):
+    """Per user × task type logged with both methods: the user's mean Manual
+    and AI durations, their task counts, the saving, and the user's team.
+
+    One query by user, task type and method, i.e. one group-by over the
+    cube's cells (or the SQL rows) whatever the log size.
+    """
+    cells = source.table(query(['user_id', 'task_type', 'method'])).set_index(['user_id', 'task_type'])
+    ai, manual = cells[cells['method'] == 'AI'], cells[cells['method'] == 'Manual']
+    users = pd.DataFrame({
+        'n_manual':       manual['dur_count'],
+        'avg_dur_manual': manual['dur_mean'],
+        'n_ai':           ai['dur_count'],
+        'avg_dur_ai':     ai['dur_mean'],
+    }).dropna().astype({'n_manual': 'int64', 'n_ai': 'int64'})
+    users['minutes_saved'] = users['avg_dur_manual'] - users['avg_dur_ai']
+    users['pct_time_saved'] = users['minutes_saved'] / users['avg_dur_manual'] * 100
+    users = users.reset_index().merge(source.user_teams().reset_index(), on='user_id', how='left')
+    return users[['team'] + [col for col in users.columns if col != 'team']]
+
+
+def _matched_saved(users, by):
+    """Matched time saved per `by` group: each AI task set against its user's
+    own mean manual duration for the task type (users weighted by AI tasks)."""
+    weighted = users.assign(
+        _manual=users['avg_dur_manual'] * users['n_ai'], _ai=users['avg_dur_ai'] * users['n_ai']
+    )
+    out = weighted.groupby(by, sort=True).agg(
+        users=('user_id', 'size'), ai_tasks=('n_ai', 'sum'), _manual=('_manual', 'sum'), _ai=('_ai', 'sum')
+    )
+    out['avg_dur_manual'] = out.pop('_manual') / out['ai_tasks']
+    out['avg_dur_ai'] = out.pop('_ai') / out['ai_tasks']
+    out['minutes_saved'] = out['avg_dur_manual'] - out['avg_dur_ai']
+    out['pct_time_saved'] = out['minutes_saved'] / out['avg_dur_manual'] * 100
+    return out.reset_index()
+
+
+def _saved_intervals(source, rows, by):
+    """Bootstrap intervals of the mean durations and % time saved per `by` group."""
+    out = saved_intervals(rows, by, workers=source.workers)
+    return out.astype({col: str for col in by})
+
+
+def _with_intervals(table, intervals, on, columns):
+    """`table` with the '_lo'/'_hi' interval of each of `columns` after it."""
+    bounds = [f'{col}{end}' for col in columns for end in ('_lo', '_hi')]
+    out = table.merge(intervals[on + bounds], on=on, how='left')
+    order = [c for col in table.columns for c in [col] + ([f'{col}_lo', f'{col}_hi'] if col in columns else [])]
+    return out[order].rename_axis(columns=table.columns.name)
+
+
+def _month_pivot(table, value, fill_value=np.nan, dtype=None):
+    """task_type × month table of one statistic of a query result by (at
+    least) task_type and month, months as 'YYYY-MM'."""
+    pivot = table.pivot(index='task_type', columns='month', values=value).fillna(fill_value)
+    if dtype:
+        pivot = pivot.astype(dtype)  # e.g. minute totals, NaN-free once filled
+    pivot.columns = pd.Index(period_labels(pivot.columns), name='month')
+    return pivot.reset_index()
+
+
+def _by_month(source, value, fill_value=np.nan, dtype=None, **where):
+    """task_type × month table of one statistic, months as 'YYYY-MM'."""
+    return _month_pivot(source.table(query(['task_type', 'month'], **where)), value, fill_value, dtype)
+
+
+def compute_efficiency(source):
+    """Durations, time saved and task minutes by team, task type, month and method.
+
+    Per-team tables are dicts keyed by team, sliced from one query over all
+    teams. Mean durations and % time saved come with 95% bootstrap intervals
+    ('_lo', '_hi'), resampled from the rows of both logs, so they are the
+    same on every engine.
+
+    matched_* set each user's AI tasks against the same user's manual
+    durations for the task type (user_savings), so differences between the
+    users who adopt AI and those who don't drop out: per user
+    ('matched_users'), per team × task type ('matched_saved', next to the
+    unmatched 'pct_time_saved_all') and per task type ('matched_overall').
+    """
+    means = source.table(query(['team', 'task_type', 'method']))
+    monthly = source.table(query(['team', 'method', 'task_type', 'month']))
+    all_monthly = source.table(query(['method', 'task_type', 'month']))
+    teams = list(means['team'].unique())
+    rows = task_rows(source.frame('ai_usage_logs'), source.frame('manual_task_logs'), source.user_teams())
+    team_ci = _saved_intervals(source, rows, ['team', 'task_type'])
+    task_ci = _saved_intervals(source, rows, ['task_type'])
+    durations = ['avg_dur_ai', 'avg_dur_manual']
+
+    out = {'teams': teams}
+    out['avg_durations'] = {
+        team: _with_intervals(
+            means[means['team'] == team]
+            .pivot(index='task_type', columns='method', values='dur_mean')
+            .rename(columns={'AI': 'avg_dur_ai', 'Manual': 'avg_dur_manual'})
+            .reset_index(),
+            team_ci[team_ci['team'] == str(team)], ['task_type'], durations,
+        )
+        for team in teams
+    }
+    saved = _pct_saved(means, ['team', 'task_type']).reset_index()
+    out['percent_saved'] = _with_intervals(
+        saved[['task_type', 'pct_time_saved', 'team']], team_ci, ['team', 'task_type'], ['pct_time_saved'],
+    )
+    out['overall_saved'] = _with_intervals(
+        _saved(source, ['task_type']).reset_index()[['task_type', 'pct_time_saved']],
+        task_ci, ['task_type'], ['pct_time_saved'],
+    )
+
+    for method in ['AI', 'Manual']:
+        key = method.lower()
+        rows_of = {t: monthly[(monthly['team'] == t) & (monthly['method'] == method)] for t in teams}
+        out[f'{key}_durations'] = {t: _month_pivot(rows_of[t], 'dur_mean') for t in teams}
+        out[f'{key}_minutes'] = {t: _month_pivot(rows_of[t], 'dur_sum', 0, 'int64') for t in teams}
+        overall = all_monthly[all_monthly['method'] == method]
+        out[f'all_{key}_minutes'] = _month_pivot(overall, 'dur_sum', 0, 'int64')
+        out[f'all_{key}_durations'] = _month_pivot(overall, 'dur_mean', 0)
+
+    out['pre_ai'] = _by_month(source, 'dur_sum', 0, 'int64', month=PRE_AI_MONTHS, method='Manual')
+    out['post_ai'] = _by_month(source, 'dur_sum', 0, 'int64', month=POST_AI_MONTHS)
+
+    users = user_savings(source)
+    out['matched_users'] = users
+    out['matched_saved'] = _matched_saved(users, ['team', 'task_type']).merge(
+        saved[['team', 'task_type', 'pct_time_saved']].rename(columns={'pct_time_saved': 'pct_time_saved_all'}),
+        on=['team', 'task_type'], how='left',
+    )
+    out['matched_overall'] = _matched_saved(users, ['task_type'])
+    return out
+
+
+# c) AI quality
+
+def quality_rows(source, **where):
+    """AI-used entries with accuracy matching `where`."""
+    df = source.rows('ai_usage_logs', {'used_ai_tool': True, **where})
+    df = df[df['ai_prediction_accuracy'].notna()].copy()
+    df['month'] = ordinals(df['date'])
+    return df
+
+
+def quality_options(source):
+    """Teams, task types, users and month ordinals of the AI-used entries,
+    in order of appearance: the filter choices and the default selection."""
+    df = quality_rows(source)
+    return (
+        tuple(df['team'].unique()),
+        tuple(df['task_type'].unique()),
+        tuple(int(u) for u in df['user_id'].unique()),
+        tuple(int(m) for m in df['month'].unique()),
+    )
+
+
+def _accuracy(source, by, where):
+    """Mean accuracy/duration per `by` group over the AI-used entries."""
+    out = source.table(query(by, method='AI', **where))
+    return out[out['acc_count'] > 0]
+
+
+def _quality_where(source, selection):
+    teams, tasks, user_ids, months = selection or quality_options(source)
+    return {
+        'team': list(teams), 'task_type': list(tasks),
+        'user_id': list(user_ids), 'month': list(months),
+    }
+
+
+def _pct_below(cells, by, threshold):
+    out = share_below(cells, by, threshold).rename(columns={'pct_below': 'pct_below_70'})
+    return out.astype({col: str for col in by})
+
+
+def _describe(stats, quartiles):
+    """describe() of the accuracies from cube statistics and histogram quartiles."""
+    return pd.Series({
+        'count': float(stats['acc_count']), 'mean': stats['acc_mean'], 'std': stats['acc_std'],
+        'min': stats['acc_min'], **quartiles, 'max': stats['acc_max'],
+    }, name='ai_prediction_accuracy')
+
+
+def compute_thresholds(source, selection=None, threshold=THRESHOLD):
+    """Share of the entries in `selection` below `threshold` (overall, by
+    team, task type and both) and the entries themselves.
+
+    The shares are merges of the accuracy histograms, so a new threshold
+    rescans no rows; only 'low' reads the (cached) selected rows.
+    """
+    where = _quality_where(source, selection)
+    # every share is a roll-up of team × task type × bin
+    cells = source.histograms(where).groupby(['team', 'task_type', 'bin'], observed=True)[['count']].sum().reset_index()
+    df = quality_rows(source, **where)
+    is_low = (df['ai_prediction_accuracy'] < threshold).to_numpy()
+    users = source.frame('user_directory')[['user_id', 'full_name']]
+    # indexed by position among the selected entries
+    low = df[is_low].merge(users, on='user_id', how='left').set_axis(np.flatnonzero(is_low))
+    return {
+        'pct_overall': share_below(cells, [], threshold),
+        'pct_team':    _pct_below(cells, ['team'], threshold),
+        'pct_task':    _pct_below(cells, ['task_type'], threshold),
+        'pct_tt':      _pct_below(cells, ['team', 'task_type'], threshold),
+        'low':         low[['user_id', 'full_name', 'team', 'task_type', 'date', 'ai_prediction_accuracy']],
+    }
+
+
+def _slopes(df, by, x, y, name):
+    """Per-group least-squares fit of `y` on `x`, slope named `name`, plus the
+    end points of each group's line for the chart overlay."""
+    fit = grouped_ols(df, by, x, y)
+    by = [by] if isinstance(by, str) else by
+    table = fit.rename(columns={'slope': name})[by + [name, 'intercept', 'r2', 'stderr', 'n']]
+    return table, fit_lines(fit, x, y)
+
+
+def compute_quality(source, selection=None, threshold=THRESHOLD):
+    """Accuracy tables for the entries in `selection`, a (teams, task types,
+    user_ids, months) tuple as from quality_options (None: all of them).
+
+    Scatter data ('points7', 'points8', 'points12') are reduced server-side
+    (analytics.chart_data), never the raw entries.
+    """
+    where = _quality_where(source, selection)
+    df = quality_rows(source, **where)
+    users = source.frame('user_directory')[['user_id', 'full_name']]
+    t = compute_thresholds(source, selection, threshold)
+
+    mean_acc = {'acc_mean': 'ai_prediction_accuracy'}
+    t['acc_tt'] = _accuracy(source, ['team', 'task_type'], where)[['team', 'task_type', 'acc_mean']].rename(columns=mean_acc)
+    acc_month = _accuracy(source, ['month', 'team', 'task_type'], where).pivot(
+        index=['team', 'task_type'], columns='month', values='acc_mean'
+    )
+    acc_month.columns = pd.Index(period_labels(acc_month.columns), name='month')
+    t['acc_month'] = acc_month.reset_index()
+
+    task_acc = _accuracy(source, ['task_type'], where).set_index('task_type')
+    task_quartiles = quantiles(source.histograms(where), ['task_type'])
+    # tasks in order of first appearance in the rows, as the filter choices
+    t['task_stats'] = {
+        task: _describe(task_acc.loc[task], task_quartiles.loc[task]) for task in df['task_type'].unique()
+    }
+
+    usr_ac = (
+        _accuracy(source, ['user_id', 'team'], where)
+        .merge(users, on='user_id')
+        [['user_id', 'full_name', 'team', 'acc_mean', 'acc_count']]
+    )
+    usr_ac.columns = ['user_id', 'full_name', 'team', 'avg_accuracy', 'n_predictions']
+    t['usr_ac'] = usr_ac
+
+    # adoption over every AI-log entry, unaffected by the filters
+    all_logs    = source.rows('ai_usage_logs', {}, columns=['team', 'user_id', 'used_ai_tool'])
+    df_adopt    = all_logs.groupby(['team', 'user_id'])['used_ai_tool'].mean().reset_index(name='user_adoption_rate')
+    user_means  = _accuracy(source, ['user_id'], where)
+    df_acc_user = user_means[['user_id', 'acc_mean']].rename(columns={'acc_mean': 'user_avg_accuracy'})
+    t['df_user'] = df_adopt.merge(df_acc_user, on='user_id')
+    t['points7'] = reduce_points(t['df_user'], 'user_adoption_rate', 'user_avg_accuracy', ['team'], ['user_id'])
+    t['slopes7'], t['lines7'] = _slopes(
+        t['df_user'], 'team', 'user_adoption_rate', 'user_avg_accuracy', 'slope_adopt_to_acc'
+    )
+
+    # durations of the same rows as the accuracies (AI used, accuracy present)
+    user_dur = df.groupby('user_id')['task_duration_minutes'].mean().reset_index(name='user_avg_duration')
+    t['df_user2'] = user_dur.merge(df_acc_user, on='user_id').merge(df_adopt[['user_id', 'team']], on='user_id')
+    t['points8'] = reduce_points(t['df_user2'], 'user_avg_accuracy', 'user_avg_duration', ['team'], ['user_id'])
+    t['slopes8'], t['lines8'] = _slopes(
+        t['df_user2'], 'team', 'user_avg_accuracy', 'user_avg_duration', 'slope_acc_to_dur'
+    )
+
+    for name, by in [('team_trend', ['month', 'team']), ('task_trend', ['month', 'task_type']),
+                     ('tt_trend', ['month', 'team', 'task_type'])]:
+        t[name] = _accuracy(source, by, where)[by + ['acc_mean']].rename(columns=mean_acc)
+
+    # 'slope_acc_per_min' is Δ accuracy (in decimal) per 1 minute of duration
+    t['points12'] = reduce_points(
+        df, 'task_duration_minutes', 'ai_prediction_accuracy', ['team', 'task_type'], ['user_id', 'date']
+    )
+    t['slopes12'], t['lines12'] = _slopes(
+        df, ['team', 'task_type'], 'task_duration_minutes', 'ai_prediction_accuracy', 'slope_acc_per_min'
+    )
+    return t
+
+
+# d) metrics per period
+
+def compute_periods(source, granularity='week'):
+    """Adoption, durations, time saved and accuracy per `granularity` bucket
+    ('day', 'week', 'month' or 'quarter').
+
+    Tables are long, one row per group and period: the period's ordinal
+    under its granularity's name plus a 'period' label (e.g. '2025-W14').
+    All are roll-ups of the daily base cube, so they agree with the monthly
+    dashboards at every granularity.
+    """
+    g = granularity
+
+    def labelled(df):
+        return df.assign(period=period_labels(df[g], g)).reset_index(drop=True)
+
+    def stats(by, columns, **where):
+        return labelled(source.table(query(by + [g], **where))[by + [g] + columns])
+
+    saved = _saved(source, ['team', 'task_type', g]).reset_index()
+    saved.columns.name = None
+    return {
+        'granularity': g,
+        'adoption':    stats(['team'], ADOPTION_COLUMNS),
+        'all_teams':   stats([], ADOPTION_COLUMNS),
+        'durations':   stats(['team', 'task_type', 'method'], ['dur_count', 'dur_mean', 'dur_std']),
+        'saved':       labelled(saved.rename(columns={'AI': 'avg_dur_ai', 'Manual': 'avg_dur_manual'})),
+        'accuracy':    labelled(
+            _accuracy(source, ['team', 'task_type', g], {})[['team', 'task_type', g, 'acc_count', 'acc_mean', 'acc_std']]
+        ),
+    }
+
+
+# analysis name -> function(source, **params)
+REPORTS = {
+    'adoption':        compute_adoption,
+    'efficiency':      compute_efficiency,
+    'quality':         compute_quality,
+    'quality_options': quality_options,
+    'thresholds':      compute_thresholds,
+    'periods':         compute_periods,
+}
+
+
+def compute(name, source, **params):
+    if name not in REPORTS:
+        raise ValueError(f"unknown report: {name!r} (expected one of {list(REPORTS)})")
+    return REPORTS[name](source, **params)
+
+
+# stored results
+
+def report_version(data_dir=DATA_DIR):
+    """Content hashes of the sources every report is computed from."""
+    return tuple(source_version(name, data_dir) for name in SOURCES)
+
+
+def report_path(name, params, data_dir=DATA_DIR):
+    key = hashlib.sha256(repr(sorted(params.items())).encode()).hexdigest()[:16]
+    return Path(data_dir) / CACHE_DIR_NAME / REPORTS_DIR_NAME / f'{name}-{key}.pkl'
+
+
+def save_report(name, tables, data_dir=DATA_DIR, version=None, **params):
+    """Store the tables of one report computed with `params` against `version`
+    (default: the current data); returns the path."""
+    path = report_path(name, params, data_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    record = {'version': version or report_version(data_dir), 'params': params, 'tables': tables}
+    tmp = unique_tmp(path)
+    try:
+        with open(tmp, 'wb') as f:
+            pickle.dump(record, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    return path
+
+
+def load_report(name, data_dir=DATA_DIR, version=None, **params):
+    """Stored tables of one report, or None if missing or computed from other data."""
+    path = report_path(name, params, data_dir)
+    if not path.exists():
+        return None
+    with open(path, 'rb') as f:
+        record = pickle.load(f)
+    if record['version'] != (version or report_version(data_dir)) or record['params'] != params:
+        return None
+    return record['tables']
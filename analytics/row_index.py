@@ -0,0 +1,103 @@
+"""Inverted indexes on a frame's filter columns, for row fetches by selection.
+
+A boolean mask of isin() calls looks at every row of the log for every
+filter, whatever the selection. RowIndex instead keeps, per column, the row
+ids sorted by value with the offsets where each value's run starts (a
+sorted row-id array per value, CSR style), plus each row's value code:
+
+  rows of team='Sales'       order['team'][offsets[i]:offsets[i + 1]]
+  rows of several values     those runs, concatenated
+  a further filter           a code lookup on the candidate rows only
+
+select() starts from the filter with the fewest matching rows (known from
+the offsets before touching a row), then narrows it with the others, so a
+selection costs time in proportion to the rows it matches. Filters that
+select every value are skipped; time filters ('month', 'week', ...) are
+indexed on the date's ordinal (analytics.periods) in frames without such a
+column, and filters on columns without an index are applied to the
+candidate rows.
+"""
+import numpy as np
+import pandas as pd
+
+from analytics.periods import GRANULARITIES, as_ordinals, ordinals
+
+# columns indexed per source, the dashboards' filter dimensions
+INDEX_COLUMNS = {
+    'ai_usage_logs':    ['team', 'task_type', 'user_id', 'used_ai_tool', 'month'],
+    'manual_task_logs': ['task_type', 'user_id', 'month'],
+    'user_directory':   ['user_id'],
+}
+
+
+def _column(frame, col):
+    # time columns are derived from the date unless the frame has them
+    return ordinals(frame['date'], col) if col in GRANULARITIES and col not in frame else frame[col]
+
+
+def _as_list(value):
+    return list(value) if pd.api.types.is_list_like(value) else [value]
+
+
+class RowIndex:
+    """Sorted row-id arrays per value of each of `columns` of `frame`."""
+
+    def __init__(self, frame, columns):
+        self.n_rows = len(frame)
+        self.columns = [col for col in columns if col in frame or col in GRANULARITIES]
+        id_type = np.int32 if self.n_rows < 2**31 else np.int64
+        self._values, self._codes, self._order, self._offsets = {}, {}, {}, {}
+        for col in self.columns:
+            codes, values = pd.factorize(_column(frame, col), sort=True, use_na_sentinel=True)
+            # NaN rows (code -1) belong to no value
+            counts = np.bincount(codes[codes >= 0], minlength=len(values))
+            self._values[col] = pd.Index(values)
+            self._codes[col] = codes.astype(id_type)
+            self._order[col] = np.argsort(codes, kind='stable').astype(id_type)[(codes < 0).sum():]
+            self._offsets[col] = np.concatenate([[0], np.cumsum(counts)])
+
+    def _positions(self, col, values):
+        if col in GRANULARITIES:
+            values = as_ordinals(values, col)
+        pos = self._values[col].get_indexer(pd.Index(values).unique())
+        return pos[pos >= 0]
+
+    def count(self, col, values):
+        """Number of rows whose `col` is in `values`, without reading any."""
+        pos = self._positions(col, values)
+        offsets = self._offsets[col]
+        return int((offsets[pos + 1] - offsets[pos]).sum())
+
+    def rows(self, col, values):
+        """Sorted ids of the rows whose `col` is in `values`."""
+        pos = self._positions(col, values)
+        order, offsets = self._order[col], self._offsets[col]
+        out = np.concatenate([order[offsets[p]:offsets[p + 1]] for p in pos] or [order[:0]])
+        return np.sort(out) if len(pos) > 1 else out
+
+    def select(self, frame, where):
+        """Sorted ids of the rows of `frame` (the indexed frame) matching every
+        filter in `where`; a list value means 'isin'."""
+        indexed, other = {}, {}
+        for col, value in where.items():
+            (indexed if col in self._values else other)[col] = _as_list(value)
+        sizes = {col: self.count(col, values) for col, values in indexed.items()}
+        # a filter matching every row narrows nothing
+        narrowing = sorted((col for col in indexed if sizes[col] < self.n_rows), key=sizes.get)
+        if not narrowing:
+            ids = np.arange(self.n_rows)
+        else:
+            ids = self.rows(narrowing[0], indexed[narrowing[0]])
+        for col in narrowing[1:]:
+            wanted = np.zeros(len(self._values[col]), dtype=bool)
+            wanted[self._positions(col, indexed[col])] = True
+            codes = self._codes[col][ids]
+            ids = ids[(codes >= 0) & wanted[codes]]
+        for col, values in other.items():
+            ids = ids[_column(frame.iloc[ids], col).isin(values).to_numpy()]
+        return ids
+
+
+def source_index(name, frame):
+    """RowIndex of a loaded source on its INDEX_COLUMNS."""
+    return RowIndex(frame, INDEX_COLUMNS.get(name, []))
@@ -0,0 +1,105 @@
+"""Column types of the source logs and of the frames derived from them.
+
+One declaration per column name, shared by every source that has it:
+
+  user_id                  int32
+  task_duration_minutes    int16 (up to 32,767 minutes; parsing fails beyond)
+  ai_prediction_accuracy   float32 (widened exactly by loader.widen_float32)
+  date, join_date          date32, datetime64 in pandas
+  day, week                int32 day and week ordinals (analytics.periods)
+  month, quarter           int16 month and quarter ordinals
+  team, task_type, method, categoricals over the fixed sets in CATEGORIES,
+  role_title, region       int8 codes
+  summary counts/totals    int32
+
+Fixed category sets give every frame, chunk and worker process the same
+categories in the same order, so frames concatenate and compare without
+falling back to object strings. Values outside a set are not dropped: they
+are appended, sorted, after the declared ones (validate flags them).
+
+memory_usage() reports the bytes per row of a frame, for comparing these
+types with pandas' defaults (benchmarks/bench_memory.py).
+"""
+import hashlib
+
+import pandas as pd
+import pyarrow as pa
+
+PARSE_VERSION = 2  # bump when the CSV parsing changes (2: empty strings are null)
+
+CATEGORIES = {
+    'team':       ['Finance', 'People', 'Sales'],
+    'task_type':  ['budget_reconciliation', 'forecast_model', 'hiring_pipeline', 'quote_builder'],
+    'role_title': ['Analyst', 'Executive', 'Manager'],
+    'region':     ['EU', 'UK', 'US'],
+    'method':     ['AI', 'Manual'],
+}
+
+# column -> Arrow type it is stored as; categorical columns parse as strings
+# and are dictionary-encoded over CATEGORIES afterwards, months parse as
+# 'YYYY-MM' text and become month ordinals
+TYPES = {
+    'user_id':                pa.int32(),
+    'team':                   pa.string(),
+    'task_type':              pa.string(),
+    'date':                   pa.date32(),
+    'task_duration_minutes':  pa.int16(),
+    'used_ai_tool':           pa.bool_(),
+    'ai_prediction_accuracy': pa.float32(),
+    'full_name':              pa.string(),
+    'role_title':             pa.string(),
+    'join_date':              pa.date32(),
+    'region':                 pa.string(),
+    'day':                    pa.int32(),
+    'week':                   pa.int32(),
+    'month':                  pa.int16(),
+    'quarter':                pa.int16(),
+    'task_count_ai':          pa.int32(),
+    'task_count_manual':      pa.int32(),
+    'total_duration_ai':      pa.int32(),
+    'total_duration_manual':  pa.int32(),
+    'ai_tasks':               pa.int32(),
+    'manual_tasks':           pa.int32(),
+    'total_tasks':            pa.int32(),
+    'adoption_rate':          pa.float64(),
+    'ai_avg_dur':             pa.float64(),
+    'manual_avg_dur':         pa.float64(),
+}
+
+
+def column_types(*columns):
+    """{column: Arrow type} for the named columns, in the given order."""
+    return {col: TYPES[col] for col in columns}
+
+
+def categories(column, values=()):
+    """The declared categories of `column`, then any other `values`, sorted."""
+    known = CATEGORIES[column]
+    extra = sorted(set(v for v in values if isinstance(v, str)) - set(known))
+    return known + extra
+
+
+def category_dtype(column, values=()):
+    """pandas CategoricalDtype over categories(column, values)."""
+    return pd.CategoricalDtype(categories(column, values))
+
+
+def as_categories(frame, columns=None):
+    """`frame` with its categorical columns (default: all in CATEGORIES) on
+    the declared category sets."""
+    columns = [c for c in (columns or CATEGORIES) if c in frame]
+    return frame.astype({
+        col: category_dtype(col, frame[col].dropna().unique()) for col in columns
+    })
+
+
+def schema_digest(columns):
+    """Short hash of the declared types of `columns` and PARSE_VERSION;
+    caches built under other types or parsing rules are rebuilt."""
+    spec = [PARSE_VERSION] + [(col, str(TYPES.get(col)), CATEGORIES.get(col)) for col in columns]
+    return hashlib.sha256(repr(spec).encode()).hexdigest()[:16]
+
+
+def memory_usage(frame):
+    """Bytes per row of `frame`, counting string contents ('deep')."""
+    return frame.memory_usage(deep=True, index=False).sum() / max(len(frame), 1)
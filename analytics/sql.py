@@ -0,0 +1,65 @@
+"""SQL building blocks shared by the SQLite and DuckDB backends."""
+import numpy as np
+import pandas as pd
+
+from analytics.periods import GRANULARITIES, as_ordinals, starts
+
+
+def period_ranges(values, granularity='month'):
+    """Contiguous runs of `granularity` ordinals as [start, end) date pairs."""
+    values = np.unique(as_ordinals(list(values), granularity))
+    ranges = []
+    for m in values:
+        if ranges and ranges[-1][1] == m:
+            ranges[-1][1] = m + 1
+        else:
+            ranges.append([m, m + 1])
+    dates = starts(np.ravel(ranges), granularity).strftime('%Y-%m-%d') if ranges else []
+    return list(zip(dates[::2], dates[1::2]))
+
+
+def period_columns(expressions, column):
+    """SELECT list of every granularity's ordinal of `column`, from the
+    dialect's {granularity: expression template}."""
+    return ', '.join(f'{expressions[g].format(column)} AS {g}' for g in GRANULARITIES)
+
+
+def _param(value):
+    if isinstance(value, pd.Timestamp):
+        return value.strftime('%Y-%m-%d')
+    return value.item() if hasattr(value, 'item') else value
+
+
+def where_clause(where):
+    """WHERE clause and '?' parameters for a filter dict (list values mean IN).
+
+    Time filters become date ranges rather than expressions on the column,
+    so an index (SQLite) or zone map (DuckDB) on date can serve them.
+    """
+    clauses, params = [], []
+    for dim, value in where.items():
+        if dim in GRANULARITIES:
+            values = value if pd.api.types.is_list_like(value) else [value]
+            ranges = period_ranges(values, dim)
+            if not ranges:
+                clauses.append('false')
+                continue
+            clauses.append('(' + ' OR '.join('(date >= ? AND date < ?)' for _ in ranges) + ')')
+            params += [d for r in ranges for d in r]
+            continue
+        if pd.api.types.is_list_like(value):
+            values = list(value)
+            clauses.append(f"{dim} IN ({', '.join('?' * len(values))})" if values else 'false')
+            params += [_param(v) for v in values]
+        else:
+            clauses.append(f'{dim} = ?')
+            params.append(_param(value))
+    return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+
+def not_null(filters, by):
+    """`filters` extended to drop rows with a NULL in any `by` column."""
+    clause = ' AND '.join(f'{d} IS NOT NULL' for d in by)
+    if not clause:
+        return filters
+    return f"{filters} AND {clause}" if filters else f" WHERE {clause}"
@@ -0,0 +1,161 @@
+"""SQLite execution backend.
+
+The three sources are loaded into data/.cache/logs.sqlite with the same
+schema as the shipped data/all_data.db, plus indexes on
+ai_usage_logs(team, task_type, date), (user_id, date) and (used_ai_tool).
+The tasks view unions the AI-log and manual-log rows at the cube's grain:
+manual rows take the user's team from a user_team table written from the
+user→team index (analytics.teams). The database is rebuilt, atomically,
+whenever the content hash of a source changes.
+
+Aggregations run as a single GROUP BY (variance via a windowed mean, i.e.
+two-pass M2) and filters compile to WHERE clauses the indexes can serve;
+time filters become date ranges rather than expressions on the column.
+"""
+import os
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analytics.loader import CACHE_DIR_NAME, DATA_DIR, load_frame, source_version, unique_tmp, widen_float32
+from analytics.sql import not_null, period_columns, where_clause
+from analytics.teams import user_team_map
+
+DB_FILE = 'logs.sqlite'
+SCHEMA = '4'  # bump when the tables or views change
+TABLES = ['ai_usage_logs', 'manual_task_logs', 'user_directory']
+
+INDEXES = {
+    'ai_team_task_date':     ('ai_usage_logs',    ['team', 'task_type', 'date']),
+    'ai_user_date':          ('ai_usage_logs',    ['user_id', 'date']),
+    'ai_used_ai_tool':       ('ai_usage_logs',    ['used_ai_tool']),
+    'manual_user_date':      ('manual_task_logs', ['user_id', 'date']),
+    'manual_task_date':      ('manual_task_logs', ['task_type', 'date']),
+}
+
+# day, week, month and quarter ordinals (analytics.periods) of an ISO date
+DAY = "CAST(julianday({0}) - 2440587.5 AS INTEGER)"
+MONTH = "(CAST(substr({0}, 1, 4) AS INTEGER) - 1970) * 12 + CAST(substr({0}, 6, 2) AS INTEGER) - 1"
+PERIODS = {
+    'day':     DAY,
+    'week':    f"({DAY} + 3) / 7",
+    'month':   MONTH,
+    'quarter': f"({MONTH}) / 3",
+}
+
+TASKS_VIEW = f"""
+    CREATE VIEW tasks AS
+    SELECT team, task_type, {period_columns(PERIODS, 'date')},
+           CASE WHEN used_ai_tool THEN 'AI' ELSE 'Manual' END AS method,
+           user_id, date, task_duration_minutes AS dur, ai_prediction_accuracy AS acc
+    FROM ai_usage_logs
+    UNION ALL
+    SELECT t.team, m.task_type, {period_columns(PERIODS, 'm.date')}, 'Manual',
+           m.user_id, m.date, m.task_duration_minutes, NULL
+    FROM manual_task_logs m LEFT JOIN user_team t USING (user_id)
+"""
+
+MEASURES = {'dur': 'dur', 'acc': 'acc'}
+
+
+def db_path(data_dir=DATA_DIR):
+    return Path(data_dir) / CACHE_DIR_NAME / DB_FILE
+
+
+def _write_table(conn, name, frame):
+    # same storage as data/all_data.db: ISO date text, booleans as 0/1,
+    # accuracy as the decimal from the CSV
+    for col in frame.columns:
+        if pd.api.types.is_datetime64_any_dtype(frame[col]):
+            frame[col] = frame[col].dt.strftime('%Y-%m-%d')
+        elif isinstance(frame[col].dtype, pd.CategoricalDtype):
+            frame[col] = frame[col].astype(object)
+        elif frame[col].dtype == np.float32:
+            frame[col] = widen_float32(frame[col])
+    frame.to_sql(name, conn, index=False)
+
+
+def _build(path, data_dir, versions):
+    # a temp file of its own: concurrent sessions may rebuild at the same time
+    tmp = unique_tmp(path)
+    conn = sqlite3.connect(tmp)
+    try:
+        for name in TABLES:
+            _write_table(conn, name, load_frame(name, data_dir))
+        for index, (table, cols) in INDEXES.items():
+            conn.execute(f"CREATE INDEX {index} ON {table} ({', '.join(cols)})")
+        user_team_map(data_dir).reset_index().to_sql('user_team', conn, index=False)
+        conn.execute("CREATE UNIQUE INDEX user_team_user ON user_team (user_id)")
+        conn.execute(TASKS_VIEW)
+        conn.execute("CREATE TABLE source_versions (name TEXT PRIMARY KEY, sha256 TEXT)")
+        conn.executemany("INSERT INTO source_versions VALUES (?, ?)", versions.items())
+        conn.execute("ANALYZE")
+        conn.commit()
+    except BaseException:
+        conn.close()
+        tmp.unlink(missing_ok=True)
+        raise
+    conn.close()
+    os.replace(tmp, path)
+
+
+def connect(data_dir=DATA_DIR):
+    """Connection to the indexed database, rebuilt first if a source changed."""
+    versions = {name: source_version(name, data_dir) for name in TABLES}
+    versions['schema'] = SCHEMA
+    path = db_path(data_dir)
+    if path.exists():
+        conn = sqlite3.connect(path)
+        try:
+            if dict(conn.execute("SELECT name, sha256 FROM source_versions")) == versions:
+                return conn
+        except sqlite3.DatabaseError:
+            pass
+        conn.close()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    _build(path, data_dir, versions)
+    return sqlite3.connect(path)
+
+
+def aggregate(by, where, data_dir=DATA_DIR):
+    """Cube statistics grouped by `by` over the task rows matching `where`.
+
+    Returns by + total_tasks, ai_tasks and, per measure, count/sum/m2/min/max.
+    Rows with a NULL in any `by` column are dropped, as in cube.merge_cells.
+    """
+    keys = ', '.join(by)
+    filters, params = where_clause(where)
+    filters = not_null(filters, by)
+    means = ', '.join(
+        f'AVG({col}) OVER (PARTITION BY {keys}) AS {p}_avg' for p, col in MEASURES.items()
+    )
+    stats = ', '.join(
+        f'COUNT({col}) AS {p}_count, SUM({col}) AS {p}_sum, '
+        f'SUM(({col} - {p}_avg) * ({col} - {p}_avg)) AS {p}_m2, '
+        f'MIN({col}) AS {p}_min, MAX({col}) AS {p}_max'
+        for p, col in MEASURES.items()
+    )
+    sql = f"""
+        SELECT {keys}, COUNT(*) AS total_tasks, SUM(method = 'AI') AS ai_tasks, {stats}
+        FROM (SELECT *, {means} FROM tasks{filters})
+        GROUP BY {keys} ORDER BY {keys}
+    """
+    with closing(connect(data_dir)) as conn:
+        return pd.read_sql_query(sql, conn, params=params)
+
+
+def rows(source, where, columns=None, data_dir=DATA_DIR):
+    """Raw rows of one source matching `where`, served by its indexes."""
+    filters, params = where_clause(where)
+    cols = ', '.join(columns) if columns else '*'
+    with closing(connect(data_dir)) as conn:
+        out = pd.read_sql_query(f"SELECT {cols} FROM {source}{filters} ORDER BY rowid", conn, params=params)
+    for col in ['date', 'join_date']:
+        if col in out:
+            out[col] = pd.to_datetime(out[col])
+    if 'used_ai_tool' in out:
+        out['used_ai_tool'] = out['used_ai_tool'].astype(bool)
+    return out
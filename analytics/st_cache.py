@@ -0,0 +1,150 @@
+"""Streamlit caching for the dashboards, keyed on source data versions.
+
+Streamlit re-executes a dashboard script on every widget interaction. Sources,
+their row indexes (analytics.row_index), the cube, the accuracy histograms
+and the user→team map are loaded once per data version with
+st.cache_resource (one shared, read-only object; callers must not mutate it
+in place). Query specs (query_table) and filtered rows (rows) go through
+st.cache_data keyed on the data version plus the spec or filter selection.
+Both are bounded by max_entries, with the least recently used entry evicted
+first.
+
+report() gives the tables of one analysis (analytics.reports): those stored
+by the batch job (compute_reports.py) while the data is unchanged, otherwise
+computed on the chosen engine through the caches above. Either way they are
+held once per data version with st.cache_resource, read-only like the sources.
+
+A version is the sha256 recorded in the Arrow cache of each source, so
+editing a CSV changes the key on the next rerun. Stale entries are never hit
+again and age out of the bounded caches. Checking the version costs a stat()
+and a footer read per source, not a re-hash.
+"""
+import streamlit as st
+
+from analytics.cube import load_cube
+from analytics.histograms import histogram_index, load_histograms, select_cells
+from analytics.loader import DATA_DIR, load_frame, source_version
+from analytics.query import fetch_rows, granularity, run, spec_key, where_key
+from analytics.reports import Source, compute, load_report, report_version
+from analytics.row_index import source_index
+from analytics.teams import user_team_map
+
+LOG_SOURCES = ('ai_usage_logs', 'manual_task_logs')
+
+MAX_FRAMES = 8
+MAX_TABLES = 64
+
+
+def data_version(*names, data_dir=DATA_DIR):
+    """Tuple of content hashes of the named sources (all logs by default)."""
+    return tuple(source_version(name, data_dir) for name in names or LOG_SOURCES)
+
+
+@st.cache_resource(max_entries=MAX_FRAMES, show_spinner=False)
+def _frame(name, version, data_dir):
+    return load_frame(name, data_dir)
+
+
+@st.cache_resource(max_entries=MAX_FRAMES, show_spinner=False)
+def _cube(version, data_dir, granularity='month'):
+    return load_cube(data_dir, granularity)
+
+
+@st.cache_resource(max_entries=MAX_FRAMES, show_spinner=False)
+def _row_index(name, version, data_dir):
+    return source_index(name, _frame(name, version, data_dir))
+
+
+@st.cache_resource(max_entries=MAX_FRAMES, show_spinner=False)
+def _histograms(version, data_dir):
+    cells = load_histograms(data_dir)
+    return cells, histogram_index(cells)
+
+
+@st.cache_resource(max_entries=MAX_FRAMES, show_spinner=False)
+def _user_teams(version, data_dir):
+    return user_team_map(data_dir)
+
+
+def frame(name, data_dir=DATA_DIR):
+    """Shared DataFrame for one source, reloaded only when its content changes."""
+    return _frame(name, source_version(name, data_dir), str(data_dir))
+
+
+def cube(data_dir=DATA_DIR, granularity='month'):
+    """Shared task cube at `granularity`, reloaded only when one of the logs changes."""
+    return _cube(data_version(data_dir=data_dir), str(data_dir), granularity)
+
+
+def user_teams(data_dir=DATA_DIR):
+    """Shared user→team map (analytics.teams), reloaded when the AI log changes."""
+    return _user_teams(source_version('ai_usage_logs', data_dir), str(data_dir))
+
+
+# leading-underscore arguments are not hashed; the *_key argument stands in
+@st.cache_data(max_entries=MAX_TABLES, show_spinner=False)
+def _query(key, _spec, engine, version, data_dir):
+    cells = _cube(version, data_dir, granularity(_spec)) if engine == 'pandas' else None
+    return run(_spec, engine, data_dir, cells)
+
+
+@st.cache_data(max_entries=MAX_TABLES, show_spinner=False)
+def _rows(source, key, _where, engine, columns, version, data_dir):
+    frame = index = None
+    if engine == 'pandas':
+        frame, index = _frame(source, version, data_dir), _row_index(source, version, data_dir)
+    return fetch_rows(source, _where, engine, columns and list(columns), data_dir, frame, index)
+
+
+def query_table(spec, engine='pandas', data_dir=DATA_DIR):
+    """Result of a query spec on `engine`, cached per data version and spec."""
+    return _query(spec_key(spec), spec, engine, data_version(data_dir=data_dir), str(data_dir))
+
+
+def rows(source, where, engine='pandas', columns=None, data_dir=DATA_DIR):
+    """Filtered raw rows of one source, cached per data version and filter."""
+    return _rows(
+        source, where_key(where), where, engine, columns and tuple(columns),
+        source_version(source, data_dir), str(data_dir)
+    )
+
+
+class CachedSource(Source):
+    """analytics.reports source going through the Streamlit caches."""
+
+    def table(self, spec):
+        return query_table(spec, self.engine, self.data_dir)
+
+    def rows(self, source, where, columns=None):
+        return rows(source, where, self.engine, columns, self.data_dir)
+
+    def histograms(self, where):
+        return select_cells(*_histograms(source_version('ai_usage_logs', self.data_dir), str(self.data_dir)), where)
+
+    def frame(self, name):
+        return frame(name, self.data_dir)
+
+    def user_teams(self):
+        return user_teams(self.data_dir)
+
+
+def source(engine='pandas', data_dir=DATA_DIR):
+    return CachedSource(engine, data_dir)
+
+
+@st.cache_resource(max_entries=MAX_TABLES, show_spinner=False)
+def _report(name, params, engine, version, data_dir):
+    params = dict(params)
+    stored = load_report(name, data_dir, version, **params)
+    if stored is not None:
+        return stored, True
+    return compute(name, source(engine, data_dir), **params), False
+
+
+def report(name, engine='pandas', data_dir=DATA_DIR, **params):
+    """(tables, precomputed) of one analysis, for the current data version.
+
+    `params` must be hashable (tuples, not lists).
+    """
+    version = report_version(data_dir)
+    return _report(name, tuple(sorted(params.items())), engine, version, str(data_dir))
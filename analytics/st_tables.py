@@ -0,0 +1,98 @@
+"""Table widgets for the dashboards: sections built only while open, and
+server-side paging for the large user-level tables.
+
+st.dataframe given a Styler renders every cell to HTML before it is sent, so
+a styled table costs time and browser memory in proportion to its cells, not
+to what is on screen. Two ways to avoid paying for cells nobody looks at:
+
+  section     an expander that reruns the script when it is toggled; its
+              .open is False while closed, so the caller skips the content
+  paged_table one page of a table, sorted on the server, with the Styler
+              applied to that page only
+
+Widget state (open sections, sort column, page) lives in st.session_state
+under the given key, so it survives reruns.
+
+search_select does the same for a multiselect over many options (e.g. every
+user): the browser gets the current selection plus one page of the options
+matching a search box, never the full list.
+"""
+import numpy as np
+import streamlit as st
+
+PAGE_SIZE = 50
+SEARCH_PAGE_SIZE = 100
+
+
+def section(label, key, expanded=False):
+    """Expander that tracks its state: build its content under
+    `if box.open: with box: ...` so nothing is computed while it is closed."""
+    return st.expander(label, expanded=expanded, key=key, on_change='rerun')
+
+
+def _page_count(n_rows, page_size):
+    return max(1, -(-n_rows // page_size))
+
+
+def paged_table(df, key, fmt=None, page_size=PAGE_SIZE, sort=None, descending=False, height='auto'):
+    """One page of `df` as a styled st.dataframe, sorted on a column the user picks.
+
+    `sort` is the initial sort column (None keeps the table's own order). The
+    sort runs on the full table; only the visible page is sliced out and
+    formatted with `fmt`.
+    """
+    columns = [None] + list(df.columns)
+    pages = _page_count(len(df), page_size)
+    page_key = f'{key}_page'
+    if st.session_state.get(page_key, 1) > pages:  # the table shrank, e.g. a smaller window
+        st.session_state[page_key] = 1
+
+    c1, c2, c3 = st.columns([3, 1, 2])
+    by = c1.selectbox(
+        'Sort by', columns, index=columns.index(sort), key=f'{key}_sort',
+        format_func=lambda c: '(table order)' if c is None else c
+    )
+    desc = c2.toggle('Descending', value=descending, key=f'{key}_desc')
+    page = c3.number_input(f'Page (of {pages:,})', min_value=1, max_value=pages, value=1, key=page_key)
+
+    if by is not None:
+        df = df.sort_values(by, ascending=not desc, kind='stable', na_position='last')
+    start = (page - 1) * page_size
+    rows = df.iloc[start:start + page_size]
+    st.dataframe(rows.style.format(fmt or {}), height=height, use_container_width=True)
+    st.caption(f"Rows {min(start + 1, len(df)):,}–{start + len(rows):,} of {len(df):,}")
+
+
+def search_select(label, options, key, labels=None, page_size=SEARCH_PAGE_SIZE, container=st):
+    """Multiselect over `options` (an array) offering one page of search matches at a time.
+
+    The search matches a case-insensitive substring of an option or of its
+    entry in `labels` (display strings, aligned with `options`). Picks from
+    any page accumulate in the selection. Returns the selected options, or
+    all of `options` while nothing is selected.
+    """
+    options = np.asarray(options)
+    text = options.astype(str) if labels is None else np.asarray(labels, dtype=str)
+    names = dict(zip(options.tolist(), text.tolist()))
+    selected = list(st.session_state.get(key, []))
+
+    search = container.text_input(f'Search {label.lower()}', key=f'{key}_search')
+    matches = options
+    if search:
+        needle = search.lower()
+        hit = np.char.find(np.char.lower(text), needle) >= 0
+        hit |= np.char.find(options.astype(str), needle) >= 0
+        matches = options[hit]
+    pages = _page_count(len(matches), page_size)
+    page_key = f'{key}_page'
+    if st.session_state.get(page_key, 1) > pages:  # a narrower search
+        st.session_state[page_key] = 1
+    page = container.number_input('Page', min_value=1, max_value=pages, value=1, key=page_key)
+    container.caption(f"{len(matches):,} matching · page {page:,} of {pages:,}")
+    start = (page - 1) * page_size
+    picked = set(selected)
+    shown = selected + [o for o in matches[start:start + page_size].tolist() if o not in picked]
+    chosen = container.multiselect(
+        f'{label} (none selected = all)', shown, key=key, format_func=lambda o: names.get(o, str(o))
+    )
+    return chosen if chosen else options.tolist()
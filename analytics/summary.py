@@ -0,0 +1,263 @@
+"""Incremental builder for data/user_monthly_summary.csv.
+
+Both logs are append-only, so each source keeps a high-watermark: the byte
+offset already folded in, plus a checksum of the bytes just before it. A run
+parses only the rows past the watermark. It folds their per (user_id, month)
+task counts and duration sums into the stored partial aggregates. If a source
+was rewritten (shrunk, the checksum no longer matches, or it grew past an
+unterminated last line a rebuild had read), only that source is rebuilt
+from scratch. Rebuilds read a log to its end; incremental runs leave an
+unterminated last line for the next run.
+
+New rows are streamed in chunks of at most `chunk_bytes` and folded one chunk
+at a time, so memory is bounded by the size of the aggregates rather than
+the logs. A from-scratch rebuild can instead be sharded by user_id across
+worker processes (analytics.parallel).
+
+State lives in data/.cache/summary/. state.json holds each source's
+watermark and names the partial files written at that watermark (months as
+ordinals, analytics.periods; state of an older layout is rebuilt):
+  ai_usage_logs-<offset>.arrow     partials for AI-log rows ('ai' / 'ai_manual')
+  manual_task_logs-<offset>.arrow  partials for manual-log rows ('manual_log')
+Each user's team comes from the user→team index (analytics.teams), which
+keeps its own watermark on the AI log.
+New files are written before state.json is swapped in, so an interrupted run
+leaves the previous state intact instead of double-counting rows.
+"""
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+
+from analytics.loader import (
+    CACHE_DIR_NAME, CHUNK_BYTES, DATA_DIR, SOURCES, appended_since, ensure_cache, iter_csv_chunks,
+    load_users, read_arrow, tail_checksum, unique_tmp, write_arrow
+)
+from analytics.parallel import map_shards, shard_frame
+from analytics.periods import labels, ordinals
+from analytics.teams import user_team_map
+
+STATE_DIR_NAME = 'summary'
+OUTPUT_FILE = 'user_monthly_summary.csv'
+LOG_SOURCES = ['ai_usage_logs', 'manual_task_logs']
+
+PARTIAL_KEYS = ['user_id', 'month', 'source']
+STATE_VERSION = 2  # bump when the partials' layout changes
+
+
+def _state_dir(data_dir):
+    return data_dir / CACHE_DIR_NAME / STATE_DIR_NAME
+
+
+def _partials(rows, source):
+    return (
+        rows
+        .assign(month=ordinals(rows['date']), source=source)
+        .groupby(PARTIAL_KEYS, observed=True)
+        .agg(
+            task_count     = ('task_duration_minutes', 'size'),
+            total_duration = ('task_duration_minutes', 'sum')
+        )
+        .reset_index()
+    )
+
+
+def fold(old, new, keys):
+    """Add the additive columns of `new` into `old` by `keys`.
+
+    Only keys present in `new` are re-summed; untouched rows pass through.
+    """
+    if old is None or old.empty:
+        return new
+    if new.empty:
+        return old
+    hit = old.set_index(keys).index.isin(new.set_index(keys).index)
+    merged = (
+        pd.concat([old[hit], new], ignore_index=True)
+        .groupby(keys, observed=True, sort=False)
+        .sum()
+        .reset_index()
+    )
+    return pd.concat([old[~hit], merged], ignore_index=True)
+
+
+def _aggregate_ai(rows):
+    used = rows['used_ai_tool'].astype(bool)
+    return pd.concat(
+        [_partials(rows[used], 'ai'), _partials(rows[~used], 'ai_manual')],
+        ignore_index=True
+    )
+
+
+def _aggregate_manual(rows):
+    return _partials(rows, 'manual_log')
+
+
+AGGREGATORS = {
+    'ai_usage_logs':    _aggregate_ai,
+    'manual_task_logs': _aggregate_manual,
+}
+
+
+def _read_frame(path):
+    return read_arrow(path)[0].to_pandas(date_as_object=False)
+
+
+def _max_date(rows, max_date=None):
+    if rows.empty:
+        return max_date
+    rows_max = str(rows['date'].max().date())
+    return rows_max if max_date is None else max(max_date, rows_max)
+
+
+def _fold_stream(name, path, offset, partials, max_date, chunk_bytes, final=False):
+    """Fold the rows after `offset` in, one chunk at a time (to the end of
+    the file, unterminated last line included, if `final`)."""
+    n_rows = 0
+    for rows, offset in iter_csv_chunks(path, SOURCES[name]['types'], offset, chunk_bytes, final):
+        partials = fold(partials, AGGREGATORS[name](rows), PARTIAL_KEYS)
+        max_date = _max_date(rows, max_date)
+        n_rows += len(rows)
+    return partials, offset, max_date, n_rows
+
+
+def _aggregate_shard(name, data_dir, shard, n_shards):
+    rows = shard_frame(name, data_dir, shard, n_shards)
+    return AGGREGATORS[name](rows), _max_date(rows), len(rows)
+
+
+def _aggregate_sharded(name, data_dir, path, workers):
+    """Aggregate a whole log on `workers` processes, sharded by user_id.
+
+    Shards hold disjoint users, so their partials simply concatenate.
+    """
+    # build the Arrow cache here, not in every worker at once
+    ensure_cache(name, data_dir)
+    shards = map_shards(_aggregate_shard, workers, name, data_dir)
+    partials, max_dates, n_rows = zip(*shards)
+    max_date = max((d for d in max_dates if d), default=None)
+    return pd.concat(partials, ignore_index=True), path.stat().st_size, max_date, sum(n_rows)
+
+
+def _update_source(name, data_dir, mark, chunk_bytes=CHUNK_BYTES, workers=1):
+    """Fold rows past the watermark of one log into its stored partials.
+
+    A log without a usable watermark is rebuilt on `workers` processes when
+    workers > 1; appended rows are always streamed.
+
+    Returns (partials, new watermark, rows folded).
+    """
+    path = data_dir / SOURCES[name]['file']
+    state_dir = _state_dir(data_dir)
+
+    if mark and not appended_since(path, mark['offset'], mark['checksum']):
+        mark = None  # rewritten in place: start this source over
+
+    if not mark and workers > 1:
+        partials, offset, max_date, n_rows = _aggregate_sharded(name, data_dir, path, workers)
+    else:
+        partials = _read_frame(state_dir / mark['partials']) if mark else None
+        partials, offset, max_date, n_rows = _fold_stream(
+            name, path, mark['offset'] if mark else 0, partials,
+            (mark or {}).get('max_date'), chunk_bytes, final=not mark
+        )
+    if partials is None:  # empty log, nothing folded yet
+        empty = pa.schema(SOURCES[name]['types']).empty_table().to_pandas(date_as_object=False)
+        partials = AGGREGATORS[name](empty)
+
+    new_mark = {
+        'offset':   offset,
+        'checksum': tail_checksum(path, offset),
+        'max_date': max_date,
+        'partials': f'{name}-{offset}.arrow',
+    }
+    if not n_rows and mark:
+        new_mark['partials'] = mark['partials']
+        return partials, new_mark, 0
+
+    write_arrow(partials, state_dir / new_mark['partials'])
+    return partials, new_mark, n_rows
+
+
+def _finalize(partials, user_team_map, users):
+    # manual-log rows only count for users present in the AI logs
+    partials = partials[
+        (partials['source'] != 'manual_log')
+        | partials['user_id'].isin(user_team_map.index)
+    ]
+    partials = partials.assign(
+        source=partials['source'].replace({'ai_manual': 'manual', 'manual_log': 'manual'})
+    )
+
+    # aggregate per user×month×source
+    user_monthly = (
+        partials
+        .groupby(PARTIAL_KEYS)[['task_count', 'total_duration']]
+        .sum()
+        .unstack(fill_value=0)
+    )
+    user_monthly.columns = ['_'.join(col).strip() for col in user_monthly.columns.values]
+    user_monthly = user_monthly.reset_index()
+
+    # rates & durations
+    user_monthly = user_monthly.assign(
+        ai_tasks       = user_monthly['task_count_ai'],
+        manual_tasks   = user_monthly['task_count_manual'],
+        total_tasks    = lambda df: df['ai_tasks'] + df['manual_tasks'],
+        adoption_rate  = lambda df: df['ai_tasks'] / df['total_tasks'] * 100,
+        ai_avg_dur     = lambda df: df['total_duration_ai'] / df['ai_tasks'].replace(0, pd.NA),
+        manual_avg_dur = lambda df: df['total_duration_manual'] / df['manual_tasks'].replace(0, pd.NA)
+    )
+
+    # join user profile & team
+    return (
+        user_monthly
+        .merge(users,                        on='user_id', how='left')
+        .merge(user_team_map.reset_index(), on='user_id', how='left')
+        .sort_values(['user_id', 'month'])
+    )
+
+
+def update_user_monthly_summary(full=False, data_dir=DATA_DIR, chunk_bytes=CHUNK_BYTES, workers=1):
+    """Bring user_monthly_summary.csv up to date and return it.
+
+    With full=True all stored state is discarded and every row is re-read;
+    otherwise only rows appended since the last run are parsed. Logs are
+    read `chunk_bytes` at a time, or, for a from-scratch rebuild with
+    workers > 1, aggregated in parallel shards.
+    """
+    data_dir = Path(data_dir)
+    state_dir = _state_dir(data_dir)
+    state_dir.mkdir(parents=True, exist_ok=True)
+    state_path = state_dir / 'state.json'
+    state = {} if full or not state_path.exists() else json.loads(state_path.read_text())
+    if state.get('version') != STATE_VERSION:
+        state = {}
+
+    partials, new_state, new_rows = [], {'version': STATE_VERSION}, {}
+    for name in LOG_SOURCES:
+        source_partials, new_state[name], new_rows[name] = (
+            _update_source(name, data_dir, state.get(name), chunk_bytes, workers)
+        )
+        partials.append(source_partials)
+
+    # only a sharded rebuild may load the AI log whole
+    teams = user_team_map(data_dir, chunk_bytes, use_cache=workers > 1)
+    summary = _finalize(pd.concat(partials, ignore_index=True), teams, load_users(data_dir))
+    summary.assign(month=labels(summary['month'])).to_csv(data_dir / OUTPUT_FILE, index=False)
+
+    # commit the new watermarks, then drop partial files no longer referenced
+    tmp = unique_tmp(state_path)
+    try:
+        tmp.write_text(json.dumps(new_state, indent=2))
+        os.replace(tmp, state_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    live = {new_state[name]['partials'] for name in LOG_SOURCES}
+    for path in state_dir.glob('*.arrow'):
+        if path.name not in live:
+            path.unlink()
+    return summary, new_rows
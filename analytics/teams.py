@@ -0,0 +1,103 @@
+"""User→team index: each user's modal team in the AI logs.
+
+A user's team is the one they logged the most AI-log rows under; ties go to
+the alphabetically first team (what Series.mode().iloc[0] gives). The
+summary, the cube, the SQL engines and the dashboards all take it from here,
+so a user is in the same team everywhere.
+
+The index is the row count per (user_id, team), kept in
+data/.cache/user_team.arrow together with a high-watermark on the AI log:
+the byte offset counted so far plus a checksum of the bytes just before it.
+An update counts only the rows appended since then. A log rewritten in place
+is recounted, by a group-by on its Arrow cache (or by streaming the CSV, for
+callers that must not load it whole).
+"""
+from pathlib import Path
+
+import pandas as pd
+
+from analytics.loader import (
+    CACHE_DIR_NAME, CHUNK_BYTES, DATA_DIR, SOURCES, appended_since, iter_csv_chunks, load_table,
+    read_arrow, source_path, tail_checksum, write_arrow
+)
+
+SOURCE = 'ai_usage_logs'
+INDEX_FILE = 'user_team.arrow'
+KEYS = ['user_id', 'team']
+
+
+def index_path(data_dir=DATA_DIR):
+    return Path(data_dir) / CACHE_DIR_NAME / INDEX_FILE
+
+
+def count_teams(rows):
+    """Row counts per (user_id, team) of AI-log rows."""
+    return (
+        rows
+        .assign(team=rows['team'].astype(str))
+        .groupby(KEYS)
+        .size()
+        .reset_index(name='n')
+    )
+
+
+def _add(counts, new):
+    if counts is None:
+        return new
+    return pd.concat([counts, new]).groupby(KEYS, as_index=False)['n'].sum()
+
+
+def _count_table(table):
+    counts = table.group_by(KEYS).aggregate([([], 'count_all')]).to_pandas()
+    counts = counts.rename(columns={'count_all': 'n'}).astype({'team': str})
+    return counts[KEYS + ['n']].sort_values(KEYS, ignore_index=True)
+
+
+def modal_team(counts):
+    """Most frequent team per user (ties → alphabetically first), by user_id."""
+    return (
+        counts
+        .sort_values(['user_id', 'n', 'team'], ascending=[True, False, True])
+        .drop_duplicates('user_id')
+        .set_index('user_id')['team']
+    )
+
+
+def update_team_index(data_dir=DATA_DIR, chunk_bytes=CHUNK_BYTES, use_cache=True):
+    """Bring the (user_id, team) counts up to date with the AI log; return them.
+
+    use_cache=False never loads the log whole: a recount streams the CSV in
+    `chunk_bytes` chunks instead of building the Arrow cache.
+    """
+    data_dir = Path(data_dir)
+    path, dst = source_path(SOURCE, data_dir), index_path(data_dir)
+    size = path.stat().st_size
+
+    counts, offset = None, 0
+    if dst.exists():
+        table, meta = read_arrow(dst)
+        offset = int(meta['offset'])
+        if appended_since(path, offset, meta['checksum']):
+            counts = table.to_pandas()
+            if offset == size:
+                return counts
+        else:
+            offset = 0  # rewritten in place: count it again
+
+    if counts is None and use_cache:
+        counts, offset = _count_table(load_table(SOURCE, data_dir)), size
+    else:
+        # a recount reads the log to its end, appended rows only complete lines
+        chunks = iter_csv_chunks(path, SOURCES[SOURCE]['types'], offset, chunk_bytes, final=counts is None)
+        for rows, offset in chunks:
+            counts = _add(counts, count_teams(rows))
+    if counts is None:
+        counts = pd.DataFrame({'user_id': pd.Series(dtype='int32'), 'team': pd.Series(dtype=object),
+                               'n': pd.Series(dtype='int64')})
+    write_arrow(counts, dst, metadata={'offset': str(offset), 'checksum': tail_checksum(path, offset)})
+    return counts
+
+
+def user_team_map(data_dir=DATA_DIR, chunk_bytes=CHUNK_BYTES, use_cache=True):
+    """Team per user_id (a Series named 'team'), from the up-to-date index."""
+    return modal_team(update_team_index(data_dir, chunk_bytes, use_cache))
@@ -0,0 +1,214 @@
+"""Vectorized month-over-month trend metrics over a user×month rate matrix.
+
+Rows are users (or teams), columns are consecutive months, and NaN marks a
+month with no activity. As in the original per-row loops, missing months are
+skipped: deltas are taken between each observed month and the previous
+*observed* month, not the calendar-previous one.
+
+The window is any run of consecutive month ordinals (month_window, see
+analytics.periods), and adoption_matrices builds both the user×month and
+team×month count matrices for it from a single groupby over the task rows.
+"""
+import numpy as np
+import pandas as pd
+
+from analytics.periods import as_ordinals, ordinal, ordinals, starts, window
+
+NOT_ENOUGH = 'Not enough data'
+FULL = 'Full Adopter'
+GROWING = 'Growing'
+STAGNANT = 'Stagnant/Declining'
+
+
+def _previous_observed(values):
+    """Masked array of the previous observed value for every cell.
+
+    A cell is masked when it is missing itself or has no observed
+    predecessor, so the unmasked cells are exactly the consecutive pairs of
+    the gap-skipping sequence.
+    """
+    observed = ~np.isnan(values)
+    cols = np.arange(values.shape[1])
+    # index of the latest observed column at or before each position
+    last_idx = np.maximum.accumulate(np.where(observed, cols, -1), axis=1)
+    prev_idx = np.concatenate(
+        [np.full((values.shape[0], 1), -1), last_idx[:, :-1]], axis=1
+    )
+    prev = np.take_along_axis(values, np.maximum(prev_idx, 0), axis=1)
+    mask = ~observed | (prev_idx < 0)
+    return np.ma.masked_array(prev, mask=mask), prev_idx
+
+
+def trend_metrics(values):
+    """Trend metrics for every row of a 2-D float array in one pass.
+
+    Returns a dict of 1-D arrays keyed by metric name:
+      n_months, avg_mom_abs, avg_mom_rel, decline_count, all_full,
+      first_active (column index of the first month > 0, -1 if none),
+      since_decline_count, since_increase_count.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    n_rows, n_cols = values.shape
+    cur = np.ma.masked_invalid(values)
+    cur.mask = np.ma.getmaskarray(cur)
+    prev, prev_idx = _previous_observed(values)
+
+    n_months = cur.count(axis=1)
+    deltas = cur - prev                      # masked wherever there is no pair
+
+    # the mean of gap-skipping deltas telescopes to (last - first) / (n - 1);
+    # computing it that way keeps a flat series at exactly 0 instead of ±1e-15
+    rows, observed = np.arange(n_rows), ~cur.mask
+    first_obs = values[rows, observed.argmax(axis=1)]
+    last_obs = values[rows, n_cols - 1 - observed[:, ::-1].argmax(axis=1)]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        avg_abs = np.where(n_months > 1, (last_obs - first_obs) / (n_months - 1), np.nan)
+
+    rel = np.ma.masked_where(prev == 0, deltas) / prev * 100
+    avg_rel = rel.mean(axis=1).filled(np.nan)
+
+    decline_count = (deltas < 0).filled(False).sum(axis=1)
+    all_full = (cur == 100).filled(True).all(axis=1) & (n_months > 0)
+
+    active = (cur > 0).filled(False)
+    first_active = np.where(active.any(axis=1), active.argmax(axis=1), -1)
+
+    # pairs whose earlier month is on or after the first active month
+    since = (prev_idx >= first_active[:, None]) & (first_active[:, None] >= 0)
+    since_decline = ((deltas < 0).filled(False) & since).sum(axis=1)
+    since_increase = ((deltas > 0).filled(False) & since).sum(axis=1) + 1
+
+    return {
+        'n_months':             n_months.astype(np.int64),
+        'avg_mom_abs':          avg_abs,
+        'avg_mom_rel':          avg_rel,
+        'decline_count':        decline_count.astype(np.int64),
+        'all_full':             all_full,
+        'first_active':         first_active,
+        'since_decline_count':  since_decline.astype(np.int64),
+        'since_increase_count': since_increase.astype(np.int64),
+    }
+
+
+def status(metrics, rule='avg_mom'):
+    """Status label per row.
+
+    rule='avg_mom'  : Growing when the average MoM change is positive
+                      (adoption dashboard).
+    rule='declines' : Stagnant/Declining as soon as any month declined
+                      (per-user Δ-metrics app).
+    """
+    if rule == 'avg_mom':
+        growing = metrics['avg_mom_abs'] > 0
+    elif rule == 'declines':
+        growing = metrics['decline_count'] == 0
+    else:
+        raise ValueError(f"unknown status rule: {rule!r}")
+    return np.select(
+        [metrics['n_months'] < 2, metrics['all_full'], growing],
+        [NOT_ENOUGH, FULL, GROWING],
+        default=STAGNANT,
+    )
+
+
+def add_trend_columns(rates, month_cols, rule='avg_mom'):
+    """Append the Δ-metric columns to a wide user×month frame.
+
+    `month_cols` are the rate columns in chronological order, e.g.
+    ['Jan %', 'Feb %', 'Mar %', 'Apr %']. Adds the endpoint deltas
+    ('Δ abs % (Apr–Jan)', 'Δ rel % (Apr–Jan)'), 'Avg MoM abs %',
+    'Avg MoM rel %', n_months, decline_count, Status, first_month,
+    since_decline_count and since_increase_count.
+    """
+    values = rates[month_cols].to_numpy(dtype=np.float64, na_value=np.nan)
+    m = trend_metrics(values)
+    abs_col, rel_col = delta_columns(month_cols)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rel_end = (values[:, -1] - values[:, 0]) / values[:, 0] * 100
+    labels = np.array(list(month_cols) + [None], dtype=object)
+
+    return rates.assign(**{
+        abs_col:                 values[:, -1] - values[:, 0],
+        'Avg MoM abs %':         m['avg_mom_abs'],
+        rel_col:                 np.where(np.isinf(rel_end), np.nan, rel_end),
+        'Avg MoM rel %':         m['avg_mom_rel'],
+        'n_months':              m['n_months'],
+        'decline_count':         m['decline_count'],
+        'Status':                status(m, rule),
+        'first_month':           labels[m['first_active']],
+        'since_decline_count':   m['since_decline_count'],
+        'since_increase_count':  m['since_increase_count'],
+    })
+
+
+def delta_columns(month_cols):
+    """Names of the endpoint Δ columns, e.g. ('Δ abs % (Apr–Jan)', 'Δ rel % (Apr–Jan)')."""
+    span = f"({month_cols[-1].removesuffix(' %')}–{month_cols[0].removesuffix(' %')})"
+    return f'Δ abs % {span}', f'Δ rel % {span}'
+
+
+def last_complete_month(dates):
+    """Month ordinal of the last calendar month fully covered by `dates`."""
+    return ordinal(pd.Timestamp(dates.max()) + pd.Timedelta(days=1)) - 1
+
+
+def month_window(end, n):
+    """The `n` consecutive month ordinals ending with the month of `end`
+    (an ordinal or a date, e.g. '2025-04')."""
+    return window(as_ordinals(end), n)
+
+
+def month_labels(window, suffix=' %'):
+    """Column labels for a window: 'Jan %' within one year, 'Jan 2025 %' across years."""
+    months = starts(window)
+    fmt = '%b' if months[0].year == months[-1].year else '%b %Y'
+    return [m + suffix for m in months.strftime(fmt)]
+
+
+def window_label(window):
+    """Human-readable span, e.g. 'Jan–Apr 2025'."""
+    first, last = starts([window[0], window[-1]])
+    if first.year == last.year:
+        return f"{first:%b}–{last:%b %Y}"
+    return f"{first:%b %Y}–{last:%b %Y}"
+
+
+def adoption_matrices(rows, window, ai='used_ai_tool', total=None,
+                      team='team', user='user_id'):
+    """AI/total task counts per user×month and team×month over `window`.
+
+    `rows` are either raw task rows (one per task, `ai` a bool column and
+    `total` None) or pre-aggregated rows with `ai`/`total` count columns,
+    such as user_monthly_summary. Rows need a 'month' (month ordinal) or a
+    'date' column. A single groupby over (team, user, month) is rolled up
+    to both matrices; months in the window with no tasks are NaN.
+    """
+    month = rows['month'] if 'month' in rows else ordinals(rows['date'])
+    rows = rows[month.isin(window)].assign(month=month)
+    counts = (
+        rows
+        .groupby([team, user, 'month'], observed=True)
+        .agg(ai=(ai, 'sum'), total=(total, 'sum') if total else (ai, 'size'))
+    )
+    ai_m = counts['ai'].astype(float).unstack('month').reindex(columns=window)
+    total_m = counts['total'].astype(float).unstack('month').reindex(columns=window)
+    return {
+        'user_ai':    ai_m.groupby(level=user).sum(min_count=1),
+        'user_total': total_m.groupby(level=user).sum(min_count=1),
+        'team_ai':    ai_m.groupby(level=team, observed=True).sum(min_count=1),
+        'team_total': total_m.groupby(level=team, observed=True).sum(min_count=1),
+    }
+
+
+def adoption_rates(ai, total):
+    """Adoption % matrix; NaN where a row had no tasks that month."""
+    return ai / total.where(total > 0) * 100
+
+
+def trend_table(ai, total, rule='avg_mom'):
+    """Wide rate table (one labelled column per month) plus all Δ-metrics."""
+    rates = adoption_rates(ai, total)
+    labels = month_labels(rates.columns)
+    rates.columns = labels
+    return add_trend_columns(rates.reset_index(), labels, rule)
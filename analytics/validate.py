@@ -0,0 +1,96 @@
+"""Data checks on the source logs, run before anything is computed from them.
+
+Each check counts the offending rows of one source. 'error' checks break
+the contract the analyses rely on (missing keys, impossible values), so the
+pipeline stops on them. 'warning' checks flag rows worth a look (duplicates,
+unknown users, durations beyond μ ± 3σ, values outside the category sets
+of analytics.schema) but do not block the run.
+"""
+import pandas as pd
+
+from analytics.loader import DATA_DIR, SOURCES, load_frame
+from analytics.schema import CATEGORIES
+
+ERROR = 'error'
+WARNING = 'warning'
+OUTLIER_SIGMAS = 3
+
+
+class ValidationError(ValueError):
+    """Raised when a source fails an 'error' check."""
+
+    def __init__(self, report):
+        failed = report[(report['level'] == ERROR) & (report['rows'] > 0)]
+        lines = [f"  {r.source}: {r.check} ({r.rows:,} rows)" for r in failed.itertuples()]
+        super().__init__('source data failed validation:\n' + '\n'.join(lines))
+        self.report = report
+
+    def __reduce__(self):
+        # rebuilt from the report, e.g. when raised in a worker process
+        return type(self), (self.report,)
+
+
+def _duration_outliers(durations):
+    mean, std = durations.mean(), durations.std()
+    return (durations - mean).abs() > OUTLIER_SIGMAS * std
+
+
+def _log_checks(logs, users):
+    durations = logs['task_duration_minutes']
+    return [
+        ('duration not positive',              ERROR,   durations <= 0),
+        ('user_id not in user_directory',      WARNING, ~logs['user_id'].isin(users['user_id'])),
+        ('duplicate row',                      WARNING, logs.duplicated()),
+        (f'duration beyond {OUTLIER_SIGMAS}σ', WARNING, _duration_outliers(durations)),
+    ]
+
+
+def _ai_checks(logs, users):
+    accuracy = logs['ai_prediction_accuracy']
+    used = logs['used_ai_tool'].fillna(False).astype(bool)
+    return _log_checks(logs, users) + [
+        ('accuracy outside [0, 1]',       ERROR,   (accuracy < 0) | (accuracy > 1)),
+        ('accuracy without the AI tool',  WARNING, accuracy.notna() & ~used),
+        ('AI tool used without accuracy', WARNING, accuracy.isna() & used),
+    ]
+
+
+def _directory_checks(users, _):
+    return [('duplicate user_id', ERROR, users['user_id'].duplicated())]
+
+
+CHECKS = {
+    'ai_usage_logs':    _ai_checks,
+    'manual_task_logs': _log_checks,
+    'user_directory':   _directory_checks,
+}
+
+# columns every row must have (all but the accuracy of non-AI rows)
+REQUIRED = {
+    name: [c for c in SOURCES[name]['types'] if c != 'ai_prediction_accuracy']
+    for name in CHECKS
+}
+
+
+def validate(data_dir=DATA_DIR):
+    """One row per source × check with the number of failing rows."""
+    users = load_frame('user_directory', data_dir)
+    out = []
+    for name, checks in CHECKS.items():
+        frame = users if name == 'user_directory' else load_frame(name, data_dir)
+        for col in REQUIRED[name]:
+            out.append((name, f'{col} missing', ERROR, int(frame[col].isna().sum())))
+        for check, level, mask in checks(frame, users):
+            out.append((name, check, level, int(mask.sum())))
+        for col in [c for c in CATEGORIES if c in frame]:
+            unknown = frame[col].notna() & ~frame[col].isin(CATEGORIES[col])
+            out.append((name, f'{col} not in schema', WARNING, int(unknown.sum())))
+    return pd.DataFrame(out, columns=['source', 'check', 'level', 'rows'])
+
+
+def check_sources(data_dir=DATA_DIR):
+    """validate(), raising ValidationError if any 'error' check fails."""
+    report = validate(data_dir)
+    if ((report['level'] == ERROR) & (report['rows'] > 0)).any():
+        raise ValidationError(report)
+    return report
@@ -0,0 +1 @@
+"""Benchmarks for the analytics package (run with `python -m benchmarks.<name>`)."""
@@ -0,0 +1,86 @@
+"""Query engines on the dashboards' specs: pandas vs SQLite vs DuckDB.
+
+    python -m benchmarks.bench_engines --rows 1000000 10000000 100000000
+
+For every size a synthetic data directory is written, and each engine runs
+in a fresh subprocess. 'first' is the first spec, including whatever the
+engine builds up front: the Arrow cache and cube for pandas, the indexed
+database for SQLite, nothing for DuckDB. 'all' is every spec of
+check_parity.dashboard_specs after that. duckdb-parquet queries a Parquet
+export of the logs instead of the CSVs; the export time is not counted.
+Results are checked against pandas at the smallest size, after timing.
+"""
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from analytics.query import ENGINES
+from benchmarks.synthetic import write_synthetic_logs
+from benchmarks.check_parity import check, dashboard_specs
+
+MODES = ENGINES + (['duckdb-parquet'] if 'duckdb' in ENGINES else [])
+
+
+def _worker(data_dir, mode):
+    from analytics.query import query, run
+
+    engine = mode.split('-')[0]
+    exports = []
+    if mode == 'duckdb-parquet':
+        from analytics.duckdb_backend import export_parquet
+        exports = [export_parquet(name, data_dir) for name in ['ai_usage_logs', 'manual_task_logs']]
+
+    start = time.perf_counter()
+    cube = None
+    if engine == 'pandas':
+        from analytics.cube import load_cube
+        cube = load_cube(data_dir)
+    run(query(['team', 'task_type'], method='AI'), engine, data_dir, cube)
+    first = time.perf_counter() - start
+
+    specs = dashboard_specs(data_dir, engine).values()
+    start = time.perf_counter()
+    for spec in specs:
+        run(spec, engine, data_dir, cube)
+    total = time.perf_counter() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    for path in exports:
+        path.unlink()
+    print(f'{first:.3f} {total:.3f} {peak:.0f}')
+
+
+def _measure(data_dir, mode):
+    out = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_engines', '--worker', str(data_dir), '--mode', mode],
+        check=True, capture_output=True, text=True,
+    ).stdout.split()
+    return float(out[0]), float(out[1]), float(out[2])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000_000, 10_000_000, 100_000_000])
+    parser.add_argument('--modes', nargs='+', choices=MODES, default=MODES)
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return _worker(Path(args.worker), args.mode)
+
+    print(f"{'rows':>12}  {'engine':<14}  {'first':>8}  {'all':>8}  {'peak':>10}")
+    for i, n in enumerate(sorted(args.rows)):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_synthetic_logs(tmp, n)
+            for mode in args.modes:
+                first, total, peak = _measure(tmp, mode)
+                print(f'{n:>12,}  {mode:<14}  {first:>7.2f}s  {total:>7.2f}s  {peak:>6,.0f} MiB')
+            if i == 0 and check(Path(tmp)):
+                sys.exit('engines disagree')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Bytes per row of the loaded and derived frames: pandas defaults vs analytics.schema.
+
+    python -m benchmarks.bench_memory --rows 1000000 --year-rows 5000000
+
+'default' is pd.read_csv with inferred dtypes (int64, float64, strings per
+row) and task rows tagged the way the dashboards used to (a string method
+and a Period day per row); 'schema' is loader.load_frame and
+cube.task_rows. Sizes count string contents (memory_usage(deep=True)).
+The last line scales the task rows to --year-rows log rows.
+"""
+import argparse
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from analytics.cube import BASE_DIMENSIONS, MEASURES, task_rows
+from analytics.loader import DATA_DIR, load_frame, source_path
+from analytics.schema import memory_usage
+from analytics.teams import user_team_map
+from benchmarks.synthetic import write_synthetic_logs
+
+LOGS = ['ai_usage_logs', 'manual_task_logs', 'user_directory']
+
+
+def default_task_rows(ai_logs, manual_logs, team_map):
+    ai = ai_logs.assign(
+        method=np.where(ai_logs['used_ai_tool'], 'AI', 'Manual').astype(object),
+        day=pd.to_datetime(ai_logs['date']).dt.to_period('D'),
+    )
+    manual = manual_logs.assign(
+        team=manual_logs['user_id'].map(team_map),
+        method='Manual',
+        day=pd.to_datetime(manual_logs['date']).dt.to_period('D'),
+        ai_prediction_accuracy=np.nan,
+    )
+    columns = BASE_DIMENSIONS + list(MEASURES.values())
+    return pd.concat([ai[columns], manual[columns]], ignore_index=True)
+
+
+def report(data_dir, year_rows):
+    default = {name: pd.read_csv(source_path(name, data_dir)) for name in LOGS}
+    compact = {name: load_frame(name, data_dir) for name in LOGS}
+    team_map = user_team_map(data_dir)
+    default['task rows'] = default_task_rows(default['ai_usage_logs'], default['manual_task_logs'], team_map)
+    compact['task rows'] = task_rows(compact['ai_usage_logs'], compact['manual_task_logs'], team_map)
+
+    print(f"{'frame':<18} {'rows':>10}  {'default B/row':>13}  {'schema B/row':>12}  {'saving':>6}")
+    for name in default:
+        before, after = memory_usage(default[name]), memory_usage(compact[name])
+        print(f"{name:<18} {len(compact[name]):>10,}  {before:>13.1f}  {after:>12.1f}  {before / after:>5.1f}x")
+    before, after = memory_usage(default['task rows']), memory_usage(compact['task rows'])
+    print(f"task rows for {year_rows:,} log rows: "
+          f"{before * year_rows / 2**20:,.0f} MiB default → {after * year_rows / 2**20:,.0f} MiB schema")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, help='synthetic AI-log rows (default: the data in --data-dir)')
+    parser.add_argument('--data-dir', type=Path, default=DATA_DIR)
+    parser.add_argument('--year-rows', type=int, default=5_000_000, help='log rows in a year')
+    args = parser.parse_args()
+    if args.rows is None:
+        return report(args.data_dir, args.year_rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        write_synthetic_logs(tmp, args.rows)
+        report(Path(tmp), args.year_rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""Scaling of the sharded cube and summary builds with the worker count.
+
+    python -m benchmarks.bench_parallel --rows 4000000 --workers 1 2 4 8 16 32
+
+A synthetic data directory is written once and its Arrow caches are built
+up front, so the timings cover aggregation only. Every worker count is
+checked for a result identical to the single-process build.
+"""
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from analytics.cube import build_cube_parallel
+from analytics.loader import SOURCES, ensure_cache
+from analytics.parallel import default_workers
+from analytics.summary import OUTPUT_FILE, update_user_monthly_summary
+from benchmarks.synthetic import write_synthetic_logs
+
+
+def _timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--by', choices=['user_id', 'team'], default='user_id')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        write_synthetic_logs(data_dir, args.rows)
+        for name in SOURCES:
+            if (data_dir / SOURCES[name]['file']).exists():
+                ensure_cache(name, data_dir)
+
+        print(f'{args.rows:,} rows, {default_workers()} cores available, sharded by {args.by}')
+        print(f"{'workers':>7}  {'cube':>8}  {'speedup':>7}  {'summary':>8}  {'speedup':>7}")
+        base = None
+        for workers in sorted(args.workers):
+            cube, t_cube = _timed(build_cube_parallel, data_dir, workers=workers, by=args.by)
+            _, t_summary = _timed(update_user_monthly_summary, full=True, data_dir=data_dir, workers=workers)
+            summary = (data_dir / OUTPUT_FILE).read_bytes()
+            if base is None:
+                base = cube, summary, t_cube, t_summary
+            else:
+                pd.testing.assert_frame_equal(base[0], cube, check_exact=True)
+                assert summary == base[1], f'summary differs with {workers} workers'
+            print(f'{workers:>7}  {t_cube:>7.2f}s  {base[2] / t_cube:>6.1f}x'
+                  f'  {t_summary:>7.2f}s  {base[3] / t_summary:>6.1f}x')
+    print('all worker counts produce identical results ✓')
+
+
+if __name__ == '__main__':
+    main()
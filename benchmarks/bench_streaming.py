@@ -0,0 +1,84 @@
+"""Peak memory of the in-memory vs streaming cube and summary builders.
+
+    python -m benchmarks.bench_streaming --rows 100000 1000000 4000000 --chunk-mb 16
+
+For every size a synthetic data directory is written (in chunks, so the
+generator itself stays small) and each build runs in a fresh subprocess so
+that its peak RSS is measured in isolation. The streaming cube is checked
+against the in-memory one at the smallest size.
+"""
+import argparse
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from benchmarks.synthetic import write_synthetic_logs
+
+
+def _worker(data_dir, mode, chunk_bytes):
+    from analytics.cube import build_cube, build_cube_streaming, task_rows
+    from analytics.loader import load_ai_logs, load_manual_logs
+    from analytics.summary import update_user_monthly_summary
+    from analytics.teams import user_team_map
+
+    start = time.perf_counter()
+    if mode == 'cube-memory':
+        build_cube(task_rows(load_ai_logs(data_dir), load_manual_logs(data_dir), user_team_map(data_dir)))
+    elif mode == 'cube-streaming':
+        build_cube_streaming(data_dir, chunk_bytes=chunk_bytes)
+    elif mode == 'summary-streaming':
+        update_user_monthly_summary(full=True, data_dir=data_dir, chunk_bytes=chunk_bytes)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f'{time.perf_counter() - start:.3f} {peak:.0f}')
+
+
+def _measure(data_dir, mode, chunk_bytes):
+    out = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.bench_streaming',
+         '--worker', str(data_dir), '--mode', mode, '--chunk-bytes', str(chunk_bytes)],
+        check=True, capture_output=True, text=True,
+    ).stdout.split()
+    return float(out[0]), float(out[1])
+
+
+def check_parity(data_dir, chunk_bytes):
+    from analytics.cube import build_cube, build_cube_streaming, task_rows
+    from analytics.loader import load_ai_logs, load_manual_logs
+    from analytics.teams import user_team_map
+
+    memory = build_cube(task_rows(load_ai_logs(data_dir), load_manual_logs(data_dir), user_team_map(data_dir)))
+    streaming = build_cube_streaming(data_dir, chunk_bytes=chunk_bytes)
+    pd.testing.assert_frame_equal(memory, streaming, check_dtype=False, rtol=1e-12)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--chunk-mb', type=float, default=16)
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--mode', help=argparse.SUPPRESS)
+    parser.add_argument('--chunk-bytes', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.worker:
+        return _worker(Path(args.worker), args.mode, args.chunk_bytes)
+
+    chunk_bytes = int(args.chunk_mb * (1 << 20))
+    modes = ['cube-memory', 'cube-streaming', 'summary-streaming']
+    print(f"{'rows':>10}  " + '  '.join(f'{m:>26}' for m in modes))
+    for i, n in enumerate(sorted(args.rows)):
+        with tempfile.TemporaryDirectory() as tmp:
+            write_synthetic_logs(tmp, n)
+            if i == 0:
+                check_parity(Path(tmp), chunk_bytes=max(1 << 16, chunk_bytes // 64))
+            cells = [_measure(tmp, mode, chunk_bytes) for mode in modes]
+        print(f'{n:>10,}  ' + '  '.join(f'{t:>9.2f}s {rss:>9,.0f} MiB peak' for t, rss in cells))
+    print('streaming cube matches the in-memory cube ✓')
+
+
+if __name__ == '__main__':
+    main()
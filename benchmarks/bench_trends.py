@@ -0,0 +1,128 @@
+"""Vectorized trend metrics vs the original row-wise apply() implementations.
+
+    python -m benchmarks.bench_trends --users 1000000 --apply-sample 100000
+
+The apply() versions are timed on `--apply-sample` rows and extrapolated
+linearly to the full matrix (they take minutes at a million rows); both
+implementations are checked for identical results on that sample.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from analytics.trends import add_trend_columns
+
+MONTHS = ['Jan %', 'Feb %', 'Mar %', 'Apr %']
+
+
+def synthetic_rates(n_users, n_months=4, missing=0.2, seed=0):
+    """User×month adoption rates on the summary's 0–100 scale with NaN gaps."""
+    rng = np.random.default_rng(seed)
+    tasks = rng.integers(1, 7, size=(n_users, n_months))
+    rates = rng.binomial(tasks, rng.uniform(0, 1, size=(n_users, 1))) / tasks * 100
+    rates[rng.random((n_users, n_months)) < missing] = np.nan
+    labels = MONTHS if n_months == 4 else [f'M{i} %' for i in range(n_months)]
+    frame = pd.DataFrame(rates, columns=labels)
+    frame.insert(0, 'user_id', np.arange(n_users))
+    return frame, labels
+
+
+def apply_metrics(user_rates, cols):
+    """The per-row implementations from adoption_analysis.py, verbatim."""
+    def avg_abs(vals):
+        arr = [v for v in vals if pd.notna(v)]
+        return np.mean(np.diff(arr)) if len(arr)>1 else np.nan
+
+    def avg_rel(vals):
+        arr = [v for v in vals if pd.notna(v)]
+        rel = [(arr[i] - arr[i-1]) / arr[i-1] * 100
+               for i in range(1, len(arr)) if arr[i-1]!=0]
+        return np.mean(rel) if rel else np.nan
+
+    user_rates['Avg MoM abs %'] = user_rates.apply(lambda r:
+        avg_abs([r[c] for c in cols]), axis=1)
+    user_rates['Avg MoM rel %'] = user_rates.apply(lambda r:
+        avg_rel([r[c] for c in cols]), axis=1)
+    user_rates['n_months'] = user_rates[cols].notna().sum(axis=1)
+    user_rates['decline_count'] = user_rates.apply(lambda r:
+        int(sum(1 for d in np.diff(
+            [r[c] for c in cols if pd.notna(r[c])]
+        ) if d<0)), axis=1)
+
+    def status(r):
+        if r.n_months < 2:
+            return 'Not enough data'
+        arr = [r[c] for c in cols if pd.notna(r[c])]
+        if all(x == 100 for x in arr):
+            return 'Full Adopter'
+        if r['Avg MoM abs %'] > 0:
+            return 'Growing'
+        return 'Stagnant/Declining'
+
+    user_rates['Status'] = user_rates.apply(status, axis=1)
+
+    def first_adoption_month(row):
+        for m in cols:
+            if pd.notna(row[m]) and row[m] > 0:
+                return m
+        return None
+
+    user_rates['first_month'] = user_rates.apply(first_adoption_month, axis=1)
+
+    def compute_since_metrics(row):
+        if not isinstance(row['first_month'], str):
+            return pd.Series({'since_decline_count': 0, 'since_increase_count': 1})
+        idx = cols.index(row['first_month'])
+        seq = [row[m] for m in cols[idx:] if pd.notna(row[m])]
+        return pd.Series({
+            'since_decline_count':  sum(1 for d in np.diff(seq) if d < 0),
+            'since_increase_count': sum(1 for d in np.diff(seq) if d > 0) + 1
+        })
+
+    since = user_rates.apply(compute_since_metrics, axis=1)
+    return pd.concat([user_rates, since], axis=1)
+
+
+def check_parity(expected, actual):
+    for col in ['Avg MoM abs %', 'Avg MoM rel %']:
+        np.testing.assert_allclose(actual[col], expected[col], rtol=1e-9, atol=1e-9)
+    for col in ['n_months', 'decline_count', 'since_decline_count', 'since_increase_count']:
+        np.testing.assert_array_equal(actual[col].to_numpy(), expected[col].to_numpy())
+    assert (actual['first_month'].fillna('') == expected['first_month'].fillna('')).all()
+    # apply() sums the deltas, so a flat series can come out at ±1e-15 and flip
+    # between Growing and Stagnant; only compare statuses away from zero
+    clear = ~np.isclose(expected['Avg MoM abs %'], 0, atol=1e-9)
+    assert (actual['Status'][clear] == expected['Status'][clear]).all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=1_000_000)
+    parser.add_argument('--months', type=int, default=4)
+    parser.add_argument('--apply-sample', type=int, default=100_000)
+    args = parser.parse_args()
+
+    rates, cols = synthetic_rates(args.users, args.months)
+    print(f"matrix: {args.users:,} users × {args.months} months")
+
+    t0 = time.perf_counter()
+    vectorized = add_trend_columns(rates, cols)
+    t_vec = time.perf_counter() - t0
+    print(f"vectorized          : {t_vec:8.3f} s")
+
+    sample = min(args.apply_sample, args.users)
+    t0 = time.perf_counter()
+    reference = apply_metrics(rates.iloc[:sample].copy(), cols)
+    t_apply = (time.perf_counter() - t0) * args.users / sample
+    note = '' if sample == args.users else f' (extrapolated from {sample:,} rows)'
+    print(f"apply(axis=1)       : {t_apply:8.3f} s{note}")
+    print(f"speedup             : {t_apply / t_vec:8.1f}x")
+
+    check_parity(reference, vectorized.iloc[:sample])
+    print("parity              : ok")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+"""Check that every query engine gives the pandas engine's results.
+
+    python -m benchmarks.check_parity                  # the shipped data/
+    python -m benchmarks.check_parity --rows 1000000   # synthetic logs
+
+Runs the query specs behind the three dashboards, plus ai_quality.py's row
+fetches, on every available engine. Spec results must match the pandas
+engine to rtol 1e-9. Rows are compared after casting to common dtypes, since
+the pandas engine keeps accuracy as float32. Exits with status 1 if
+anything differs.
+"""
+import argparse
+import sys
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from analytics.loader import DATA_DIR
+from analytics.query import ENGINES, fetch_rows, query, run
+from benchmarks.synthetic import write_synthetic_logs
+
+
+def dashboard_specs(data_dir=DATA_DIR, engine='pandas'):
+    """The specs the dashboards run, with filters taken from the data."""
+    months = run(query(['month']), engine, data_dir)['month']
+    teams = list(run(query(['team']), engine, data_dir)['team'])
+    window = list(months[-3:])
+    return {
+        # adoption_analysis.py
+        'adoption user×month':     query(['team', 'user_id', 'month'], month=window),
+        'adoption team×task':      query(['team', 'task_type'], month=window),
+        'adoption team×task×month': query(['team', 'task_type', 'month'], month=window),
+        'adoption team':           query(['team'], month=window),
+        # efficiency.py
+        'efficiency teams':        query(['team']),
+        'efficiency task×method':  query(['task_type', 'method'], team=teams[0]),
+        'efficiency team×task×method': query(['team', 'task_type', 'method']),
+        'efficiency month (AI)':   query(['task_type', 'month'], team=teams[0], method='AI'),
+        'efficiency month (all)':  query(['task_type', 'month']),
+        'efficiency pre-AI':       query(['task_type', 'month'], method='Manual',
+                                         month=pd.to_datetime(['2024-10-01', '2024-11-01'])),
+        # ai_quality.py
+        'quality team×task':       query(['team', 'task_type'], method='AI'),
+        'quality month×team×task': query(['month', 'team', 'task_type'], method='AI', team=teams[:2]),
+        'quality user×team':       query(['user_id', 'team'], method='AI', month=window),
+        'quality user':            query(['user_id'], method='AI'),
+    }
+
+
+def dashboard_rows(data_dir=DATA_DIR):
+    teams = list(run(query(['team']), 'pandas', data_dir)['team'])
+    return {
+        'quality rows':          ('ai_usage_logs', {'used_ai_tool': True}, None),
+        'quality rows filtered': ('ai_usage_logs', {'used_ai_tool': True, 'team': teams[:1]}, None),
+        'adoption logs':         ('ai_usage_logs', {}, ['team', 'user_id', 'used_ai_tool']),
+        'manual rows':           ('manual_task_logs', {}, None),
+    }
+
+
+def check(data_dir=DATA_DIR, engines=None):
+    """Compare every engine with pandas; returns the names of failed checks."""
+    engines = [e for e in engines or ENGINES if e != 'pandas']
+    failed = []
+    for name, spec in dashboard_specs(data_dir).items():
+        expected = run(spec, 'pandas', data_dir)
+        for engine in engines:
+            try:
+                pd.testing.assert_frame_equal(run(spec, engine, data_dir), expected, rtol=1e-9)
+            except AssertionError as e:
+                failed.append(f'{engine}: {name}')
+                print(f'DIFF {engine:<7} {name}\n{e}')
+            else:
+                print(f'ok   {engine:<7} {name} ({len(expected)} rows)')
+    for name, (source, where, columns) in dashboard_rows(data_dir).items():
+        expected = fetch_rows(source, where, 'pandas', columns, data_dir)
+        for engine in engines:
+            try:
+                pd.testing.assert_frame_equal(
+                    fetch_rows(source, where, engine, columns, data_dir), expected, check_dtype=False
+                )
+            except AssertionError as e:
+                failed.append(f'{engine}: {name}')
+                print(f'DIFF {engine:<7} {name}\n{e}')
+            else:
+                print(f'ok   {engine:<7} {name} ({len(expected)} rows)')
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, help='check synthetic logs of this size instead of data/')
+    parser.add_argument('--engines', nargs='+', choices=ENGINES)
+    args = parser.parse_args()
+
+    if args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            write_synthetic_logs(Path(tmp), args.rows)
+            failed = check(Path(tmp), args.engines)
+    else:
+        failed = check(DATA_DIR, args.engines)
+    if failed:
+        print(f'{len(failed)} checks differ')
+        sys.exit(1)
+    print('all engines agree ✓')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+"""Benchmark suite: one case per pipeline stage, results kept across versions.
+
+    python -m benchmarks.suite --rows 10000 1000000 10000000
+    python -m benchmarks.suite --rows 1000000 --stages summary cube --repeat 5
+    python -m benchmarks.suite --compare
+
+Every size gets a seeded synthetic data directory (benchmarks.synthetic).
+A stage's setup runs untimed before each repeat, and the best of `--repeat`
+timings is kept. Every run appends one record per stage × size to
+benchmarks/results/results.jsonl, with the git commit, machine, rows and
+timings. The file is git-ignored, so it survives checking out other
+versions. After a run (or with --compare alone), each stage × size is set
+against the newest record from a different commit on the same machine. The
+exit status is 1 if any stage got slower by more than --threshold.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from analytics.bootstrap import saved_intervals
+from analytics.cube import cube_path, load_cube, task_rows
+from analytics.loader import cache_path, ensure_cache, load_ai_logs, load_frame, load_manual_logs
+from analytics.parallel import default_workers
+from analytics.periods import ordinals
+from analytics.query import fetch_rows
+from analytics.regression import fit_lines, grouped_ols
+from analytics.reports import Source, compute_adoption, compute_efficiency
+from analytics.row_index import source_index
+from analytics.summary import update_user_monthly_summary
+from analytics.teams import index_path, user_team_map
+from benchmarks.synthetic import write_synthetic_logs
+
+RESULTS = Path(__file__).parent / 'results' / 'results.jsonl'
+SOURCES = ['ai_usage_logs', 'manual_task_logs', 'user_directory']
+
+
+def _warm(data_dir):
+    for name in SOURCES:
+        ensure_cache(name, data_dir)
+    user_team_map(data_dir)
+
+
+def _setup_load(data_dir):
+    for name in SOURCES:
+        cache_path(name, data_dir).unlink(missing_ok=True)
+
+
+def _load(data_dir, _):
+    for name in SOURCES:
+        load_frame(name, data_dir)
+
+
+def _setup_team_map(data_dir):
+    _warm(data_dir)
+    index_path(data_dir).unlink(missing_ok=True)
+
+
+def _team_map(data_dir, _):
+    user_team_map(data_dir)
+
+
+def _summary(data_dir, _):
+    update_user_monthly_summary(full=True, data_dir=data_dir)
+
+
+def _setup_cube(data_dir):
+    _warm(data_dir)
+    # the daily base too, or only the monthly roll-up would be timed
+    for granularity in ['day', 'month']:
+        cube_path(data_dir, granularity).unlink(missing_ok=True)
+
+
+def _cube(data_dir, _):
+    load_cube(data_dir)
+
+
+def _setup_queries(data_dir):
+    _warm(data_dir)
+    return load_cube(data_dir)
+
+
+def _adoption_trends(data_dir, cube):
+    # adoption_analysis.py: last four complete months, team and user Δ-metrics
+    compute_adoption(Source('pandas', data_dir, cube), n_months=4)
+
+
+def _efficiency_pivots(data_dir, cube):
+    # efficiency.py: task_type × month durations per team and method, plus overall
+    compute_efficiency(Source('pandas', data_dir, cube))
+
+
+def _setup_bootstrap(data_dir):
+    _warm(data_dir)
+    return task_rows(load_ai_logs(data_dir), load_manual_logs(data_dir), user_team_map(data_dir))
+
+
+def _bootstrap(data_dir, rows):
+    # efficiency.py: 2,000 resamples of every team × task type's durations
+    saved_intervals(rows, ['team', 'task_type'], workers=default_workers())
+
+
+def _setup_regressions(data_dir):
+    _warm(data_dir)
+    rows = fetch_rows('ai_usage_logs', {'used_ai_tool': True}, 'pandas', data_dir=data_dir)
+    rows = rows[rows['ai_prediction_accuracy'].notna()]
+    adopt = (
+        fetch_rows('ai_usage_logs', {}, 'pandas', ['team', 'user_id', 'used_ai_tool'], data_dir)
+        .groupby(['team', 'user_id'])['used_ai_tool'].mean().reset_index(name='user_adoption_rate')
+    )
+    means = rows.groupby('user_id')['ai_prediction_accuracy'].mean().rename('user_avg_accuracy')
+    return rows, adopt.merge(means.reset_index(), on='user_id')
+
+
+def _accuracy_regressions(data_dir, state):
+    # ai_quality.py: per-group least-squares fits and their chart lines (charts 7 and 12)
+    rows, users = state
+    fit_lines(grouped_ols(users, 'team', 'user_adoption_rate', 'user_avg_accuracy'),
+              'user_adoption_rate', 'user_avg_accuracy')
+    fit_lines(grouped_ols(rows, ['team', 'task_type'], 'task_duration_minutes', 'ai_prediction_accuracy'),
+              'task_duration_minutes', 'ai_prediction_accuracy')
+
+
+def _setup_row_filters(data_dir):
+    _warm(data_dir)
+    frame = load_frame('ai_usage_logs', data_dir)
+    users = frame['user_id'].drop_duplicates()
+    months = sorted(set(ordinals(frame['date'])))
+    selections = [
+        {'used_ai_tool': True},
+        {'used_ai_tool': True, 'team': ['Sales']},
+        {'used_ai_tool': True, 'user_id': list(users.iloc[::max(len(users) // 10, 1)])},
+        {'used_ai_tool': True, 'team': ['Finance'], 'month': months[-2:]},
+    ]
+    return frame, source_index('ai_usage_logs', frame), selections
+
+
+def _row_filters(data_dir, state):
+    # ai_quality.py: sidebar selections fetched through the row index
+    frame, index, selections = state
+    for where in selections:
+        fetch_rows('ai_usage_logs', where, 'pandas', data_dir=data_dir, frame=frame, index=index)
+
+
+# stage -> (setup returning the state passed to run, run)
+STAGES = {
+    'load':                 (_setup_load, _load),
+    'team-map':             (_setup_team_map, _team_map),
+    'summary':              (_warm, _summary),
+    'cube':                 (_setup_cube, _cube),
+    'adoption-trends':      (_setup_queries, _adoption_trends),
+    'efficiency-pivots':    (_setup_queries, _efficiency_pivots),
+    'bootstrap':            (_setup_bootstrap, _bootstrap),
+    'accuracy-regressions': (_setup_regressions, _accuracy_regressions),
+    'row-filters':          (_setup_row_filters, _row_filters),
+}
+
+
+def time_stage(stage, data_dir, repeat):
+    setup, func = STAGES[stage]
+    times = []
+    for _ in range(repeat):
+        state = setup(data_dir)
+        start = time.perf_counter()
+        func(data_dir, state)
+        times.append(time.perf_counter() - start)
+    return min(times), statistics.median(times)
+
+
+def _git(*args):
+    try:
+        return subprocess.run(['git', *args], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def version():
+    """Current commit (suffixed '+dirty' with uncommitted changes)."""
+    commit = _git('rev-parse', '--short', 'HEAD') or 'unknown'
+    return commit + ('+dirty' if _git('status', '--porcelain', '--untracked-files=no') else '')
+
+
+def machine():
+    return f'{platform.machine()} {os.cpu_count()} cpu python {platform.python_version()} pandas {pd.__version__}'
+
+
+def load_results(path=RESULTS):
+    if not path.exists():
+        return pd.DataFrame(columns=['commit', 'timestamp', 'machine', 'rows', 'stage', 'best', 'median'])
+    return pd.read_json(path, lines=True, dtype={'commit': str})
+
+
+def compare(results, threshold):
+    """Newest timing per machine/rows/stage vs the newest from another commit."""
+    results = results.sort_values('timestamp')
+    out = []
+    for (mach, rows, stage), group in results.groupby(['machine', 'rows', 'stage'], sort=False):
+        latest = group.iloc[-1]
+        older = group[group['commit'] != latest['commit']]
+        if older.empty:
+            continue
+        base = older.iloc[-1]
+        out.append({
+            'rows': rows, 'stage': stage, 'machine': mach,
+            'before': base['best'], 'after': latest['best'], 'ratio': latest['best'] / base['best'],
+            'commits': f"{base['commit']} → {latest['commit']}",
+        })
+    out = pd.DataFrame(out)
+    if out.empty:
+        return out
+    out['regressed'] = out['ratio'] > threshold
+    return out.sort_values(['rows', 'stage'], ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 1_000_000])
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--compare', action='store_true', help='only compare stored results')
+    parser.add_argument('--no-save', action='store_true', help='do not record this run')
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help='slowdown ratio reported as a regression')
+    args = parser.parse_args()
+
+    if not args.compare:
+        commit, mach = version(), machine()
+        records = []
+        print(f'{commit} on {mach}')
+        print(f"{'rows':>12}  {'stage':<22}  {'best':>9}  {'median':>9}")
+        for n in sorted(args.rows):
+            with tempfile.TemporaryDirectory() as tmp:
+                write_synthetic_logs(tmp, n, seed=args.seed)
+                for stage in args.stages:
+                    best, median = time_stage(stage, Path(tmp), args.repeat)
+                    print(f'{n:>12,}  {stage:<22}  {best:>8.3f}s  {median:>8.3f}s')
+                    records.append({
+                        'commit': commit, 'machine': mach, 'rows': n, 'stage': stage,
+                        'best': round(best, 6), 'median': round(median, 6), 'repeat': args.repeat,
+                        'seed': args.seed, 'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+                    })
+        if not args.no_save:
+            RESULTS.parent.mkdir(parents=True, exist_ok=True)
+            with open(RESULTS, 'a') as f:
+                f.writelines(json.dumps(r) + '\n' for r in records)
+
+    changes = compare(load_results(), args.threshold)
+    if changes.empty:
+        print('no earlier version recorded to compare with')
+        return
+    print()
+    print(changes.drop(columns='machine').to_string(
+        index=False, formatters={'before': '{:.3f}s'.format, 'after': '{:.3f}s'.format, 'ratio': '{:.2f}x'.format}
+    ))
+    if changes['regressed'].any():
+        raise SystemExit(f"{changes['regressed'].sum()} stage(s) slower than {args.threshold}x")
+
+
+if __name__ == '__main__':
+    main()
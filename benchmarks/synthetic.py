@@ -0,0 +1,153 @@
+"""Seeded synthetic logs shaped like the shipped sample, at any scale.
+
+    python -m benchmarks.synthetic /tmp/logs --rows 10000000
+
+Writes ai_usage_logs.csv, manual_task_logs.csv and user_directory.csv with
+the sample's schema and text format. Rows are generated and appended in
+chunks, so the generator itself stays small at 100M rows. The distributions
+follow data/ (1,000-row sample):
+  - users: role_title, region and join_date (2021-01..2023-09) as in the
+    directory; each user has a home team and logs about half their AI-log
+    rows under it, the rest under the other teams
+  - AI log: team and task_type mix, adoption per team×task_type shifted by
+    a per-user propensity, dates 2025-01-01..2025-05-01, durations
+    ~N(40, 10) with the AI tool and ~N(60, 9.5) without, and accuracy
+    ~N(mean per task_type, 0.11) in [0.60, 0.98] to two decimals on AI rows
+  - manual log: same users and task mix, dates 2024-10-01..2024-11-30 and
+    durations ~N(60, 15)
+The same seed and sizes always give byte-identical files.
+"""
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = 500_000
+ROWS_PER_USER = 50
+MIN_USERS = 200
+
+TEAMS = ['Finance', 'People', 'Sales']
+TEAM_WEIGHTS = [0.331, 0.320, 0.349]
+HOME_TEAM_SHARE = 0.5
+TASKS = ['budget_reconciliation', 'forecast_model', 'hiring_pipeline', 'quote_builder']
+TASK_WEIGHTS = [0.255, 0.265, 0.243, 0.237]
+
+# share of AI-log rows done with the AI tool, team × task_type (sample)
+ADOPTION = np.array([
+    [0.45, 0.51, 0.44, 0.37],   # Finance
+    [0.65, 0.51, 0.47, 0.57],   # People
+    [0.54, 0.48, 0.45, 0.49],   # Sales
+])
+ACCURACY_MEAN = [0.774, 0.798, 0.789, 0.787]
+ACCURACY_STD = 0.11
+ACCURACY_RANGE = (0.60, 0.98)
+
+ROLES = (['Analyst', 'Executive', 'Manager'], [0.350, 0.355, 0.295])
+REGIONS = (['EU', 'UK', 'US'], [0.340, 0.345, 0.315])
+
+AI_DATES = ('2025-01-01', '2025-05-01')
+MANUAL_DATES = ('2024-10-01', '2024-11-30')
+JOIN_DATES = ('2021-01-01', '2023-09-30')
+
+
+def default_users(n_rows):
+    """One user per ROWS_PER_USER AI-log rows, at least the sample's 200."""
+    return max(MIN_USERS, n_rows // ROWS_PER_USER)
+
+
+def _dates(rng, span, size):
+    days = pd.date_range(*span).strftime('%Y-%m-%d').to_numpy()
+    return days[rng.integers(0, len(days), size)]
+
+
+def _durations(rng, mean, std, low, high, size):
+    return np.clip(rng.normal(mean, std, size).round(), low, high).astype(np.int64)
+
+
+def _users(rng, n_users):
+    user_ids = np.arange(1001, 1001 + n_users)
+    joined = _dates(rng, JOIN_DATES, n_users)
+    directory = pd.DataFrame({
+        'user_id':    user_ids,
+        'full_name':  [f'User {u}' for u in user_ids],
+        'role_title': rng.choice(ROLES[0], n_users, p=ROLES[1]),
+        'join_date':  joined,
+        'region':     rng.choice(REGIONS[0], n_users, p=REGIONS[1]),
+    })
+    home = rng.choice(len(TEAMS), n_users, p=TEAM_WEIGHTS)
+    # logit shift of the team×task adoption, so users differ in how much they use AI
+    propensity = rng.normal(0, 0.8, n_users)
+    return directory, home, propensity
+
+
+def _ai_chunk(rng, size, user_ids, home, propensity):
+    users = rng.integers(0, len(user_ids), size)
+    away = rng.random(size) >= HOME_TEAM_SHARE
+    team = np.where(away, (home[users] + rng.integers(1, len(TEAMS), size)) % len(TEAMS), home[users])
+    task = rng.choice(len(TASKS), size, p=TASK_WEIGHTS)
+    base = ADOPTION[team, task]
+    p = 1 / (1 + np.exp(-(np.log(base / (1 - base)) + propensity[users])))
+    used = rng.random(size) < p
+    accuracy = np.clip(rng.normal(np.take(ACCURACY_MEAN, task), ACCURACY_STD), *ACCURACY_RANGE).round(2)
+    return pd.DataFrame({
+        'user_id':                user_ids[users],
+        'team':                   np.take(TEAMS, team),
+        'task_type':              np.take(TASKS, task),
+        'date':                   _dates(rng, AI_DATES, size),
+        'task_duration_minutes':  np.where(used, _durations(rng, 40, 10, 10, 80, size),
+                                           _durations(rng, 60, 9.5, 35, 90, size)),
+        'used_ai_tool':           used,
+        'ai_prediction_accuracy': np.where(used, accuracy, np.nan),
+    })
+
+
+def _manual_chunk(rng, size, user_ids):
+    return pd.DataFrame({
+        'user_id':               user_ids[rng.integers(0, len(user_ids), size)],
+        'task_type':             rng.choice(TASKS, size, p=TASK_WEIGHTS),
+        'date':                  _dates(rng, MANUAL_DATES, size),
+        'task_duration_minutes': _durations(rng, 60, 15, 15, 110, size),
+    })
+
+
+def write_synthetic_logs(data_dir, n_rows, n_users=None, manual_rows=None, seed=0,
+                         chunk_rows=CHUNK_ROWS):
+    """Write the three source CSVs into `data_dir`.
+
+    `n_rows` AI-log rows and `manual_rows` manual-log rows (default: as many)
+    across `n_users` users (default: default_users(n_rows)).
+    """
+    data_dir = Path(data_dir)
+    data_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    directory, home, propensity = _users(rng, n_users or default_users(n_rows))
+    directory.to_csv(data_dir / 'user_directory.csv', index=False)
+    user_ids = directory['user_id'].to_numpy()
+
+    chunks = {
+        'ai_usage_logs':    (n_rows, lambda size: _ai_chunk(rng, size, user_ids, home, propensity)),
+        'manual_task_logs': (n_rows if manual_rows is None else manual_rows,
+                             lambda size: _manual_chunk(rng, size, user_ids)),
+    }
+    for name, (n, make) in chunks.items():
+        path = data_dir / f'{name}.csv'
+        path.unlink(missing_ok=True)
+        for start in range(0, max(n, 1), chunk_rows):
+            chunk = make(min(chunk_rows, n - start))
+            chunk.to_csv(path, mode='a', header=start == 0, index=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('data_dir', type=Path)
+    parser.add_argument('--rows', type=int, default=1_000_000, help='AI-log rows')
+    parser.add_argument('--manual-rows', type=int, help='manual-log rows (default: --rows)')
+    parser.add_argument('--users', type=int, help='number of users (default: one per 50 rows)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    write_synthetic_logs(args.data_dir, args.rows, args.users, args.manual_rows, args.seed)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+import time
+
+import click
+
+from analytics.loader import DATA_DIR
+from analytics.parallel import default_workers
+from analytics.periods import GRANULARITIES
+from analytics.query import ENGINES
+from analytics.reports import THRESHOLD, Source, compute, report_version, save_report
+
+
+@click.command()
+@click.option('--engine', type=click.Choice(ENGINES), default='pandas', show_default=True,
+              help='Query engine to compute with (all give the same results).')
+@click.option('--months', type=int, multiple=True, default=[4], show_default=True,
+              help='Adoption trend window(s), in complete months; repeat for several.')
+@click.option('--threshold', type=float, default=THRESHOLD, show_default=True,
+              help='Accuracy below which a prediction counts as low.')
+@click.option('--granularity', 'granularities', type=click.Choice(GRANULARITIES), multiple=True,
+              default=['week'], show_default=True,
+              help='Period(s) of the per-period metrics report; repeat for several.')
+@click.option('--workers', type=int, default=None,
+              help='Processes for the bootstrap intervals (default: one per CPU).')
+@click.option('--data-dir', type=click.Path(exists=True, file_okay=False), default=str(DATA_DIR),
+              show_default=True)
+def main(engine, months, threshold, granularities, workers, data_dir):
+    """Precompute every dashboard's tables and store them under data/.cache/reports/.
+
+    The dashboards show these instead of computing on startup for as long as
+    the source CSVs are unchanged; run this after new logs land (e.g. weekly).
+    """
+    version = report_version(data_dir)
+    source = Source(engine, data_dir, workers=workers or default_workers())
+    jobs = (
+        [('adoption', {'n_months': n}) for n in months]
+        + [('efficiency', {}), ('quality_options', {}),
+           ('quality', {'selection': None, 'threshold': threshold})]
+        + [('periods', {'granularity': g}) for g in granularities]
+    )
+    for name, params in jobs:
+        start = time.perf_counter()
+        tables = compute(name, source, **params)
+        path = save_report(name, tables, data_dir, version, **params)
+        args = ', '.join(f'{k}={v}' for k, v in params.items())
+        print(f"  {name}({args}): {time.perf_counter() - start:.2f}s → {path}")
+    print(f"✔️ {len(jobs)} reports saved")
+
+
+if __name__ == '__main__':
+    main()
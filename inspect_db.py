@@ -1,7 +1,7 @@
 import sqlite3
 
 # local db file directory
-DB_FILE = 'data/hx_analyst_exercise.db'  
+DB_FILE = 'data/all_data.db'
 
 conn = sqlite3.connect(DB_FILE)
 cursor = conn.cursor()
@@ -0,0 +1,53 @@
+import time
+
+import click
+
+from analytics.drift import THRESHOLD, load_monitor, update_drift
+from analytics.loader import CHUNK_BYTES, DATA_DIR
+
+
+def _print_alerts(alerts):
+    for a in alerts:
+        what = 'mean accuracy fell' if a['kind'] == 'mean_drop' else 'share below threshold rose'
+        print(f"  ⚠️ {a['date']} {a['team']} / {a['task_type']}: {what} "
+              f"(baseline {a['baseline']:.3f}, EWMA {a['ewma']:.3f}, {a['ewma_low']:.0%} low, n={a['n']:,})")
+
+
+@click.command()
+@click.option('--threshold', type=float, default=THRESHOLD, show_default=True,
+              help='Accuracy below which a prediction counts as low.')
+@click.option('--follow', type=float, default=None, metavar='SECONDS',
+              help='Keep polling the AI log for new rows every SECONDS.')
+@click.option('--reset', is_flag=True, help='Discard the monitor state and replay the whole log.')
+@click.option('--status', is_flag=True, help='Print every group\'s EWMAs and test statistics.')
+@click.option('--chunk-mb', type=float, default=CHUNK_BYTES / (1 << 20), show_default=True,
+              help='Read the log this many MiB at a time (bounds peak memory).')
+@click.option('--data-dir', type=click.Path(exists=True, file_okay=False), default=str(DATA_DIR),
+              show_default=True)
+def main(threshold, follow, reset, status, chunk_mb, data_dir):
+    """Watch the AI log for accuracy drift per team × task type.
+
+    Only rows appended since the last run are read; alerts are printed and
+    kept in data/.cache/drift/alerts.jsonl. With --follow the log is polled
+    until interrupted.
+    """
+    chunk_bytes = int(chunk_mb * (1 << 20))
+    try:
+        while True:
+            start = time.perf_counter()
+            alerts, n_rows = update_drift(data_dir, threshold, reset, chunk_bytes)
+            reset = False
+            if n_rows or not follow:
+                print(f"{n_rows:,} new rows, {len(alerts)} alerts ({time.perf_counter() - start:.2f}s)")
+            _print_alerts(alerts)
+            if not follow:
+                break
+            time.sleep(follow)
+    except KeyboardInterrupt:
+        pass
+    if status:
+        print(load_monitor(data_dir).status().to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
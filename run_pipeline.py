@@ -0,0 +1,59 @@
+import sys
+
+import click
+
+from analytics.loader import DATA_DIR
+from analytics.pipeline import PARAMS, STAGES, pipeline_dir, run_log, run_pipeline
+from analytics.periods import GRANULARITIES
+from analytics.query import ENGINES
+
+
+@click.command()
+@click.option('--engine', type=click.Choice(ENGINES), default=PARAMS['engine'], show_default=True,
+              help='Query engine for the report stages (all give the same results).')
+@click.option('--months', type=int, multiple=True, default=PARAMS['months'], show_default=True,
+              help='Adoption trend window(s), in complete months; repeat for several.')
+@click.option('--threshold', type=float, default=PARAMS['threshold'], show_default=True,
+              help='Accuracy below which a prediction counts as low.')
+@click.option('--granularity', 'granularities', type=click.Choice(GRANULARITIES), multiple=True,
+              default=PARAMS['granularities'], show_default=True,
+              help='Period(s) of the adoption/efficiency/accuracy tables; repeat for several.')
+@click.option('--workers', type=int, default=None,
+              help='Processes for independent stages (default: one per CPU; 1 runs in-process).')
+@click.option('--force', is_flag=True, help='Rerun every stage, even if its inputs are unchanged.')
+@click.option('--history', type=int, default=None, metavar='N',
+              help='Print the stage records of the last N runs instead of running.')
+@click.option('--data-dir', type=click.Path(exists=True, file_okay=False), default=str(DATA_DIR),
+              show_default=True)
+def main(engine, months, threshold, granularities, workers, force, history, data_dir):
+    """Run the weekly reporting pipeline, skipping stages whose inputs are unchanged.
+
+    Stages: load → validate → team-map → summary / cube → adoption,
+    efficiency, quality → charts, and periods (the metrics per week, or
+    another --granularity). Outputs and the run log (runs.jsonl) go
+    to data/.cache/pipeline/; --history N prints the log's last N runs.
+    """
+    if history is not None:
+        log = run_log(data_dir)
+        log = log[log['run'].isin(log['run'].unique()[-history:])] if history > 0 else log.iloc[:0]
+        if log.empty:
+            print(f"no runs logged in {pipeline_dir(data_dir)}")
+        else:
+            print(log[['run', 'stage', 'status', 'seconds', 'error']].fillna('').to_string(index=False))
+        return
+    print(f"pipeline ({len(STAGES)} stages):")
+    records = run_pipeline(
+        data_dir, workers, force, engine=engine, months=months, threshold=threshold,
+        granularities=granularities,
+    )
+    failed = [r['stage'] for r in records if r['status'] in ('failed', 'blocked')]
+    ran = sum(r['status'] == 'ran' for r in records)
+    total = sum(r['seconds'] for r in records)
+    out = pipeline_dir(data_dir)
+    if failed:
+        sys.exit(f"✘ {len(failed)} stage(s) did not complete: {', '.join(failed)} (log: {out / 'runs.jsonl'})")
+    print(f"✔️ {ran} stage(s) ran, {len(records) - ran} up to date, {total:.2f}s of work → {out}")
+
+
+if __name__ == '__main__':
+    main()
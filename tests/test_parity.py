@@ -0,0 +1,32 @@
+"""Every query engine gives the pandas engine's results (benchmarks.check_parity).
+
+Runs the dashboards' specs and row fetches on the shipped data/ and on a
+small synthetic log, one test per engine.
+"""
+from pathlib import Path
+
+import pytest
+
+from analytics.query import ENGINES
+from benchmarks.check_parity import check
+from benchmarks.synthetic import write_synthetic_logs
+
+DATA_DIR = Path(__file__).resolve().parents[1] / 'data'  # the shipped data, wherever pytest runs from
+SYNTHETIC_ROWS = 20_000
+
+
+@pytest.fixture(scope='module')
+def synthetic_dir(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp('synthetic')
+    write_synthetic_logs(data_dir, SYNTHETIC_ROWS)
+    return data_dir
+
+
+@pytest.mark.parametrize('engine', [e for e in ENGINES if e != 'pandas'])
+def test_shipped_data(engine):
+    assert check(DATA_DIR, [engine]) == []
+
+
+@pytest.mark.parametrize('engine', [e for e in ENGINES if e != 'pandas'])
+def test_synthetic_logs(engine, synthetic_dir):
+    assert check(synthetic_dir, [engine]) == []